@@ -0,0 +1,76 @@
+"""bcrypt work factor benchmark.
+
+Usage:
+    python -m benchmarks.bcrypt_cost --target-ms 250 --output bcrypt.json
+
+Times bcrypt.checkpw for a range of work factors on this machine and
+recommends the highest one whose median verification time stays within the
+target. Set the result as BCRYPT_ROUNDS; existing hashes are upgraded on each
+user's next successful login.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bcrypt
+
+from benchmarks.run_benchmarks import _environment, _summarize
+
+
+def time_rounds(rounds: int, repeat: int) -> dict:
+    password = b"Benchmark#Password1"
+    hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        bcrypt.checkpw(password, hashed)
+        samples.append(time.perf_counter() - start)
+    result = {'name': f"bcrypt.checkpw.rounds_{rounds}", 'rounds': rounds}
+    result.update(_summarize(samples))
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Pick a bcrypt work factor for this hardware")
+    parser.add_argument('--min-rounds', type=int, default=10)
+    parser.add_argument('--max-rounds', type=int, default=14)
+    parser.add_argument('--target-ms', type=float, default=250.0,
+                        help="longest acceptable median verification time")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="write JSON results to this file (default: stdout)")
+    args = parser.parse_args(argv)
+    
+    results = []
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        print(f"Timing {rounds} rounds...", file=sys.stderr)
+        result = time_rounds(rounds, args.repeat)
+        results.append(result)
+        if result['median_ms'] > args.target_ms * 4:
+            break  # each extra round doubles the cost
+    
+    within_target = [r['rounds'] for r in results if r['median_ms'] <= args.target_ms]
+    recommended = max(within_target) if within_target else args.min_rounds
+    print(f"Recommended BCRYPT_ROUNDS={recommended}", file=sys.stderr)
+    
+    report = {
+        'environment': _environment(),
+        'target_ms': args.target_ms,
+        'recommended_rounds': recommended,
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
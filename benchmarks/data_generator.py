@@ -0,0 +1,180 @@
+"""Synthetic dataset generator for performance benchmarks.
+
+Builds a database with the application's own schema (by constructing
+``Database`` against the target path) and bulk-loads realistic lookups,
+students and attendance. Generated CNICs and phone numbers match
+``VALIDATION_PATTERNS``; output is fully determined by the seed.
+"""
+import os
+import re
+import random
+import sqlite3
+from datetime import date, timedelta
+from typing import Dict
+
+from config.settings import Config, VALIDATION_PATTERNS
+
+# Named dataset sizes: students and school days of attendance per student
+PRESETS = {
+    'small': {'students': 1_000, 'attendance_days': 200},
+    'medium': {'students': 50_000, 'attendance_days': 60},
+    'large': {'students': 500_000, 'attendance_days': 40},  # 20M attendance rows
+}
+
+FIRST_NAMES = [
+    'Ali', 'Ahmed', 'Hassan', 'Usman', 'Bilal', 'Hamza', 'Zain', 'Omar', 'Saad', 'Farhan',
+    'Ayesha', 'Fatima', 'Zainab', 'Maryam', 'Hira', 'Sana', 'Iqra', 'Amna', 'Khadija', 'Noor'
+]
+LAST_NAMES = [
+    'Khan', 'Ahmed', 'Malik', 'Hussain', 'Sheikh', 'Butt', 'Qureshi', 'Chaudhry', 'Raza', 'Iqbal',
+    'Shah', 'Siddiqui', 'Mirza', 'Baig', 'Abbasi'
+]
+CLASSES = [str(i) for i in range(1, 11)]
+SECTIONS = ['A', 'B', 'C', 'D']
+STATUSES = ['Active'] * 90 + ['Drop'] * 5 + ['Graduated'] * 3 + ['Fail'] * 2
+ATTENDANCE_STATUSES = ['Present'] * 85 + ['Absent'] * 8 + ['Late'] * 5 + ['Excused'] * 2
+
+_CNIC_RE = re.compile(VALIDATION_PATTERNS['cnic'])
+_MOBILE_RE = re.compile(VALIDATION_PATTERNS['mobile'])
+
+BATCH_SIZE = 10_000
+
+
+class SyntheticDataGenerator:
+    """Deterministic generator of lookup, student and attendance rows."""
+    
+    def __init__(self, seed: int = 42):
+        self.rng = random.Random(seed)
+    
+    def cnic(self) -> str:
+        value = f"{self.rng.randint(10000, 99999)}-{self.rng.randint(0, 9999999):07d}-{self.rng.randint(0, 9)}"
+        assert _CNIC_RE.match(value)
+        return value
+    
+    def phone(self) -> str:
+        value = f"03{self.rng.randint(0, 999999999):09d}"
+        assert _MOBILE_RE.match(value)
+        return value
+    
+    def name(self) -> str:
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+    
+    def birth_date(self, min_age: int, max_age: int) -> str:
+        days = self.rng.randint(min_age * 365, max_age * 365)
+        return (date.today() - timedelta(days=days)).isoformat()
+    
+    def student_row(self, index: int, school_count: int, lookup: Dict[str, int]) -> tuple:
+        school_id = self.rng.randint(1, school_count)
+        has_mother_info = self.rng.random() < 0.7
+        doi = self.birth_date(1, 8)
+        return (
+            self.rng.choice(STATUSES),
+            f"STD{index:07d}",
+            lookup['org_id'], school_id, lookup['province_id'], lookup['district_id'],
+            lookup['union_council_id'], 1,
+            self.name(), self.rng.choice(['Male', 'Female']), self.birth_date(5, 16),
+            f"{self.rng.randint(10000, 99999)}{self.rng.randint(0, 99999999):08d}",
+            self.rng.choice(CLASSES), self.rng.choice(SECTIONS),
+            f"House {self.rng.randint(1, 999)}, Street {self.rng.randint(1, 99)}",
+            self.name(), self.cnic(), self.phone(),
+            self.rng.randint(3, 12),
+            self.name() if has_mother_info else None,
+            self.cnic() if has_mother_info else None,
+            doi if has_mother_info else None,
+            (date.fromisoformat(doi) + timedelta(days=3650)).isoformat() if has_mother_info else None,
+            self.rng.choice(['Married', 'Widowed', 'Divorced']),
+            f"0{self.rng.randint(1000000000, 9999999999)}",
+        )
+
+
+STUDENT_COLUMNS = (
+    'status', 'student_id', 'org_id', 'school_id', 'province_id', 'district_id',
+    'union_council_id', 'nationality_id', 'student_name', 'gender', 'date_of_birth',
+    'students_bform_number', 'class', 'section', 'address', 'father_name', 'father_cnic',
+    'father_phone', 'household_size', 'mother_name', 'mother_cnic', 'mother_cnic_doi',
+    'mother_cnic_exp', 'mother_marital_status', 'mother_mwa'
+)
+
+
+def _create_schema(db_path: str):
+    """Create the application schema at db_path using Database itself."""
+    previous = Config.DATABASE_PATH
+    Config.DATABASE_PATH = db_path
+    try:
+        from models.database import Database
+        db = Database()
+        db.db_conn.close()
+    finally:
+        Config.DATABASE_PATH = previous
+
+
+def generate_dataset(db_path: str, students: int, attendance_days: int = 0,
+                     seed: int = 42, school_count: int = 50, progress=print) -> Dict[str, int]:
+    """Create (or replace) a synthetic database at db_path.
+    
+    Returns:
+        dict: Row counts per table
+    """
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    _create_schema(db_path)
+    
+    gen = SyntheticDataGenerator(seed)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        # Bulk load settings: the dataset is disposable
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA foreign_keys = OFF")
+        
+        conn.execute("BEGIN")
+        conn.execute("INSERT INTO organizations (name, type, code) VALUES ('Benchmark Org', 'NGO', 'BNCH')")
+        conn.execute("INSERT INTO provinces (name, code) VALUES ('Punjab', 'PB')")
+        conn.execute("INSERT INTO districts (name, code, province_id) VALUES ('Lahore', 'LHR', 1)")
+        conn.execute("INSERT INTO union_councils (name, code, district_id, province_id) VALUES ('UC-1', 'UC1', 1, 1)")
+        conn.executemany(
+            "INSERT INTO schools (name, type, org_id, province_id, district_id, union_council_id, contact_number) "
+            "VALUES (?, 'Primary', 1, 1, 1, 1, ?)",
+            [(f"Benchmark School {i:03d}", gen.phone()) for i in range(1, school_count + 1)]
+        )
+        conn.execute("COMMIT")
+        lookup = {'org_id': 1, 'province_id': 1, 'district_id': 1, 'union_council_id': 1}
+        
+        insert_sql = (f"INSERT INTO students ({', '.join(STUDENT_COLUMNS)}) "
+                      f"VALUES ({', '.join('?' * len(STUDENT_COLUMNS))})")
+        for start in range(1, students + 1, BATCH_SIZE):
+            end = min(start + BATCH_SIZE, students + 1)
+            conn.execute("BEGIN")
+            conn.executemany(insert_sql, (gen.student_row(i, school_count, lookup) for i in range(start, end)))
+            conn.execute("COMMIT")
+            progress(f"students: {end - 1}/{students}")
+        
+        attendance_rows = 0
+        if attendance_days:
+            school_days = []
+            day = date.today() - timedelta(days=int(attendance_days * 1.5))
+            while len(school_days) < attendance_days:
+                if day.weekday() < 5:
+                    school_days.append(day.isoformat())
+                day += timedelta(days=1)
+            
+            for start in range(1, students + 1, BATCH_SIZE):
+                end = min(start + BATCH_SIZE, students + 1)
+                conn.execute("BEGIN")
+                conn.executemany(
+                    "INSERT INTO attendance (student_id, date, status) VALUES (?, ?, ?)",
+                    ((sid, d, gen.rng.choice(ATTENDANCE_STATUSES))
+                     for sid in range(start, end) for d in school_days)
+                )
+                conn.execute("COMMIT")
+                attendance_rows += (end - start) * len(school_days)
+                progress(f"attendance: {attendance_rows}/{students * attendance_days}")
+        
+        conn.execute("ANALYZE")
+        counts = {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ('schools', 'students', 'attendance')
+        }
+        return counts
+    finally:
+        conn.close()
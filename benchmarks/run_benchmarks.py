@@ -0,0 +1,245 @@
+"""Database performance benchmark suite.
+
+Usage:
+    python -m benchmarks.run_benchmarks --size small --output results.json
+    python -m benchmarks.run_benchmarks --profile all --output profiles.json
+
+Generates (or reuses) a synthetic dataset, runs each benchmark case against a
+real ``Database`` and writes timings as JSON so runs can be compared across
+releases. With ``--profile`` the cases run once per DATABASE_CONFIG profile,
+each on a fresh copy of the dataset, to compare durability settings. Cases
+that raise are reported under ``failed`` and make the run exit with status 1.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import sqlite3
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import traceback
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Config, DATABASE_CONFIG
+from benchmarks.data_generator import PRESETS, CLASSES, SECTIONS, generate_dataset
+
+
+class BenchmarkCase:
+    """One named operation to time."""
+    
+    def __init__(self, name: str, func: Callable[[int], Any], repeat: int = None, setup: Callable = None):
+        self.name = name
+        self.func = func
+        self.repeat = repeat
+        self.setup = setup
+
+
+def _summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    p95_index = max(0, int(round(len(ordered) * 0.95)) - 1)
+    return {
+        'runs': len(ordered),
+        'min_ms': round(ordered[0] * 1000, 3),
+        'median_ms': round(statistics.median(ordered) * 1000, 3),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'p95_ms': round(ordered[p95_index] * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+
+def run_case(case: BenchmarkCase, repeat: int, warmup: int = 1) -> Dict[str, Any]:
+    """Run a case ``repeat`` times (after warmup) and summarize wall times."""
+    result = {'name': case.name}
+    runs = case.repeat or repeat
+    try:
+        if case.setup:
+            case.setup()
+        for i in range(warmup if case.repeat is None else 0):
+            case.func(i)
+        samples = []
+        for i in range(runs):
+            start = time.perf_counter()
+            case.func(i)
+            samples.append(time.perf_counter() - start)
+        result.update(_summarize(samples))
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        result['traceback'] = traceback.format_exc(limit=5)
+    return result
+
+
+def _environment() -> Dict[str, Any]:
+    try:
+        revision = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10
+        ).stdout.strip() or None
+    except Exception:
+        revision = None
+    try:
+        from version import __version__ as app_version
+    except Exception:
+        app_version = None
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'git_revision': revision,
+        'app_version': app_version,
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+    }
+
+
+def build_cases(db, rng: random.Random, student_count: int, include_backups: bool) -> List[BenchmarkCase]:
+    """Benchmark cases exercising the main Database entry points."""
+    student_ids = [f"STD{i:07d}" for i in range(1, student_count + 1)]
+    per_page = 50
+    last_page = max(1, (student_count + per_page - 1) // per_page)
+    
+    cases = [
+        BenchmarkCase('get_students.first_page', lambda i: db.get_students(page=1, per_page=per_page)),
+        BenchmarkCase('get_students.filtered', lambda i: db.get_students(
+            school_id=1 + i % 10, class_name=CLASSES[i % len(CLASSES)],
+            section=SECTIONS[i % len(SECTIONS)], status='Active', page=1, per_page=per_page)),
+        BenchmarkCase('get_students.middle_page', lambda i: db.get_students(page=max(1, last_page // 2), per_page=per_page)),
+        BenchmarkCase('get_students.deep_page', lambda i: db.get_students(page=last_page, per_page=per_page)),
+        BenchmarkCase('search_students', lambda i: db.search_students(['ali', 'khan', 'STD00001', 'zain'][i % 4])),
+        BenchmarkCase('get_student_by_id', lambda i: db.get_student_by_id(rng.choice(student_ids))),
+        BenchmarkCase('update_student', lambda i: db.update_student(
+            {'student_id': rng.choice(student_ids), 'address': f"House {i}, Benchmark Street"},
+            user_id=1, username='benchmark', user_phone='03000000000')),
+        BenchmarkCase('update_student_status.100', lambda i: db.update_student_status(
+            rng.sample(student_ids, min(100, len(student_ids))), 'Active' if i % 2 else 'Drop',
+            user_id=1, username='benchmark', user_phone='03000000000')),
+        BenchmarkCase('mark_attendance.class_of_40', lambda i: [
+            db.mark_attendance(sid, f"2099-01-{1 + i % 28:02d}", 'Present')
+            for sid in student_ids[:40]
+        ]),
+        BenchmarkCase('run_data_integrity_check', lambda i: db.run_data_integrity_check(), repeat=3),
+    ]
+    
+    if include_backups:
+        from services.backup_service import BackupManager
+        manager = BackupManager()
+        cases.extend([
+            BenchmarkCase('backup.full', lambda i: manager.create_backup(f"bench_full_{i}"), repeat=2),
+            BenchmarkCase('backup.incremental', lambda i: manager.create_incremental_backup(f"bench_inc_{i}"), repeat=3),
+        ])
+    return cases
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run SMIS database performance benchmarks")
+    parser.add_argument('--size', choices=sorted(PRESETS), default='small', help="dataset preset")
+    parser.add_argument('--students', type=int, help="override student count")
+    parser.add_argument('--attendance-days', type=int, help="override attendance days per student")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=10, help="timed runs per case")
+    parser.add_argument('--work-dir', default=os.path.join(tempfile.gettempdir(), 'smis_benchmarks'),
+                        help="where datasets, backups and scratch copies live")
+    parser.add_argument('--regenerate', action='store_true', help="rebuild the cached dataset")
+    parser.add_argument('--skip-backups', action='store_true')
+    parser.add_argument('--only', help="comma separated case names to run")
+    parser.add_argument('--profile', default=Config.DATABASE_PROFILE,
+                        help="comma separated database profiles to compare, or 'all'")
+    parser.add_argument('--output', help="write JSON results to this file (default: stdout)")
+    args = parser.parse_args(argv)
+    
+    students = args.students or PRESETS[args.size]['students']
+    attendance_days = args.attendance_days if args.attendance_days is not None else PRESETS[args.size]['attendance_days']
+    
+    os.makedirs(args.work_dir, exist_ok=True)
+    dataset_path = os.path.join(args.work_dir, f"dataset_{students}_{attendance_days}_{args.seed}.db")
+    generation_seconds = None
+    if args.regenerate or not os.path.exists(dataset_path):
+        print(f"Generating dataset: {students} students, {attendance_days} attendance days", file=sys.stderr)
+        start = time.perf_counter()
+        generate_dataset(dataset_path, students, attendance_days, seed=args.seed,
+                         progress=lambda msg: print(msg, file=sys.stderr))
+        generation_seconds = round(time.perf_counter() - start, 3)
+    
+    profiles = list(DATABASE_CONFIG['profiles']) if args.profile == 'all' else [
+        name.strip() for name in args.profile.split(',') if name.strip()
+    ]
+    unknown = [name for name in profiles if name not in DATABASE_CONFIG['profiles']]
+    if unknown:
+        parser.error(f"unknown profile(s): {', '.join(unknown)}")
+    
+    from models.database import Database
+    results = []
+    for profile in profiles:
+        # Benchmarks mutate data, so each profile runs against a fresh scratch copy of the cached dataset
+        scratch_path = os.path.join(args.work_dir, 'scratch.db')
+        for suffix in ('', '-wal', '-shm', '-journal'):
+            if os.path.exists(scratch_path + suffix):
+                os.remove(scratch_path + suffix)
+        shutil.copyfile(dataset_path, scratch_path)
+        Config.DATABASE_PATH = scratch_path
+        Config.DATABASE_BACKUP_PATH = os.path.join(args.work_dir, 'backups')
+        Config.DATABASE_PROFILE = profile
+        shutil.rmtree(Config.DATABASE_BACKUP_PATH, ignore_errors=True)
+        
+        db = Database()
+        counts = {
+            table: db.cursor.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ('students', 'attendance')
+        }
+        
+        cases = build_cases(db, random.Random(args.seed), students, include_backups=not args.skip_backups)
+        if args.only:
+            wanted = {name.strip() for name in args.only.split(',')}
+            missing = wanted - {case.name for case in cases}
+            if missing:
+                parser.error(f"unknown case(s): {', '.join(sorted(missing))}")
+            cases = [case for case in cases if case.name in wanted]
+        
+        for case in cases:
+            print(f"Running {case.name} ({profile})...", file=sys.stderr)
+            result = dict(run_case(case, args.repeat), profile=profile)
+            if 'error' in result:
+                print(f"  FAILED: {result['error']}", file=sys.stderr)
+            results.append(result)
+        db.db_conn.close()
+    
+    report = {
+        'environment': _environment(),
+        'dataset': {
+            'preset': args.size,
+            'students': counts['students'],
+            'attendance': counts['attendance'],
+            'seed': args.seed,
+            'generation_seconds': generation_seconds,
+            'database_bytes': os.path.getsize(dataset_path),
+        },
+        'repeat': args.repeat,
+        'profiles': {name: DATABASE_CONFIG['profiles'][name] for name in profiles},
+        'results': results,
+        'failed': [f"{result['name']} ({result['profile']})" for result in results if 'error' in result],
+    }
+    
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    
+    # Timings with failed cases are not comparable; fail the run so scripts notice
+    if report['failed']:
+        print(f"{len(report['failed'])} case(s) failed: {', '.join(report['failed'])}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
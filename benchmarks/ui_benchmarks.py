@@ -0,0 +1,271 @@
+"""Headless UI rendering benchmarks.
+
+Usage:
+    python -m benchmarks.ui_benchmarks --rows 5000 --output ui_results.json
+
+Runs Qt with the offscreen platform plugin against a synthetic dataset and
+measures page construction, SMISTable population, filter changes and page
+switches. Each measurement includes the time for the event loop to settle
+afterwards, and reports event-loop stalls (gaps where queued events could not
+be processed) seen while settling.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import argparse
+import tempfile
+from typing import Any, Callable, Dict, List
+
+# Must be set before any Qt import
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+os.environ.setdefault('QT_LOGGING_RULES', '*=false')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QElapsedTimer, QEventLoop, QTimer
+from PyQt5.QtWidgets import QApplication, QComboBox
+
+from config.settings import Config
+from benchmarks.data_generator import generate_dataset
+from benchmarks.run_benchmarks import _environment, _summarize
+
+# Content pages of MainWindow, in sidebar order (see MainWindow.PAGES)
+PAGES = [
+    ('dashboard', 'ui.pages.dashboard', 'DashboardPage'),
+    ('student', 'ui.pages.student', 'StudentPage'),
+    ('student_list', 'ui.pages.student_list', 'StudentListPage'),
+    ('mother_reg', 'ui.pages.mother_reg', 'MotherRegPage'),
+    ('attendance', 'ui.pages.attendance', 'AttendancePage'),
+    ('reports', 'ui.pages.reports', 'ReportsPage'),
+    ('settings', 'ui.pages.settings', 'SettingsPage'),
+]
+
+
+class EventLoopMonitor:
+    """Measures how long the event loop takes to go quiet, and the stalls on the way.
+    
+    A fast repeating timer is run inside a local event loop; any tick that
+    arrives later than ``interval_ms + stall_threshold_ms`` counts as a stall.
+    The loop exits once ``quiet_ms`` passes without a stall or at ``max_ms``.
+    """
+    
+    def __init__(self, interval_ms: int = 5, stall_threshold_ms: int = 16,
+                 quiet_ms: int = 100, max_ms: int = 5000):
+        self.interval_ms = interval_ms
+        self.stall_threshold_ms = stall_threshold_ms
+        self.quiet_ms = quiet_ms
+        self.max_ms = max_ms
+    
+    def settle(self) -> Dict[str, Any]:
+        loop = QEventLoop()
+        timer = QTimer()
+        timer.setInterval(self.interval_ms)
+        clock = QElapsedTimer()
+        state = {'last': 0, 'last_stall': 0, 'stalls': []}
+        
+        def _tick():
+            now = clock.elapsed()
+            gap = now - state['last']
+            if gap > self.interval_ms + self.stall_threshold_ms:
+                state['stalls'].append(gap)
+                state['last_stall'] = now
+            state['last'] = now
+            if now - state['last_stall'] >= self.quiet_ms or now >= self.max_ms:
+                loop.quit()
+        
+        timer.timeout.connect(_tick)
+        clock.start()
+        timer.start()
+        loop.exec_()
+        timer.stop()
+        
+        return {
+            'settle_ms': state['last_stall'],
+            'stall_count': len(state['stalls']),
+            'max_stall_ms': max(state['stalls'], default=0),
+            'total_stall_ms': sum(state['stalls']),
+        }
+
+
+class UIBenchmark:
+    """Runs UI scenarios and collects timings."""
+    
+    def __init__(self, app: QApplication, repeat: int, monitor: EventLoopMonitor):
+        self.app = app
+        self.repeat = repeat
+        self.monitor = monitor
+        self.results: List[Dict[str, Any]] = []
+    
+    def measure(self, name: str, action: Callable[[int], Any], repeat: int = None) -> Any:
+        """Time ``action`` plus event-loop settle, ``repeat`` times."""
+        result = {'name': name}
+        samples = []
+        settle = []
+        value = None
+        try:
+            for i in range(repeat or self.repeat):
+                start = time.perf_counter()
+                value = action(i)
+                call_seconds = time.perf_counter() - start
+                loop_stats = self.monitor.settle()
+                samples.append(call_seconds + loop_stats['settle_ms'] / 1000.0)
+                settle.append(loop_stats)
+            result.update(_summarize(samples))
+            result['stall_count'] = sum(s['stall_count'] for s in settle)
+            result['max_stall_ms'] = max(s['max_stall_ms'] for s in settle)
+        except Exception as e:
+            result['error'] = f"{type(e).__name__}: {e}"
+        self.results.append(result)
+        print(f"{name}: {result.get('median_ms', result.get('error'))}", file=sys.stderr)
+        return value
+    
+    def run_login_prefetch(self):
+        """Prefetch, log in, then build the first pages; none of it may drop prefetched results.
+        
+        Login writes users and sessions and every page opens its own Database,
+        so a stale count above zero means the cache is invalidated too broadly.
+        """
+        from core.auth import AuthenticationManager
+        from services.prefetch_service import get_prefetch_service
+        from utils.performance.metrics import get_metrics_registry
+        
+        metrics = get_metrics_registry()
+        auth = AuthenticationManager()
+        auth.create_user('benchmark', 'Benchmark#2025', 'admin')
+        prefetch = get_prefetch_service()
+        prefetch.invalidate()
+        
+        result = {'name': 'prefetch.login_then_pages', 'prefetched': prefetch.prefetch()}
+        hits = metrics.counter("prefetch.hits").value
+        stale = metrics.counter("prefetch.stale").value
+        if not auth.login('benchmark', 'Benchmark#2025'):
+            result['error'] = "benchmark login failed"
+        for key, module_name, class_name in PAGES[:5]:
+            module = __import__(module_name, fromlist=[class_name])
+            getattr(module, class_name)()
+            self.monitor.settle()
+        result['hits'] = metrics.counter("prefetch.hits").value - hits
+        result['stale'] = metrics.counter("prefetch.stale").value - stale
+        if result['stale'] and 'error' not in result:
+            result['error'] = f"{result['stale']} prefetched results dropped by login or page construction"
+        self.results.append(result)
+        print(f"prefetch.login_then_pages: {result['hits']} hits, {result['stale']} stale", file=sys.stderr)
+    
+    def run_page_construction(self) -> Dict[str, Any]:
+        pages = {}
+        for key, module_name, class_name in PAGES:
+            module = __import__(module_name, fromlist=[class_name])
+            page_class = getattr(module, class_name)
+            # Keep the last instance for the filter scenarios
+            pages[key] = self.measure(f"construct.{key}", lambda i, c=page_class: c(), repeat=max(1, self.repeat // 2))
+        return pages
+    
+    def run_table_population(self, rows: int):
+        from ui.components.custom_table import SMISTable
+        rng = random.Random(7)
+        headers = ["", "S#", "Name", "Father Name", "Class", "Section", "School", "Status"]
+        data = [
+            ["", f"STD{i:07d}", f"Student {i}", f"Father {i}", str(rng.randint(1, 10)),
+             rng.choice("ABCD"), f"School {rng.randint(1, 50)}", "Active"]
+            for i in range(rows)
+        ]
+        
+        for paginated in (True, False):
+            table = SMISTable(show_pagination=paginated)
+            table.setup_with_headers(headers, checkbox_column=0)
+            table.resize(1200, 700)
+            table.show()
+            label = 'paginated' if paginated else 'all_rows'
+            self.measure(f"smis_table.populate.{label}.{rows}", lambda i: table.populate_data(data, id_column=1))
+            table.close()
+    
+    def run_filter_changes(self, pages: Dict[str, Any]):
+        for key, page in pages.items():
+            if page is None:
+                continue
+            page.resize(1200, 800)
+            page.show()
+            combos = [c for c in page.findChildren(QComboBox) if c.isEnabled() and c.count() > 1]
+            if not combos:
+                page.close()
+                continue
+            
+            def _cycle(i, combos=combos):
+                combo = combos[i % len(combos)]
+                combo.setCurrentIndex(1 if combo.currentIndex() != 1 else 0)
+            
+            self.measure(f"filter_change.{key}", _cycle)
+            page.close()
+    
+    def run_main_window(self):
+        from ui.main_window import MainWindow
+        window = self.measure("construct.main_window", lambda i: MainWindow(), repeat=1)
+        if window is None:
+            return
+        window.show()
+        self.measure("main_window.first_paint", lambda i: window.repaint(), repeat=1)
+        for index, (key, _, _) in enumerate(PAGES):
+            self.measure(f"switch_page.{key}", lambda i, idx=index: window._switch_page(idx))
+        window.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run headless SMIS UI benchmarks")
+    parser.add_argument('--students', type=int, default=5000, help="students in the synthetic dataset")
+    parser.add_argument('--rows', type=int, default=5000, help="rows for SMISTable population")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--work-dir', default=os.path.join(tempfile.gettempdir(), 'smis_benchmarks'))
+    parser.add_argument('--stall-threshold-ms', type=int, default=16)
+    parser.add_argument('--skip-main-window', action='store_true')
+    parser.add_argument('--output', help="write JSON results to this file (default: stdout)")
+    args = parser.parse_args(argv)
+    
+    os.makedirs(args.work_dir, exist_ok=True)
+    dataset_path = os.path.join(args.work_dir, f"ui_dataset_{args.students}_{args.seed}.db")
+    if not os.path.exists(dataset_path):
+        generate_dataset(dataset_path, args.students, attendance_days=20, seed=args.seed,
+                         progress=lambda msg: print(msg, file=sys.stderr))
+    
+    scratch_path = os.path.join(args.work_dir, 'ui_scratch.db')
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(scratch_path + suffix):
+            os.remove(scratch_path + suffix)
+    shutil.copyfile(dataset_path, scratch_path)
+    Config.DATABASE_PATH = scratch_path
+    Config.DATABASE_BACKUP_PATH = os.path.join(args.work_dir, 'ui_backups')
+    Config.AUTO_BACKUP = False
+    
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+    app.setStyle('Fusion')
+    
+    bench = UIBenchmark(app, args.repeat, EventLoopMonitor(stall_threshold_ms=args.stall_threshold_ms))
+    bench.run_login_prefetch()
+    pages = bench.run_page_construction()
+    bench.run_table_population(args.rows)
+    bench.run_filter_changes(pages)
+    if not args.skip_main_window:
+        bench.run_main_window()
+    
+    report = {
+        'environment': _environment(),
+        'qt_platform': app.platformName(),
+        'dataset': {'students': args.students, 'table_rows': args.rows, 'seed': args.seed},
+        'repeat': args.repeat,
+        'results': bench.results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,10 +2,7 @@
 import os
 import hashlib
 import secrets
-import bcrypt
-from cryptography.fernet import Fernet
 from datetime import datetime, timedelta
-import jwt
 from typing import Tuple, List
 from config.settings import Config
 
@@ -51,6 +48,9 @@ class SecurityConfig:
     SESSION_TIMEOUT_MINUTES = int(os.getenv('SESSION_TIMEOUT_MINUTES', '60'))
     MAX_LOGIN_ATTEMPTS = int(os.getenv('MAX_LOGIN_ATTEMPTS', '5'))
     LOCKOUT_DURATION_MINUTES = int(os.getenv('LOCKOUT_DURATION_MINUTES', '30'))
+    
+    # bcrypt work factor (log2 rounds), validated at startup
+    BCRYPT_ROUNDS = Config.BCRYPT_ROUNDS
 
 class PasswordHasher:
     """Secure password hashing utility."""
@@ -58,19 +58,35 @@ class PasswordHasher:
     @staticmethod
     def hash_password(password: str) -> str:
         """Hash a password using bcrypt."""
-        salt = bcrypt.gensalt()
+        import bcrypt
+        salt = bcrypt.gensalt(rounds=SecurityConfig.BCRYPT_ROUNDS)
         hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
         return hashed.decode('utf-8')
     
     @staticmethod
     def verify_password(password: str, hashed: str) -> bool:
         """Verify a password against its hash."""
+        import bcrypt
         return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    
+    @staticmethod
+    def needs_rehash(hashed: str) -> bool:
+        """Check whether a hash was made with a lower work factor than configured.
+        
+        Hashes stronger than the setting are kept, so lowering BCRYPT_ROUNDS
+        never weakens stored passwords.
+        """
+        try:
+            # Format: $2b$<rounds>$<salt+hash>
+            return int(hashed.split('$')[2]) < SecurityConfig.BCRYPT_ROUNDS
+        except (IndexError, ValueError):
+            return False
 
 class DataEncryption:
     """Data encryption utilities."""
     
     def __init__(self):
+        from cryptography.fernet import Fernet
         self.key = self._get_or_create_key()
         self.cipher = Fernet(self.key)
     
@@ -81,6 +97,7 @@ class DataEncryption:
             with open(key_file, 'rb') as f:
                 return f.read()
         else:
+            from cryptography.fernet import Fernet
             key = Fernet.generate_key()
             os.makedirs('config', exist_ok=True)
             with open(key_file, 'wb') as f:
@@ -101,6 +118,7 @@ class JWTManager:
     @staticmethod
     def create_token(user_id: int, role: str) -> str:
         """Create JWT token for user."""
+        import jwt
         payload = {
             'user_id': user_id,
             'role': role,
@@ -112,6 +130,7 @@ class JWTManager:
     @staticmethod
     def verify_token(token: str) -> dict:
         """Verify and decode JWT token."""
+        import jwt
         try:
             payload = jwt.decode(token, SecurityConfig.JWT_SECRET, algorithms=['HS256'])
             return payload
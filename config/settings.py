@@ -34,6 +34,17 @@ def get_resource_path(relative_path):
         # Fallback to current directory
         return os.path.abspath(relative_path)
 
+def get_bcrypt_rounds() -> int:
+    """BCRYPT_ROUNDS from the environment, checked against bcrypt's 4-31 range."""
+    value = os.getenv('BCRYPT_ROUNDS', '12')
+    try:
+        rounds = int(value)
+    except ValueError:
+        raise ValueError(f"BCRYPT_ROUNDS must be a whole number from 4 to 31, got '{value}'")
+    if not 4 <= rounds <= 31:
+        raise ValueError(f"BCRYPT_ROUNDS must be from 4 to 31, got {rounds}")
+    return rounds
+
 class Config:
     """Main configuration class."""
     
@@ -51,25 +62,83 @@ class Config:
     # Database - Use absolute path in AppData for installed version
     DATABASE_PATH = os.path.join(APP_DATA_DIR, "school.db")
     DATABASE_BACKUP_PATH = os.path.join(APP_DATA_DIR, "backups")
+    DATABASE_PROFILE = os.getenv('DATABASE_PROFILE', 'safe')  # safe, balanced, fast-local or network-share (see DATABASE_CONFIG)
     BACKUP_INTERVAL_HOURS = int(os.getenv('BACKUP_INTERVAL_HOURS', '24'))
+    BACKUP_PAGES_PER_STEP = int(os.getenv('BACKUP_PAGES_PER_STEP', '256'))
+    BACKUP_CHUNK_SIZE = int(os.getenv('BACKUP_CHUNK_SIZE', '1048576'))  # 1MB
+    # Larger databases are snapshotted to a temp file instead of memory
+    BACKUP_MEMORY_SNAPSHOT_MAX_BYTES = int(os.getenv('BACKUP_MEMORY_SNAPSHOT_MAX_BYTES', str(512 * 1024 * 1024)))
+    BACKUP_CHUNK_PAGES = int(os.getenv('BACKUP_CHUNK_PAGES', '16'))  # pages per incremental chunk
+    
+    # Archive of closed academic years (see services.archive_service)
+    ARCHIVE_DIR = os.path.join(APP_DATA_DIR, "archive")
+    ACADEMIC_YEAR_START_MONTH = int(os.getenv('ACADEMIC_YEAR_START_MONTH', '4'))
+    ARCHIVE_HOT_YEARS = int(os.getenv('ARCHIVE_HOT_YEARS', '2'))  # academic years kept in school.db, incl. the current one
+    
+    # students_audit delta storage (see services.audit_service)
+    AUDIT_KEYFRAME_INTERVAL = int(os.getenv('AUDIT_KEYFRAME_INTERVAL', '10'))  # changes per student between full snapshots
+    
+    # Retention of logs and soft-deleted data (see services.retention_service); 0 days keeps forever
+    RETENTION_AUDIT_LOG_DAYS = int(os.getenv('RETENTION_AUDIT_LOG_DAYS', '365'))
+    RETENTION_ACTIVITY_LOG_DAYS = int(os.getenv('RETENTION_ACTIVITY_LOG_DAYS', '365'))
+    RETENTION_INTEGRITY_CHECK_DAYS = int(os.getenv('RETENTION_INTEGRITY_CHECK_DAYS', '90'))
+    RETENTION_SESSION_DAYS = int(os.getenv('RETENTION_SESSION_DAYS', '30'))  # counted from expiry
+    RETENTION_DELETED_STUDENT_DAYS = int(os.getenv('RETENTION_DELETED_STUDENT_DAYS', '730'))  # counted from soft delete
+    RETENTION_INTERVAL_HOURS = int(os.getenv('RETENTION_INTERVAL_HOURS', '24'))
+    RETENTION_CHUNK_ROWS = int(os.getenv('RETENTION_CHUNK_ROWS', '500'))  # largest delete per transaction
+    RETENTION_MAX_LOCK_MS = float(os.getenv('RETENTION_MAX_LOCK_MS', '5'))  # target write-lock hold per chunk
+    RETENTION_PAUSE_MS = int(os.getenv('RETENTION_PAUSE_MS', '20'))  # gap between chunks for other writers
+    RETENTION_VACUUM_PAGES = int(os.getenv('RETENTION_VACUUM_PAGES', '128'))  # pages freed per incremental_vacuum step
+    
+    # Idle-time database maintenance (see services.maintenance_service)
+    MAINTENANCE_ENABLED = os.getenv('MAINTENANCE_ENABLED', 'True').lower() == 'true'
+    MAINTENANCE_IDLE_SECONDS = int(os.getenv('MAINTENANCE_IDLE_SECONDS', '300'))  # no input for this long counts as idle
+    MAINTENANCE_POLL_SECONDS = int(os.getenv('MAINTENANCE_POLL_SECONDS', '60'))
+    MAINTENANCE_CANCEL_POLL_SECONDS = float(os.getenv('MAINTENANCE_CANCEL_POLL_SECONDS', '0.5'))  # how often a running check looks for input
+    MAINTENANCE_BUSY_TIMEOUT_MS = int(os.getenv('MAINTENANCE_BUSY_TIMEOUT_MS', '250'))  # longest wait for a lock
+    MAINTENANCE_TASK_BUDGET_SECONDS = int(os.getenv('MAINTENANCE_TASK_BUDGET_SECONDS', '120'))
+    MAINTENANCE_CHECKPOINT_MINUTES = int(os.getenv('MAINTENANCE_CHECKPOINT_MINUTES', '15'))
+    MAINTENANCE_OPTIMIZE_HOURS = int(os.getenv('MAINTENANCE_OPTIMIZE_HOURS', '6'))
+    MAINTENANCE_ANALYZE_DRIFT = float(os.getenv('MAINTENANCE_ANALYZE_DRIFT', '0.25'))  # re-ANALYZE when a table's row count moved this much
+    MAINTENANCE_ANALYSIS_LIMIT = int(os.getenv('MAINTENANCE_ANALYSIS_LIMIT', '1000'))  # rows sampled per index by ANALYZE
+    MAINTENANCE_VACUUM_HOURS = int(os.getenv('MAINTENANCE_VACUUM_HOURS', '6'))
+    # Convert older databases to incremental auto-vacuum once (a full VACUUM while idle)
+    MAINTENANCE_CONVERT_AUTO_VACUUM = os.getenv('MAINTENANCE_CONVERT_AUTO_VACUUM', 'True').lower() == 'true'
+    MAINTENANCE_INTEGRITY_HOURS = int(os.getenv('MAINTENANCE_INTEGRITY_HOURS', '24'))
+    # PRAGMA quick_check reads the whole file, so incremental checks only run it this often (0 = every run)
+    INTEGRITY_STRUCTURE_CHECK_HOURS = int(os.getenv('INTEGRITY_STRUCTURE_CHECK_HOURS', '168'))
+    # Moving closed years out to archive files is opt-in (0 = off); only turn it
+    # on where backups include the archive directory
+    MAINTENANCE_ARCHIVE_HOURS = int(os.getenv('MAINTENANCE_ARCHIVE_HOURS', '0'))
     
     # Security
     SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-change-this')
     ENCRYPTION_ENABLED = os.getenv('ENCRYPTION_ENABLED', 'True').lower() == 'true'
+    # bcrypt work factor (log2 rounds); pick with benchmarks/bcrypt_cost.py
+    BCRYPT_ROUNDS = get_bcrypt_rounds()
     
     # UI Settings
     WINDOW_TITLE = "School Management Information System"
     WINDOW_GEOMETRY = (100, 100, 1200, 800)
     THEME = os.getenv('THEME', 'modern')
+    # Pages built in the background after login (comma separated, e.g. "student_list,attendance")
+    UI_PREWARM_PAGES = [p.strip() for p in os.getenv('UI_PREWARM_PAGES', 'student_list').split(',') if p.strip()]
+    UI_PREWARM_DELAY_MS = int(os.getenv('UI_PREWARM_DELAY_MS', '1500'))
     
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     LOG_FILE_MAX_SIZE = int(os.getenv('LOG_FILE_MAX_SIZE', '10485760'))  # 10MB
     LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+    LOG_BATCH_SIZE = int(os.getenv('LOG_BATCH_SIZE', '256'))
+    LOG_FLUSH_INTERVAL_MS = int(os.getenv('LOG_FLUSH_INTERVAL_MS', '500'))
     
     # Performance
     MAX_RECORDS_PER_PAGE = int(os.getenv('MAX_RECORDS_PER_PAGE', '50'))
     CACHE_TIMEOUT_SECONDS = int(os.getenv('CACHE_TIMEOUT_SECONDS', '300'))
+    SQL_PROFILE = os.getenv('SQL_PROFILE', 'False').lower() == 'true'  # trace + EXPLAIN every statement shape
+    STARTUP_PROFILE = os.getenv('STARTUP_PROFILE', 'False').lower() == 'true'  # write init phase timings to logs
+    STARTUP_STEP_TIMEOUT_SECONDS = int(os.getenv('STARTUP_STEP_TIMEOUT_SECONDS', '120'))  # max wait for a background init step
     
     # Features
     ENABLE_AUDIT_LOG = os.getenv('ENABLE_AUDIT_LOG', 'True').lower() == 'true'
@@ -132,5 +201,62 @@ USER_ROLES = {
 DATABASE_CONFIG = {
     'timeout': 30,
     'check_same_thread': False,
-    'isolation_level': None
+    'isolation_level': None,
+    # SQLite tuning per deployment, selected by Config.DATABASE_PROFILE. Compare
+    # them on the target machine with: python -m benchmarks.run_benchmarks --profile all
+    'profiles': {
+        # Every commit synced to disk, deleted data overwritten (the pre-profile
+        # behaviour and the default; other profiles trade durability for speed)
+        'safe': {
+            'journal_mode': 'WAL',
+            'synchronous': 'FULL',
+            'secure_delete': 'ON',
+            'cache_size': -2000,  # KiB
+            'mmap_size': 0,
+            'temp_store': 'DEFAULT',
+            'cached_statements': 128,
+        },
+        # WAL with NORMAL sync cannot corrupt the file, but a power cut may lose
+        # the last commits; FAST only overwrites deleted data where it costs no I/O
+        'balanced': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'secure_delete': 'FAST',
+            'cache_size': -16384,
+            'mmap_size': 64 * 1024 * 1024,
+            'temp_store': 'MEMORY',
+            'cached_statements': 256,
+        },
+        # Single workstation on a local disk with backups running: most memory, no overwriting
+        'fast-local': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'secure_delete': 'OFF',
+            'cache_size': -65536,
+            'mmap_size': 256 * 1024 * 1024,
+            'temp_store': 'MEMORY',
+            'cached_statements': 512,
+        },
+        # Database on an SMB/NFS share: WAL's shared memory and mmap do not work
+        # across machines, so use a rollback journal and plain reads
+        'network-share': {
+            'journal_mode': 'DELETE',
+            'synchronous': 'FULL',
+            'secure_delete': 'FAST',
+            'cache_size': -16384,
+            'mmap_size': 0,
+            'temp_store': 'MEMORY',
+            'cached_statements': 256,
+        },
+    },
 }
+
+def get_database_profile(name: str = None) -> dict:
+    """Settings of a DATABASE_CONFIG profile (default: Config.DATABASE_PROFILE)."""
+    name = name or Config.DATABASE_PROFILE
+    try:
+        return DATABASE_CONFIG['profiles'][name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown database profile '{name}' (choose from {', '.join(DATABASE_CONFIG['profiles'])})"
+        )
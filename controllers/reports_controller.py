@@ -1,6 +1,5 @@
 """Reports controller implementation."""
 import logging
-import pandas as pd
 from PyQt5.QtWidgets import QMessageBox, QFileDialog, QTableWidgetItem
 from PyQt5.QtCore import Qt
 from models.database import Database
@@ -64,7 +63,8 @@ class ReportsController:
                     row_data.append(item.text() if item else "")
                 data.append(row_data)
 
-            # Create DataFrame
+            # Create DataFrame (pandas is only needed for exports)
+            import pandas as pd
             df = pd.DataFrame(data, columns=headers)
 
             # Get save location
@@ -5,6 +5,7 @@ from typing import Optional, Dict, Any
 from PyQt5.QtCore import QObject, pyqtSignal
 from config.security import PasswordHasher, JWTManager, SecurityConfig
 from models.database import Database
+from utils.performance.metrics import get_metrics_registry
 
 logger = logging.getLogger(__name__)
 
@@ -95,6 +96,9 @@ class AuthenticationManager(QObject):
                 is_active BOOLEAN DEFAULT 1,
                 FOREIGN KEY (user_id) REFERENCES users (id)
             )''')
+            self.db.cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_user_sessions_expires_at ON user_sessions(expires_at)"
+            )
             
             self.db.conn.commit()
             logger.info("User authentication tables created successfully")
@@ -103,7 +107,12 @@ class AuthenticationManager(QObject):
             raise
 
     def login(self, username: str, password: str) -> bool:
-        """Authenticate user and create session."""
+        """Authenticate user and create session.
+        
+        bcrypt verification is deliberately slow, so call this from a worker
+        thread (LoginWorker); results are reported through the user_logged_in
+        and login_failed signals, which Qt delivers to the GUI thread.
+        """
         try:
             # Check if account is locked
             if self._is_account_locked(username):
@@ -125,7 +134,9 @@ class AuthenticationManager(QObject):
                 return False
             
             # Verify password
-            if not PasswordHasher.verify_password(password, user_data[3]):
+            with get_metrics_registry().timer("auth.verify_password"):
+                password_ok = PasswordHasher.verify_password(password, user_data[3])
+            if not password_ok:
                 self._record_failed_attempt(username)
                 self.login_failed.emit("Invalid username or password.")
                 return False
@@ -143,12 +154,14 @@ class AuthenticationManager(QObject):
             # Create session token
             self.session_token = JWTManager.create_token(self.current_user.id, self.current_user.role)
             
-            # Update last login and reset failed attempts
-            self._update_last_login(self.current_user.id)
-            self._reset_failed_attempts(username)
+            # Upgrade hashes made with an older work factor while we have the password
+            new_hash = None
+            if PasswordHasher.needs_rehash(user_data[3]):
+                new_hash = PasswordHasher.hash_password(password)
             
-            # Store session in database
-            self._store_session(self.current_user.id, self.session_token)
+            # Update last login, reset failed attempts and store the session together
+            if not self._record_successful_login(self.current_user.id, self.session_token, new_hash):
+                logger.warning(f"User {username} logged in but the session was not stored")
             
             logger.info(f"User {username} logged in successfully")
             self.user_logged_in.emit(self.current_user)
@@ -286,38 +299,34 @@ class AuthenticationManager(QObject):
         except Exception as e:
             logger.error(f"Error recording failed attempt: {e}")
     
-    def _reset_failed_attempts(self, username: str):
-        """Reset failed login attempts."""
-        try:
-            self.db.cursor.execute("""
-                UPDATE users SET failed_login_attempts = 0, locked_until = NULL
-                WHERE username = ?
-            """, (username,))
-            self.db.conn.commit()
-        except Exception as e:
-            logger.error(f"Error resetting failed attempts: {e}")
-    
-    def _update_last_login(self, user_id: int):
-        """Update user's last login timestamp."""
-        try:
-            self.db.cursor.execute("""
-                UPDATE users SET last_login = ? WHERE id = ?
-            """, (datetime.now().isoformat(), user_id))
-            self.db.conn.commit()
-        except Exception as e:
-            logger.error(f"Error updating last login: {e}")
-    
-    def _store_session(self, user_id: int, token: str):
-        """Store session token in database."""
+    def _record_successful_login(self, user_id: int, token: str, new_password_hash: Optional[str] = None) -> bool:
+        """Update last login, clear failed attempts and store the session in one transaction.
+        
+        Returns False if nothing could be written; the login itself still stands.
+        """
         try:
-            expires_at = datetime.now() + timedelta(hours=SecurityConfig.JWT_EXPIRATION_HOURS)
-            self.db.cursor.execute("""
-                INSERT INTO user_sessions (user_id, token, expires_at)
-                VALUES (?, ?, ?)
-            """, (user_id, token, expires_at.isoformat()))
-            self.db.conn.commit()
+            now = datetime.now()
+            expires_at = now + timedelta(hours=SecurityConfig.JWT_EXPIRATION_HOURS)
+            with self.db.db_conn.transaction() as cursor:
+                cursor.execute("""
+                    UPDATE users SET last_login = ?, failed_login_attempts = 0, locked_until = NULL,
+                                     password_hash = COALESCE(?, password_hash)
+                    WHERE id = ?
+                """, (now.isoformat(), new_password_hash, user_id))
+                cursor.execute("""
+                    INSERT INTO user_sessions (user_id, token, expires_at)
+                    VALUES (?, ?, ?)
+                """, (user_id, token, expires_at.isoformat()))
+            if new_password_hash:
+                logger.info(f"Password hash for user {user_id} upgraded to {SecurityConfig.BCRYPT_ROUNDS} rounds")
+            return True
         except Exception as e:
-            logger.error(f"Error storing session: {e}")
+            # Rolled back as a whole: no session row, last login, lockout reset or hash upgrade
+            logger.exception(
+                f"Error recording successful login for user {user_id}"
+                f"{' (password hash upgrade not saved)' if new_password_hash else ''}: {e}"
+            )
+            return False
 
 class PermissionDecorator:
     """Decorator for checking user permissions."""
@@ -63,6 +63,10 @@ class FileOperationError(SMISException):
     """File operation errors."""
     pass
 
+class StartupError(SMISException):
+    """Application startup step failures."""
+    pass
+
 def handle_exception(exception: Exception, context: str = "Unknown") -> SMISException:
     """Convert generic exceptions to SMIS exceptions with context."""
     if isinstance(exception, SMISException):
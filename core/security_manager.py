@@ -11,11 +11,13 @@ This module implements hardcore security for SMIS application:
 import os
 import sys
 import json
+import hmac
 import hashlib
 import base64
 import sqlite3
-import requests
 import time
+import platform
+import threading
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from cryptography.fernet import Fernet
@@ -29,6 +31,11 @@ class SMISSecurityManager:
     No key = No access. Period.
     """
     
+    # PBKDF2-derived Fernet keys by (app name, salt, iterations); deriving one
+    # takes ~100 ms and every instance would otherwise repeat it
+    _derived_keys: Dict[tuple, bytes] = {}
+    _derived_keys_lock = threading.Lock()
+    
     def __init__(self):
         # Load from environment variables with fallbacks
         self.app_name = os.getenv("APP_NAME", "SMIS_SCHOOL_MANAGEMENT")
@@ -36,7 +43,9 @@ class SMISSecurityManager:
                                           "https://api.github.com/repos/YOUR_USERNAME/smis-key-generator")
         self.local_key_file = self._get_secure_key_path()
         self.registration_db = self._get_registration_db_path()
-        self.security_key = self._generate_security_key()
+        self.verification_cache_file = os.path.join(os.path.dirname(self.local_key_file), '.license_cache')
+        self.verified_key_hash: Optional[str] = None  # set by a successful verify_license()
+        self._security_key: Optional[bytes] = None
         
         # Anti-crack measures - only run in production mode
         if os.getenv("DEBUG_MODE", "False").lower() != "true":
@@ -82,6 +91,13 @@ class SMISSecurityManager:
         os.makedirs(secure_dir, exist_ok=True)
         return os.path.join(secure_dir, '.registration.db')
     
+    @property
+    def security_key(self) -> bytes:
+        """Encryption key, derived on first use so cached verifications never pay for it."""
+        if self._security_key is None:
+            self._security_key = self._generate_security_key()
+        return self._security_key
+    
     def _generate_security_key(self) -> bytes:
         """Generate security key for encryption."""
         # Use app name from environment with fallback
@@ -96,14 +112,18 @@ class SMISSecurityManager:
             iterations = int(os.getenv("SECURITY_ITERATIONS", "100000"))
         except ValueError:
             iterations = 100000
-            
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=iterations,
-        )
-        return base64.urlsafe_b64encode(kdf.derive(password))
+        
+        cache_key = (self.app_name, salt_str, iterations)
+        with self._derived_keys_lock:
+            if cache_key not in self._derived_keys:
+                kdf = PBKDF2HMAC(
+                    algorithm=hashes.SHA256(),
+                    length=32,
+                    salt=salt,
+                    iterations=iterations,
+                )
+                self._derived_keys[cache_key] = base64.urlsafe_b64encode(kdf.derive(password))
+            return self._derived_keys[cache_key]
     
     def _encrypt_data(self, data: str) -> str:
         """Encrypt sensitive data."""
@@ -329,6 +349,9 @@ class SMISSecurityManager:
                     pass  # Ignore if attrib fails
             else:
                 os.chmod(self.local_key_file, 0o600)
+            
+            # A new key invalidates any cached verification of the old one
+            self.clear_verification_cache()
                 
         except Exception as e:
             # Don't raise exception, just log and continue
@@ -364,6 +387,7 @@ class SMISSecurityManager:
             if os.path.exists(self.local_key_file):
                 os.remove(self.local_key_file)
                 print("✅ License key cleared")
+            self.clear_verification_cache()
             
             # Remove registration database
             reg_db_path = self._get_registration_db_path()
@@ -521,14 +545,14 @@ class SMISSecurityManager:
             print(f"Registration failed: {e}")
             return False
     
-    def update_login_stats(self):
+    def update_login_stats(self, key_hash: Optional[str] = None):
         """Update login statistics."""
         try:
-            key_data = self.load_stored_key()
-            if not key_data:
-                return
-            
-            key_hash = hashlib.sha256(key_data['key'].encode()).hexdigest()
+            if key_hash is None:
+                key_data = self.load_stored_key()
+                if not key_data:
+                    return
+                key_hash = hashlib.sha256(key_data['key'].encode()).hexdigest()
             
             conn = sqlite3.connect(self.registration_db)
             cursor = conn.cursor()
@@ -545,12 +569,146 @@ class SMISSecurityManager:
         except:
             pass  # Fail silently
     
-    def verify_license(self) -> bool:
+    def _verification_cache_ttl(self) -> timedelta:
+        """How long a successful verification may be reused (LICENSE_CACHE_HOURS, 0 disables)."""
+        try:
+            hours = float(os.getenv("LICENSE_CACHE_HOURS", "24"))
+        except ValueError:
+            hours = 24.0
+        return timedelta(hours=max(hours, 0.0))
+    
+    def _key_file_stat(self) -> Optional[tuple]:
+        """(mtime_ns, size) of the stored key file, or None if it is missing."""
+        try:
+            stat = os.stat(self.local_key_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _read_key_file(self) -> Optional[bytes]:
+        try:
+            with open(self.local_key_file, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def _sign_verification(self, payload: bytes, key_file_bytes: bytes) -> str:
+        """HMAC-SHA256 over the cache payload, keyed to this machine and the stored key file.
+        
+        Editing the key file, copying the cache to another machine or changing
+        the app identity all invalidate the signature.
+        """
+        salt = os.getenv("SECURITY_SALT", "smis_ultra_secure_salt_2025")
+        secret = hashlib.sha256(
+            f"{self.app_name}_{salt}_{platform.node()}_VERIFY".encode() + key_file_bytes
+        ).digest()
+        return hmac.new(secret, payload, hashlib.sha256).hexdigest()
+    
+    def _write_verification_cache(self, key_data: Dict[str, Any], key_file_bytes: bytes):
+        """Record a successful full verification for reuse on later starts."""
+        ttl = self._verification_cache_ttl()
+        if not ttl:
+            return
+        try:
+            now = datetime.now()
+            valid_until = now + ttl
+            key_expiry = datetime.fromisoformat(key_data['expires_at'].replace('Z', '+00:00'))
+            if key_expiry.tzinfo is not None:
+                key_expiry = key_expiry.astimezone().replace(tzinfo=None)
+            valid_until = min(valid_until, key_expiry)
+            
+            key_file_stat = self._key_file_stat()
+            if key_file_stat is None:
+                return
+            
+            payload = json.dumps({
+                'key_hash': hashlib.sha256(key_data['key'].encode()).hexdigest(),
+                'key_file_hash': hashlib.sha256(key_file_bytes).hexdigest(),
+                'key_file_mtime_ns': key_file_stat[0],
+                'key_file_size': key_file_stat[1],
+                'verified_at': now.isoformat(),
+                'valid_until': valid_until.isoformat(),
+            }, sort_keys=True)
+            cache = {
+                'payload': payload,
+                'signature': self._sign_verification(payload.encode(), key_file_bytes),
+            }
+            
+            tmp_path = self.verification_cache_file + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, self.verification_cache_file)
+            if os.name != 'nt':
+                os.chmod(self.verification_cache_file, 0o600)
+        except Exception as e:
+            self._log_security_event("CACHE", f"Could not write verification cache: {e}")
+    
+    def _check_verification_cache(self) -> Optional[str]:
+        """Return the key hash from a valid cached verification, or None.
+        
+        Only a file read, a SHA-256 and an HMAC: no key derivation, decryption
+        or format checks. The entry must be signed for the current key file,
+        recorded for its current modification time and size, not expired, and
+        not dated in the future (clock rolled back). Rewriting or touching the
+        key file therefore always forces a full verification.
+        """
+        if not self._verification_cache_ttl():
+            return None
+        try:
+            with open(self.verification_cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            key_file_bytes = self._read_key_file()
+            if key_file_bytes is None:
+                return None
+            
+            payload = cache['payload']
+            expected = self._sign_verification(payload.encode(), key_file_bytes)
+            if not hmac.compare_digest(expected, cache['signature']):
+                self._log_security_event("CACHE", "Verification cache signature mismatch")
+                return None
+            
+            entry = json.loads(payload)
+            if entry['key_file_hash'] != hashlib.sha256(key_file_bytes).hexdigest():
+                return None
+            if [entry['key_file_mtime_ns'], entry['key_file_size']] != list(self._key_file_stat() or ()):
+                return None
+            now = datetime.now()
+            if not datetime.fromisoformat(entry['verified_at']) <= now < datetime.fromisoformat(entry['valid_until']):
+                return None
+            return entry['key_hash']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    def clear_verification_cache(self):
+        """Forget any cached verification; the next start runs the full check."""
+        try:
+            if os.path.exists(self.verification_cache_file):
+                os.remove(self.verification_cache_file)
+        except OSError:
+            pass
+    
+    def verify_license(self, record_login: bool = True) -> bool:
         """
         Main license verification function.
         Returns True if license is valid, False otherwise.
+        
+        A full verification that succeeds is cached (signed, see
+        ``_check_verification_cache``) for LICENSE_CACHE_HOURS, capped at the
+        key's expiry, so warm starts skip decryption and re-validation.
+        
+        Args:
+            record_login: Write login statistics now. Startup passes False and
+                queues ``update_login_stats(verified_key_hash)`` as a background
+                startup step instead.
         """
+        self.verified_key_hash = None
         try:
+            # Fast path: recent signed verification of this exact key file
+            key_hash = self._check_verification_cache()
+            if key_hash:
+                self._verified(key_hash, record_login)
+                return True
+            
             # Step 1: Check for stored key
             key_data = self.load_stored_key()
             
@@ -562,6 +720,7 @@ class SMISSecurityManager:
                 # Remove expired key
                 if os.path.exists(self.local_key_file):
                     os.remove(self.local_key_file)
+                self.clear_verification_cache()
                 return False
             
             # Step 3: Verify key integrity
@@ -571,13 +730,21 @@ class SMISSecurityManager:
             if not self.validate_key_checksum(key_data['key']):
                 return False
             
-            # Step 4: Update login stats
-            self.update_login_stats()
+            # Step 4: Cache the result and update login stats
+            key_file_bytes = self._read_key_file()
+            if key_file_bytes is not None:
+                self._write_verification_cache(key_data, key_file_bytes)
+            self._verified(hashlib.sha256(key_data['key'].encode()).hexdigest(), record_login)
             
             return True
             
         except Exception:
             return False
+    
+    def _verified(self, key_hash: str, record_login: bool):
+        self.verified_key_hash = key_hash
+        if record_login:
+            self.update_login_stats(key_hash)
 
 
 def secure_app_startup() -> bool:
@@ -1,7 +1,7 @@
 """Input validation and data sanitization."""
 import re
 import logging
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, List, Any, Tuple, Optional, Callable, Iterable, Sequence
 from datetime import datetime
 from config.settings import VALIDATION_PATTERNS, REQUIRED_STUDENT_FIELDS
 
@@ -9,6 +9,47 @@ logger = logging.getLogger(__name__)
 
 from core.exceptions import ValidationError
 
+# Patterns are compiled once at import instead of on every call
+EMAIL_RE = re.compile(VALIDATION_PATTERNS["email"])
+MOBILE_RE = re.compile(VALIDATION_PATTERNS["mobile"])
+CNIC_RE = re.compile(VALIDATION_PATTERNS["cnic"])
+STUDENT_ID_RE = re.compile(r'^[A-Za-z0-9_-]+$')
+CLASS_RE = re.compile(r'^(Class\s+)?[0-9]+[A-Za-z]*$|^[A-Za-z]+\s*[0-9]*$')
+SECTION_RE = re.compile(r'^[A-Za-z0-9]$')
+IDENTIFIER_RE = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
+
+# Everything _sanitize_string strips, as one alternation: control characters,
+# SQL quoting characters, inline scripts and script URLs
+SANITIZE_RE = re.compile(
+    r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]'
+    r'|[;\'\"\\]'
+    r'|<script[^>]*>.*?</script>'
+    r'|javascript:'
+    r'|vbscript:',
+    re.IGNORECASE
+)
+
+# Everything SQLSanitizer strips: comment/terminator sequences and extended
+# procedure prefixes (case-sensitive), then whole-word SQL keywords (any case)
+SQL_PARAM_RE = re.compile(
+    r';|--|/\*|\*/|xp_|sp_'
+    r'|(?i:\b(?:DROP|DELETE|INSERT|UPDATE|CREATE|ALTER|EXEC|EXECUTE|UNION|SELECT|FROM|WHERE)\b)'
+)
+
+
+def _strip_all(pattern: re.Pattern, value: str) -> str:
+    """Remove every match of pattern, repeating until removals expose no new match.
+    
+    A single pass over the combined pattern could leave behind a sequence that
+    only forms once a neighbouring match is removed (``DR;OP`` -> ``DROP``);
+    the per-pattern loops this replaces caught most of those by running in
+    order. Clean input costs one scan.
+    """
+    while True:
+        value, count = pattern.subn('', value)
+        if not count:
+            return value
+
 class DataValidator:
     """Comprehensive data validation class."""
     
@@ -43,7 +84,7 @@ class DataValidator:
         
         email = DataValidator.validate_string(email, "Email", required=required)
         
-        if email and not re.match(VALIDATION_PATTERNS["email"], email):
+        if email and not EMAIL_RE.match(email):
             raise ValidationError("Email", "Invalid email format")
         
         return email.lower()
@@ -56,7 +97,7 @@ class DataValidator:
         
         phone = DataValidator.validate_string(phone, "Phone", required=required)
         
-        if phone and not re.match(VALIDATION_PATTERNS["mobile"], phone):
+        if phone and not MOBILE_RE.match(phone):
             raise ValidationError("Phone", "Invalid phone number format (use format: +92XXXXXXXXXX or 03XXXXXXXXX)")
         
         return phone
@@ -69,7 +110,7 @@ class DataValidator:
         
         cnic = DataValidator.validate_string(cnic, "CNIC", required=required)
         
-        if cnic and not re.match(VALIDATION_PATTERNS["cnic"], cnic):
+        if cnic and not CNIC_RE.match(cnic):
             raise ValidationError("CNIC", "Invalid CNIC format (use format: XXXXX-XXXXXXX-X)")
         
         return cnic
@@ -80,7 +121,7 @@ class DataValidator:
         student_id = DataValidator.validate_string(student_id, "Student ID", min_length=1, max_length=20)
         
         # Ensure alphanumeric only
-        if not re.match(r'^[A-Za-z0-9_-]+$', student_id):
+        if not STUDENT_ID_RE.match(student_id):
             raise ValidationError("Student ID", "Can only contain letters, numbers, hyphens, and underscores")
         
         return student_id.upper()
@@ -146,11 +187,11 @@ class DataValidator:
         section = DataValidator.validate_string(section, "Section", min_length=1, max_length=10)
         
         # Validate class format (numbers and optional text)
-        if not re.match(r'^(Class\s+)?[0-9]+[A-Za-z]*$|^[A-Za-z]+\s*[0-9]*$', class_name):
+        if not CLASS_RE.match(class_name):
             raise ValidationError("Class", "Invalid class format")
         
         # Validate section (single letter/number)
-        if not re.match(r'^[A-Za-z0-9]$', section):
+        if not SECTION_RE.match(section):
             raise ValidationError("Section", "Section must be a single letter or number")
         
         return class_name, section.upper()
@@ -161,21 +202,357 @@ class DataValidator:
         if not value:
             return ""
         
-        # Remove null bytes and control characters
-        value = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', value)
+        # Control characters, SQL quoting characters, scripts and script URLs
+        return _strip_all(SANITIZE_RE, value).strip()
         
-        # Remove potential SQL injection patterns
-        dangerous_patterns = [
-            r'[;\'\"\\]',  # SQL injection characters
-            r'<script[^>]*>.*?</script>',  # XSS scripts
-            r'javascript:',  # JavaScript URLs
-            r'vbscript:',  # VBScript URLs
+def _normalize_date(value: str) -> str:
+    """Parse a date in any accepted format to YYYY-MM-DD; raises ValueError with the message."""
+    for fmt in ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y'):
+        try:
+            parsed_date = datetime.strptime(value, fmt)
+            break
+        except ValueError:
+            continue
+    else:
+        raise ValueError("Invalid date format (use YYYY-MM-DD)")
+    
+    current_year = datetime.now().year
+    if parsed_date.year < 1900 or parsed_date.year > current_year + 10:
+        raise ValueError(f"Date year must be between 1900 and {current_year + 10}")
+    return parsed_date.strftime('%Y-%m-%d')
+
+
+_GENDERS = {'Male': 'Male', 'M': 'Male', 'Female': 'Female', 'F': 'Female', 'Other': 'Other'}
+
+
+def _normalize_gender(value: str) -> str:
+    if value not in _GENDERS:
+        raise ValueError("Must be one of: Male, Female, Other, M, F")
+    return _GENDERS[value]
+
+
+class FieldRule:
+    """Precompiled checks for one field, applied the way DataValidator does.
+    
+    A non-empty value is sanitized, length-checked, matched against
+    ``pattern``, upper-cased if ``upper`` and finally passed to ``normalize``,
+    which returns the stored value or raises ValueError with the message.
+    The first failing check is the field's error. Empty values become
+    ``empty_value``; whether they are allowed is up to the engine.
+    """
+    
+    def __init__(self, field: str, min_length: int = 1, max_length: int = 255,
+                 pattern: Optional[re.Pattern] = None, pattern_message: str = "Invalid format",
+                 upper: bool = False, normalize: Optional[Callable[[str], str]] = None,
+                 empty_value: Any = ""):
+        self.field = field
+        self.min_length = min_length
+        self.max_length = max_length
+        self.pattern = pattern
+        self.pattern_message = pattern_message
+        self.upper = upper
+        self.normalize = normalize
+        self.empty_value = empty_value
+        self.min_message = f"Must be at least {min_length} characters long"
+        self.max_message = f"Must be no more than {max_length} characters long"
+    
+    def apply(self, value: Any) -> Tuple[Any, Optional[str]]:
+        """Validate one value. Returns (clean value, error message or None)."""
+        if value is None or value == "":
+            return self.empty_value, None
+        
+        value = _strip_all(SANITIZE_RE, str(value)).strip()
+        if len(value) < self.min_length:
+            return value, self.min_message
+        if len(value) > self.max_length:
+            return value, self.max_message
+        if self.pattern is not None and not self.pattern.match(value):
+            return value, self.pattern_message
+        if self.upper:
+            value = value.upper()
+        if self.normalize is not None:
+            try:
+                value = self.normalize(value)
+            except ValueError as e:
+                return value, str(e)
+        return value, None
+
+
+class BatchValidationResult:
+    """Columnar outcome of validating many records at once."""
+    
+    def __init__(self, row_count: int, columns: Dict[str, List[Any]], errors: Dict[int, Dict[str, str]],
+                 dropped: Optional[Dict[int, set]] = None):
+        self.row_count = row_count
+        self.columns = columns    # field -> cleaned values, one per row
+        self.errors = errors      # row index -> field -> message, failing rows only
+        self.dropped = dropped or {}    # row index -> fields left out of that row's record
+    
+    @property
+    def is_valid(self) -> bool:
+        return not self.errors
+    
+    @property
+    def valid_rows(self) -> List[int]:
+        return [i for i in range(self.row_count) if i not in self.errors]
+    
+    def records(self, valid_only: bool = True) -> List[Dict[str, Any]]:
+        """Cleaned values as one dict per row."""
+        fields = list(self.columns)
+        rows = self.valid_rows if valid_only else range(self.row_count)
+        return [
+            {field: self.columns[field][i] for field in fields if field not in self.dropped.get(i, ())}
+            for i in rows
+        ]
+    
+    def error_messages(self) -> List[str]:
+        """Flat "Row N, field: message" list (rows numbered from 1)."""
+        return [
+            f"Row {row + 1}, {field}: {message}"
+            for row, fields in sorted(self.errors.items())
+            for field, message in fields.items()
         ]
         
-        for pattern in dangerous_patterns:
-            value = re.sub(pattern, '', value, flags=re.IGNORECASE)
         
-        return value.strip()
+class ValidationEngine:
+    """Validates records against precompiled FieldRules, singly or as columns.
+    
+    ``validate_columns`` takes ``{field: [value per row]}`` and returns every
+    row's errors instead of stopping at the first. Each rule runs once per
+    distinct value in a column. With ``use_pandas=True`` the sanitize, length
+    and pattern checks run as pandas string operations instead; pandas'
+    regex methods still loop in Python, so this only pays off for very wide
+    batches that are already in a DataFrame. Fields without a rule are
+    dropped unless ``default_rule`` is given.
+    
+    Each tuple in ``pairs`` names fields that are only checked together: a
+    record carrying all of them must fill each one, while a record carrying
+    only some has those fields dropped without an error.
+    """
+    
+    def __init__(self, rules: Iterable[FieldRule], required_fields: Iterable[str] = (),
+                 default_rule: Optional[FieldRule] = None,
+                 pairs: Iterable[Tuple[str, ...]] = ()):
+        self.rules = {rule.field: rule for rule in rules}
+        self.required_fields = tuple(required_fields)
+        self.default_rule = default_rule
+        self.pairs = tuple(tuple(pair) for pair in pairs)
+    
+    def _rule_for(self, field: str) -> Optional[FieldRule]:
+        rule = self.rules.get(field)
+        if rule is None and self.default_rule is not None:
+            rule = FieldRule(field, min_length=self.default_rule.min_length,
+                             max_length=self.default_rule.max_length)
+        return rule
+    
+    def validate_record(self, record: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Validate one record. Returns (validated values, field -> error message)."""
+        validated = {}
+        errors = {}
+        skipped = set()
+        required = list(self.required_fields)
+        for pair in self.pairs:
+            if all(field in record for field in pair):
+                required.extend(pair)
+            else:
+                skipped.update(field for field in pair if field not in self.required_fields)
+        for field in required:
+            if not record.get(field):
+                errors.setdefault(field, "This field is required")
+        for field, value in record.items():
+            if field in skipped:
+                continue
+            rule = self._rule_for(field)
+            if rule is None:
+                continue
+            clean, error = rule.apply(value)
+            if error and field not in errors:
+                errors[field] = error
+            validated[field] = clean
+        return validated, errors
+    
+    def validate_rows(self, rows: Sequence[Dict[str, Any]], use_pandas: bool = False) -> BatchValidationResult:
+        """Validate a list of records (e.g. import rows) column by column."""
+        fields = list(dict.fromkeys(field for row in rows for field in row))
+        columns = {field: [row.get(field) for row in rows] for field in fields}
+        partial: Dict[int, set] = {}
+        for pair in self.pairs:
+            for i, row in enumerate(rows):
+                if not all(field in row for field in pair):
+                    partial.setdefault(i, set()).update(pair)
+        return self._validate_columns(columns, use_pandas, partial)
+    
+    def validate_columns(self, columns: Dict[str, Sequence[Any]],
+                         use_pandas: bool = False) -> BatchValidationResult:
+        """Validate ``{field: values}`` where every sequence holds one value per row.
+        
+        Args:
+            columns: Column-oriented input; a pandas DataFrame works too
+            use_pandas: Use pandas string operations if pandas is installed
+        """
+        return self._validate_columns(columns, use_pandas, {})
+    
+    def _validate_columns(self, columns: Dict[str, Sequence[Any]], use_pandas: bool,
+                          partial: Dict[int, set]) -> BatchValidationResult:
+        """validate_columns, with ``partial`` mapping a row to the pairs it
+        only partly carries; those fields are dropped for that row."""
+        fields = list(columns.keys())
+        row_count = len(columns[fields[0]]) if fields else 0
+        pd = _load_pandas() if use_pandas else None
+        
+        cleaned: Dict[str, List[Any]] = {}
+        errors: Dict[int, Dict[str, str]] = {}
+        dropped: Dict[int, set] = {}
+        
+        paired = []
+        for pair in self.pairs:
+            if all(field in columns for field in pair):
+                paired.extend(pair)
+            else:
+                for i in range(row_count):
+                    dropped.setdefault(i, set()).update(pair)
+        for i, pair_fields in partial.items():
+            dropped.setdefault(i, set()).update(pair_fields)
+        
+        for field in list(self.required_fields) + paired:
+            values = columns.get(field)
+            missing = range(row_count) if values is None else [i for i, v in enumerate(values) if not v]
+            for i in missing:
+                if field in self.required_fields or field not in dropped.get(i, ()):
+                    errors.setdefault(i, {}).setdefault(field, "This field is required")
+        
+        for field in fields:
+            rule = self._rule_for(field)
+            if rule is None:
+                continue
+            if pd is not None:
+                values, messages = self._apply_vectorized(pd, rule, columns[field])
+            else:
+                values, messages = self._apply_column(rule, columns[field])
+            cleaned[field] = values
+            for i, message in enumerate(messages):
+                if message and field not in dropped.get(i, ()):
+                    errors.setdefault(i, {}).setdefault(field, message)
+        
+        return BatchValidationResult(row_count, cleaned, errors,
+                                     {i: fields for i, fields in dropped.items() if fields})
+    
+    @staticmethod
+    def _apply_column(rule: FieldRule, values: Sequence[Any]) -> Tuple[List[Any], List[Optional[str]]]:
+        """FieldRule.apply over a column, once per distinct string value.
+        
+        Import columns such as school, class, section or gender repeat a
+        handful of values across thousands of rows.
+        """
+        outcomes: Dict[Any, Tuple[Any, Optional[str]]] = {}
+        cleaned, messages = [], []
+        for value in values:
+            if value is None or isinstance(value, str):
+                outcome = outcomes.get(value)
+                if outcome is None:
+                    outcome = outcomes[value] = rule.apply(value)
+            else:
+                outcome = rule.apply(value)
+            cleaned.append(outcome[0])
+            messages.append(outcome[1])
+        return cleaned, messages
+    
+    @staticmethod
+    def _apply_vectorized(pd, rule: FieldRule, values: Sequence[Any]) -> Tuple[List[Any], List[Optional[str]]]:
+        """FieldRule.apply over a column with pandas string operations.
+        
+        The column is factorized first, so every check runs once per distinct
+        value; missing values (None/NaN) come back as code -1.
+        """
+        codes, uniques = pd.factorize(pd.Series(list(values), dtype=object))
+        series = pd.Series(uniques, dtype=object)
+        empty = series == ""
+        text = series.where(~empty, "").astype(str)
+        
+        # Same fixed point as _strip_all, re-scanning only values that changed
+        pending = ~empty
+        while pending.any():
+            stripped = text[pending].str.replace(SANITIZE_RE, '', regex=True)
+            changed = stripped != text[pending]
+            text[pending] = stripped
+            pending = pending & changed.reindex(text.index, fill_value=False)
+        text = text.str.strip()
+        
+        messages = pd.Series(None, index=series.index, dtype=object)
+        ok = ~empty
+        lengths = text.str.len()
+        for failed, message in (
+            (lengths < rule.min_length, rule.min_message),
+            (lengths > rule.max_length, rule.max_message),
+        ):
+            failed = ok & failed
+            messages[failed] = message
+            ok = ok & ~failed
+        if rule.pattern is not None:
+            failed = ok & ~text.str.match(rule.pattern).fillna(False).astype(bool)
+            messages[failed] = rule.pattern_message
+            ok = ok & ~failed
+        if rule.upper:
+            text[ok] = text[ok].str.upper()
+        
+        unique_values = text.tolist()
+        unique_messages = [m if isinstance(m, str) else None for m in messages.tolist()]
+        if rule.normalize is not None:
+            for i in ok[ok].index:
+                try:
+                    unique_values[i] = rule.normalize(unique_values[i])
+                except ValueError as e:
+                    unique_messages[i] = str(e)
+        for i in empty[empty].index:
+            unique_values[i] = rule.empty_value
+        
+        cleaned = [unique_values[code] if code >= 0 else rule.empty_value for code in codes]
+        return cleaned, [unique_messages[code] if code >= 0 else None for code in codes]
+
+
+_pandas = None
+
+
+def _load_pandas():
+    """pandas if installed (imported on first batch), else None."""
+    global _pandas
+    if _pandas is None:
+        try:
+            import pandas
+            _pandas = pandas
+        except ImportError:
+            _pandas = False
+    return _pandas or None
+
+
+# Student record rules, matching StudentDataValidator's per-field checks
+STUDENT_STRING_FIELDS = [
+    'School Name', 'Organization', 'BEMIS', 'Type of School', 'UC',
+    'B-Form Number', 'Year of Admission', "Father's Contact",
+    "Guardian's Address", 'Registration Number', 'Class Teacher',
+    'S# as per Register', "Father's Name", 'Class Status',
+    'Verification Status', 'Status', 'Remarks'
+]
+
+STUDENT_RULES = [
+    FieldRule('S#', max_length=20, pattern=STUDENT_ID_RE, upper=True,
+              pattern_message="Can only contain letters, numbers, hyphens, and underscores"),
+    FieldRule('Name', min_length=2, max_length=100),
+    FieldRule('Mobile Number', pattern=MOBILE_RE,
+              pattern_message="Invalid phone number format (use format: +92XXXXXXXXXX or 03XXXXXXXXX)"),
+    FieldRule("Father's CNIC", pattern=CNIC_RE, pattern_message="Invalid CNIC format (use format: XXXXX-XXXXXXX-X)"),
+    FieldRule('Date of Birth', normalize=_normalize_date, empty_value=None),
+    FieldRule('Gender', normalize=_normalize_gender),
+    # Class and Section are validated as a pair, like DataValidator.validate_class_section
+    FieldRule('Class 2025', max_length=50, pattern=CLASS_RE, pattern_message="Invalid class format"),
+    FieldRule('Section', max_length=10, pattern=SECTION_RE, upper=True,
+              pattern_message="Section must be a single letter or number"),
+] + [FieldRule(field) for field in STUDENT_STRING_FIELDS]
+
+STUDENT_CLASS_SECTION = ('Class 2025', 'Section')
+
+STUDENT_VALIDATION_ENGINE = ValidationEngine(STUDENT_RULES, required_fields=REQUIRED_STUDENT_FIELDS,
+                                             pairs=[STUDENT_CLASS_SECTION])
 
 class StudentDataValidator:
     """Specialized validator for student data."""
@@ -183,104 +560,29 @@ class StudentDataValidator:
     @staticmethod
     def validate_student_data(data: Dict[str, Any]) -> Dict[str, Any]:
         """Validate complete student data."""
-        errors = []
-        validated_data = {}
-        
         try:
-            # Validate required fields
-            for field in REQUIRED_STUDENT_FIELDS:
-                if field not in data or not data[field]:
-                    errors.append(ValidationError(field, "This field is required"))
-            
-            # Validate Student ID
-            if 'S#' in data:
-                try:
-                    validated_data['S#'] = DataValidator.validate_student_id(data['S#'])
-                except ValidationError as e:
-                    errors.append(e)
-            
-            # Validate Name
-            if 'Name' in data:
-                try:
-                    validated_data['Name'] = DataValidator.validate_string(
-                        data['Name'], 'Name', min_length=2, max_length=100
-                    )
-                except ValidationError as e:
-                    errors.append(e)
-            
-            # Validate Phone
-            if 'Mobile Number' in data:
-                try:
-                    validated_data['Mobile Number'] = DataValidator.validate_phone(
-                        data['Mobile Number'], required=False
-                    )
-                except ValidationError as e:
-                    errors.append(e)
-            
-            # Validate Father's CNIC
-            if "Father's CNIC" in data:
-                try:
-                    validated_data["Father's CNIC"] = DataValidator.validate_cnic(
-                        data["Father's CNIC"], required=False
-                    )
-                except ValidationError as e:
-                    errors.append(e)
-            
-            # Validate Date of Birth
-            if 'Date of Birth' in data:
-                try:
-                    validated_data['Date of Birth'] = DataValidator.validate_date(
-                        data['Date of Birth'], 'Date of Birth', required=False
-                    )
-                except ValidationError as e:
-                    errors.append(e)
-            
-            # Validate Gender
-            if 'Gender' in data:
-                try:
-                    validated_data['Gender'] = DataValidator.validate_gender(
-                        data['Gender'], required=False
-                    )
-                except ValidationError as e:
-                    errors.append(e)
-            
-            # Validate Class and Section
-            if 'Class 2025' in data and 'Section' in data:
-                try:
-                    class_name, section = DataValidator.validate_class_section(
-                        data['Class 2025'], data['Section']
-                    )
-                    validated_data['Class 2025'] = class_name
-                    validated_data['Section'] = section
-                except ValidationError as e:
-                    errors.append(e)
-            
-            # Validate other string fields
-            string_fields = [
-                'School Name', 'Organization', 'BEMIS', 'Type of School', 'UC',
-                'B-Form Number', 'Year of Admission', "Father's Contact",
-                "Guardian's Address", 'Registration Number', 'Class Teacher',
-                'S# as per Register', "Father's Name", 'Class Status',
-                'Verification Status', 'Status', 'Remarks'
-            ]
-            
-            for field in string_fields:
-                if field in data:
-                    try:
-                        validated_data[field] = DataValidator.validate_string(
-                            data[field], field, required=False, max_length=255
-                        )
-                    except ValidationError as e:
-                        errors.append(e)
+            validated_data, errors = STUDENT_VALIDATION_ENGINE.validate_record(data)
             
             if errors:
-                raise ValueError(f"Validation failed: {[str(e) for e in errors]}")
+                raise ValueError(f"Validation failed: {[f'{field}: {message}' for field, message in errors.items()]}")
             
             return validated_data
             
         except Exception as e:
             logger.error(f"Student data validation error: {e}")
             raise
+    
+    @staticmethod
+    def validate_students(rows: Sequence[Dict[str, Any]]) -> BatchValidationResult:
+        """Validate many student records (e.g. an import) in one columnar pass.
+        
+        Unlike validate_student_data this does not raise; failing rows and
+        their per-field messages are in the result's ``errors``.
+        """
+        result = STUDENT_VALIDATION_ENGINE.validate_rows(rows)
+        if result.errors:
+            logger.info(f"Student batch validation: {len(result.errors)} of {result.row_count} rows failed")
+        return result
 
 class SQLSanitizer:
     """SQL injection prevention utilities."""
@@ -291,36 +593,32 @@ class SQLSanitizer:
         if param is None:
             return ""
         
-        param_str = str(param)
-        
         # Remove dangerous SQL characters and keywords
-        dangerous_chars = [';', '--', '/*', '*/', 'xp_', 'sp_']
-        for char in dangerous_chars:
-            param_str = param_str.replace(char, '')
-        
-        # Remove SQL keywords that could be dangerous
-        sql_keywords = [
-            'DROP', 'DELETE', 'INSERT', 'UPDATE', 'CREATE', 'ALTER',
-            'EXEC', 'EXECUTE', 'UNION', 'SELECT', 'FROM', 'WHERE'
-        ]
+        return _strip_all(SQL_PARAM_RE, str(param)).strip()
         
-        for keyword in sql_keywords:
-            pattern = rf'\b{keyword}\b'
-            param_str = re.sub(pattern, '', param_str, flags=re.IGNORECASE)
-        
-        return param_str.strip()
+    @staticmethod
+    def sanitize_many(params: Iterable[Any]) -> List[str]:
+        """Sanitize many parameters, dropping empty results and duplicates (order kept)."""
+        seen = {}
+        for param in params:
+            if param is None:
+                continue
+            cleaned = _strip_all(SQL_PARAM_RE, str(param)).strip()
+            if cleaned:
+                seen.setdefault(cleaned, None)
+        return list(seen)
     
     @staticmethod
     def validate_table_name(table_name: str) -> bool:
         """Validate table name to prevent SQL injection."""
         # Only allow alphanumeric characters and underscores
-        return bool(re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', table_name))
+        return bool(IDENTIFIER_RE.match(table_name))
     
     @staticmethod
     def validate_column_name(column_name: str) -> bool:
         """Validate column name to prevent SQL injection."""
         # Only allow alphanumeric characters and underscores
-        return bool(re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', column_name))
+        return bool(IDENTIFIER_RE.match(column_name))
 
 def validate_and_sanitize_input(data: Dict[str, Any], validator_type: str = 'student') -> Dict[str, Any]:
     """Main validation and sanitization function."""
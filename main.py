@@ -47,6 +47,9 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import version information
 from version import __version__, VERSION_FULL
+from utils.performance.startup_profiler import get_startup_profiler
+
+startup_profiler = get_startup_profiler()
 
 # CRITICAL: Import security system FIRST
 from core.security_manager import secure_app_startup, register_application
@@ -54,17 +57,20 @@ from core.security_manager import secure_app_startup, register_application
 # Only import other modules if security check passes
 def import_app_modules():
     """Import application modules only after security validation."""
-    global MainWindow, LoginWindow, Database, setup_logging, log_security_event
+    global LoginWindow, Database, setup_logging, log_security_event
     global log_audit_event, setup_fonts, Config, get_auth_manager
-    global get_backup_manager, SMISException, handle_exception
+    global get_backup_manager, get_maintenance_scheduler, get_startup_orchestrator
+    global SMISException, handle_exception
     
-    from ui.main_window import MainWindow
+    # MainWindow (and its pages) is imported after login, see _show_main_window
     from ui.login_window import LoginWindow
     from models.database import Database
     from utils.logger import setup_logging, log_security_event, log_audit_event
     from utils.fonts import setup_fonts
     from core.auth import get_auth_manager
     from services.backup_service import get_backup_manager
+    from services.maintenance_service import get_maintenance_scheduler
+    from services.startup_service import get_startup_orchestrator
     from core.exceptions import SMISException, handle_exception
 
     # Import config with proper error handling for PyInstaller
@@ -89,7 +95,7 @@ class SMISApplication:
         """Initialize the SMIS application."""
         # Type annotations for better IDE support
         self.app: Optional[QApplication] = None
-        self.main_window: Optional[MainWindow] = None
+        self.main_window: Optional['MainWindow'] = None
         self.current_user: Optional[Dict[str, Any]] = None
         self.auth_manager = None
         self.backup_manager = None
@@ -100,43 +106,39 @@ class SMISApplication:
 
         try:
             # Set up logging first
-            setup_logging()
+            with startup_profiler.phase("logging_setup"):
+                setup_logging()
             logger.info(f"Starting {VERSION_FULL}")
             
             # Log application startup
             log_security_event("application_startup")
             
-            # Set Qt attributes before creating QApplication
-            QApplication.setAttribute(AA_EnableHighDpiScaling)  # type: ignore
-            QApplication.setAttribute(AA_UseHighDpiPixmaps)  # type: ignore
+            with startup_profiler.phase("qt_application"):
+                # Set Qt attributes before creating QApplication
+                QApplication.setAttribute(AA_EnableHighDpiScaling)  # type: ignore
+                QApplication.setAttribute(AA_UseHighDpiPixmaps)  # type: ignore
+                
+                # Create Qt application
+                self.app = QApplication(sys.argv)
+                self.app.setStyle('Fusion')
+                self.app.setApplicationName("School Management Information System")
+                self.app.setApplicationVersion(__version__)
+                self.app.setOrganizationName("SMIS")
             
-            # Create Qt application
-            self.app = QApplication(sys.argv)
-            self.app.setStyle('Fusion')
-            self.app.setApplicationName("School Management Information System")
-            self.app.setApplicationVersion(__version__)
-            self.app.setOrganizationName("SMIS")
+            # Database, backup service and authentication start in the
+            # background; only the actions that need them wait for them
+            self._start_background_services()
             
             # Setup fonts
-            setup_fonts()
-            
-            # Set application icon
-            self._set_application_icon()
+            with startup_profiler.phase("fonts"):
+                setup_fonts()
+                
+                # Set application icon
+                self._set_application_icon()
             
             # Initialize core services
             self._initialize_services()
             
-            # Initialize database
-            db = Database()
-            
-            # Start backup service
-            self.backup_manager = get_backup_manager()
-            if Config.AUTO_BACKUP:
-                self.backup_manager.start_scheduled_backups()
-            
-            # Initialize authentication
-            self.auth_manager = get_auth_manager()
-            
             return True
             
         except Exception as e:
@@ -146,6 +148,40 @@ class SMISApplication:
                 QMessageBox.critical(None, "Initialization Error", str(error))
             return False
     
+    def _start_background_services(self):
+        """Register dependency-ordered init steps and start them off the GUI thread."""
+        # Captured before database_init can create the file
+        self._database_existed = os.path.exists(Config.DATABASE_PATH)
+        
+        startup = get_startup_orchestrator()
+        startup.add("database_init", Database)
+        startup.add("backup_service", self._start_backup_service, depends=["database_init"])
+        startup.add("maintenance", self._start_maintenance, depends=["database_init"])
+        startup.add("auth", self._initialize_auth, depends=["database_init"])
+        startup.start()
+    
+    def _start_backup_service(self):
+        """Create the backup manager and start scheduled backups."""
+        self.backup_manager = get_backup_manager()
+        if Config.AUTO_BACKUP:
+            self.backup_manager.start_scheduled_backups()
+        return self.backup_manager
+    
+    def _start_maintenance(self):
+        """Start idle-time database maintenance."""
+        scheduler = get_maintenance_scheduler()
+        scheduler.start()
+        return scheduler
+    
+    def _initialize_auth(self):
+        """Create the authentication manager (ensures the users table exists)."""
+        auth_manager = get_auth_manager()
+        # Built on a startup thread; hand it to the GUI thread so its signals
+        # behave as if it had been created there
+        auth_manager.moveToThread(self.app.thread())  # type: ignore
+        self.auth_manager = auth_manager
+        return auth_manager
+    
     def _set_application_icon(self):
         """Set application icon."""
         try:
@@ -214,9 +250,12 @@ class SMISApplication:
     def show_login_window(self):
         """Show login window and handle authentication."""
         try:
-            login_window = LoginWindow()
-            login_window.login_successful.connect(self._on_login_successful)
+            with startup_profiler.phase("login_window"):
+                login_window = LoginWindow()
+                login_window.login_successful.connect(self._on_login_successful)
             
+            # Runs once the dialog's event loop has painted it
+            QTimer.singleShot(0, self._on_login_window_shown)
             result = login_window.exec_()
             
             if result == LoginWindow.Rejected:
@@ -232,6 +271,21 @@ class SMISApplication:
             QMessageBox.critical(None, "Login Error", str(error))
             return False
     
+    def _on_login_window_shown(self):
+        """Record time to login window, start prefetching and write the startup profile if enabled."""
+        elapsed_ms = startup_profiler.mark("login_window_shown")
+        logger.info(f"Login window shown {elapsed_ms:.0f} ms after startup")
+        
+        # Warm lookups, first student pages and dashboard KPIs while the user types
+        from services.prefetch_service import get_prefetch_service
+        get_prefetch_service().start()
+        if Config.STARTUP_PROFILE:
+            try:
+                path = startup_profiler.write_report(os.path.join(Config.APP_DATA_DIR, 'logs'))
+                logger.info(f"Startup profile written to {path}")
+            except Exception as e:
+                logger.warning(f"Failed to write startup profile: {e}")
+    
     def _on_login_successful(self, user):
         """Handle successful login and show main window."""
         try:
@@ -260,9 +314,14 @@ class SMISApplication:
                 
             # Import and apply styles
             from resources.styles import setAppStyle
+            from ui.main_window import MainWindow
+            
+            # MainWindow uses the shared backup manager
+            get_startup_orchestrator().wait("backup_service")
             
             # Create main window
-            self.main_window = MainWindow()
+            with startup_profiler.phase("main_window"):
+                self.main_window = MainWindow()
             
             # Set current user context
             self.main_window.set_current_user(self.current_user)
@@ -275,6 +334,7 @@ class SMISApplication:
             
             # Show window
             self.main_window.show()
+            startup_profiler.mark("main_window_shown")
             
             logging.info(f"Main window opened for user: {self.current_user.username}")  # type: ignore
             
@@ -297,6 +357,9 @@ class SMISApplication:
             if self.backup_manager:
                 self.backup_manager.stop_scheduled_backups()
             
+            # Stop idle-time maintenance
+            get_maintenance_scheduler().stop()
+            
             # Log application shutdown
             log_security_event("application_shutdown")
             
@@ -319,7 +382,9 @@ class SMISApplication:
             print(f"📁 Database Exists: {os.path.exists(Config.DATABASE_PATH)}")
             
             # Check if this is first time user (no users exist)
-            if self._is_first_time_user():
+            with startup_profiler.phase("first_run_check"):
+                is_first_time = self._is_first_time_user()
+            if is_first_time:
                 print("🆕 First time user detected - showing registration window")
                 if not self.show_registration_window():
                     return 1
@@ -344,19 +409,25 @@ class SMISApplication:
         """Check if this is the first time the application is being run (no users exist and no license)."""
         try:
             # Import here to avoid circular imports
-            from models.database import Database
+            import sqlite3
+            from pathlib import Path
             from config.settings import Config
             from core.security_manager import SMISSecurityManager
             
-            # Check if database file exists at the configured path
-            if not os.path.exists(Config.DATABASE_PATH):
+            # Check if database file existed before startup created it
+            if not getattr(self, '_database_existed', os.path.exists(Config.DATABASE_PATH)):
                 logging.info(f"Database file not found at {Config.DATABASE_PATH}, treating as first time user")
                 return True
             
-            # Check if any users exist in the database
-            db = Database()
-            db.cursor.execute("SELECT COUNT(*) FROM users")
-            user_count = db.cursor.fetchone()[0]
+            # Check if any users exist in the database. The schema is still being
+            # initialized in the background, so read directly without Database()
+            conn = sqlite3.connect(f"{Path(Config.DATABASE_PATH).resolve().as_uri()}?mode=ro", uri=True)
+            try:
+                user_count = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+            except sqlite3.OperationalError:
+                user_count = 0  # users table not created yet
+            finally:
+                conn.close()
             
             # Additionally check if license data exists
             security_manager = SMISSecurityManager()
@@ -386,6 +457,9 @@ class SMISApplication:
         try:
             from ui.registration_window import RegistrationWindow
             
+            # Registration writes the first user
+            get_startup_orchestrator().wait("auth")
+            
             # Show welcome message
             QMessageBox.information(
                 None,
@@ -491,7 +565,9 @@ def main():
         security_manager = SMISSecurityManager()
         
         # Check if we have a valid license
-        has_license = security_manager.verify_license()
+        with startup_profiler.phase("security_check"):
+            # Login statistics are written by a background startup step below
+            has_license = security_manager.verify_license(record_login=False)
         
         if has_license:
             print("✅ License verified successfully")
@@ -531,7 +607,11 @@ def main():
         print("Loading application modules...")
         
         # STEP 3: Import modules only after security validation
-        import_app_modules()
+        with startup_profiler.phase("import_modules"):
+            import_app_modules()
+        
+        get_startup_orchestrator().add(
+            "login_stats", lambda: security_manager.update_login_stats(security_manager.verified_key_hash))
         
         # STEP 4: Initialize application normally
         app = SMISApplication()
@@ -1,44 +1,115 @@
 """Enhanced database management with security and performance optimizations."""
+import os
+import inspect
 import sqlite3
 import logging
 from datetime import datetime
+from functools import wraps
 from typing import List, Dict, Any, Optional, Tuple
 from contextlib import contextmanager
-from config.settings import Config, DATABASE_CONFIG
+from config.settings import Config, DATABASE_CONFIG, get_database_profile
 from config.security import DataEncryption
 from core.exceptions import DatabaseError, ValidationError
 from core.validators import validate_and_sanitize_input, SQLSanitizer
 from utils.logger import log_audit_event, PerformanceLogger
+from utils.performance.metrics import normalize_operation
+from utils.performance.sql_profiler import ProfilingCursor, get_sql_profiler, write_report_on_exit
 
 logger = logging.getLogger(__name__)
 
+# Students missing BOTH complete mother info AND complete alternate guardian info.
+# Shared by the needs_mother_info generated column and the legacy fallback filter.
+MOTHER_INFO_MISSING_CONDITION = """(
+    (COALESCE(mother_name,'') = '' OR COALESCE(mother_cnic,'') = '')
+    AND
+    (COALESCE(alternate_name,'') = '' OR COALESCE(alternate_cnic,'') = ''
+     OR COALESCE(alternate_relationship_with_mother,'') = '')
+)"""
+
+# Tables read by prefetchable methods; triggers count the writes to each in table_versions
+PREFETCH_TABLES = set()
+
+def _prefetchable(*tables):
+    """Serve a read from the login-time prefetch cache when it holds a fresh result.
+    
+    ``tables`` are the tables the read depends on; a cached result is dropped
+    once any of them has been written since it was fetched.
+    """
+    PREFETCH_TABLES.update(tables)
+    
+    def decorator(method):
+        signature = inspect.signature(method)
+        
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            from services.prefetch_service import get_prefetch_service
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            key = (method.__name__,) + tuple(bound.arguments.items())[1:]
+            try:
+                hash(key)
+            except TypeError:
+                return method(self, *args, **kwargs)
+            
+            prefetch = get_prefetch_service()
+            hit, value = prefetch.lookup(key)
+            if hit:
+                return value
+            value = method(self, *args, **kwargs)
+            prefetch.record(key, value, tables)
+            return value
+        return wrapper
+    return decorator
+
 class DatabaseConnection:
     """Thread-safe database connection manager."""
     
+    # Profile settings applied as PRAGMAs, in this order
+    PROFILE_PRAGMAS = ('journal_mode', 'synchronous', 'secure_delete', 'cache_size', 'mmap_size', 'temp_store')
+    
     def __init__(self):
         self.encryption = DataEncryption() if Config.ENCRYPTION_ENABLED else None
+        # Unit of work state (see unit_of_work)
+        self._unit_depth = 0
+        self._unit_rollback_only = False
+        self._deferred_commits = 0
         self._init_connection()
     
     def _init_connection(self):
         """Initialize database connection with security settings."""
         try:
+            profile = get_database_profile()
+            new_database = not os.path.exists(Config.DATABASE_PATH) or os.path.getsize(Config.DATABASE_PATH) == 0
             self.conn = sqlite3.connect(
                 Config.DATABASE_PATH,
                 timeout=DATABASE_CONFIG['timeout'],
                 check_same_thread=DATABASE_CONFIG['check_same_thread'],
-                isolation_level=DATABASE_CONFIG['isolation_level']
+                isolation_level=DATABASE_CONFIG['isolation_level'],
+                cached_statements=profile['cached_statements']
             )
             self.conn.row_factory = sqlite3.Row
-            self.cursor = self.conn.cursor()
+            
+            if Config.SQL_PROFILE:
+                # Diagnostic mode: time every statement and sample its query plan
+                get_sql_profiler().attach(self.conn)
+                write_report_on_exit(os.path.join(Config.APP_DATA_DIR, 'logs'))
+                self.cursor = self.conn.cursor(factory=ProfilingCursor)
+            else:
+                self.cursor = self.conn.cursor()
             
             # Enable foreign key constraints
             self.cursor.execute("PRAGMA foreign_keys = ON")
             
-            # Enable WAL mode for better concurrency
-            self.cursor.execute("PRAGMA journal_mode = WAL")
+            # Let retention return freed pages in steps. Only a new file can take it
+            # without a VACUUM, and it must come before the switch to WAL; existing
+            # databases are converted by idle-time maintenance instead
+            if new_database:
+                self.cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
             
-            # Set secure deletion mode
-            self.cursor.execute("PRAGMA secure_delete = ON")
+            # Journal, sync, secure delete and memory settings of the selected profile;
+            # journal_mode has to come after auto_vacuum
+            for pragma in self.PROFILE_PRAGMAS:
+                self.cursor.execute(f"PRAGMA {pragma} = {profile[pragma]}")
             
             self.conn.commit()
             
@@ -48,7 +119,22 @@ class DatabaseConnection:
     
     @contextmanager
     def transaction(self):
-        """Context manager for database transactions."""
+        """Context manager for database transactions.
+        
+        Inside a unit of work this is a savepoint instead, so the block can
+        fail on its own without ending the enclosing transaction.
+        """
+        if self._unit_depth:
+            self.conn.execute("SAVEPOINT nested_transaction")
+            try:
+                yield self.cursor
+                self.conn.execute("RELEASE nested_transaction")
+            except Exception as e:
+                self.conn.execute("ROLLBACK TO nested_transaction")
+                self.conn.execute("RELEASE nested_transaction")
+                logger.error(f"Transaction failed: {e}")
+                raise DatabaseError(f"Transaction failed: {e}")
+            return
         try:
             self.conn.execute("BEGIN")
             yield self.cursor
@@ -58,6 +144,57 @@ class DatabaseConnection:
             logger.error(f"Transaction failed: {e}")
             raise DatabaseError(f"Transaction failed: {e}")
     
+    @contextmanager
+    def unit_of_work(self):
+        """Run every write in the block as one transaction with a single commit.
+        
+        ``commit``/``rollback`` called by Database methods inside the block are
+        deferred: the unit commits once when the block ends, and rolls back
+        everything if the block raises or any method rolled back. Units nest;
+        an inner one joins the outer transaction.
+        
+        Raises:
+            DatabaseError: If a method inside handled its own failure by rolling back
+        """
+        if self._unit_depth:
+            self._unit_depth += 1
+            try:
+                yield self.cursor
+            finally:
+                self._unit_depth -= 1
+            return
+        
+        # Take the write lock up front so the unit cannot fail halfway on a busy upgrade
+        self.conn.execute("BEGIN IMMEDIATE")
+        self._unit_depth = 1
+        self._unit_rollback_only = False
+        self._deferred_commits = 0
+        try:
+            yield self.cursor
+            if self._unit_rollback_only:
+                raise DatabaseError("Unit of work rolled back after a failed operation")
+            self.conn.commit()
+            logger.debug(f"Unit of work committed once for {self._deferred_commits} deferred commits")
+        except BaseException:
+            self.conn.rollback()
+            raise
+        finally:
+            self._unit_depth = 0
+    
+    def commit(self):
+        """Commit, unless inside a unit of work, which commits once at its end."""
+        if self._unit_depth:
+            self._deferred_commits += 1
+            return
+        self.conn.commit()
+    
+    def rollback(self):
+        """Roll back; inside a unit of work, mark the whole unit for rollback instead."""
+        if self._unit_depth:
+            self._unit_rollback_only = True
+            return
+        self.conn.rollback()
+    
     def close(self):
         """Close database connection."""
         if hasattr(self, 'conn'):
@@ -66,6 +203,42 @@ class DatabaseConnection:
 class Database:
     """Enhanced database operations with security and performance features."""
     
+    # Mother/guardian columns that may be written through the mother info APIs
+    MOTHER_INFO_COLUMNS = (
+        'household_size', 'mother_name', 'mother_marital_status', 'mother_cnic',
+        'mother_cnic_doi', 'mother_cnic_exp', 'mother_mwa', 'household_name',
+        'alternate_name', 'alternate_cnic', 'alternate_cnic_doi', 'alternate_cnic_exp',
+        'alternate_marital_status', 'alternate_mwa', 'father_phone', 'alternate_relationship_with_mother'
+    )
+    
+    # Student columns copied into students_audit when a row is snapshotted
+    AUDIT_SNAPSHOT_COLUMNS = (
+        'id', 'status', 'student_id', 'final_unique_codes', 'org_id', 'school_id',
+        'province_id', 'district_id', 'union_council_id', 'nationality_id',
+        'registration_number', 'class_teacher_name', 'student_name', 'gender',
+        'date_of_birth', 'students_bform_number', 'year_of_admission', 'year_of_admission_alt',
+        'class', 'section', 'address', 'father_name', 'father_cnic', 'father_phone',
+        'household_size', 'mother_name', 'mother_date_of_birth', 'mother_marital_status',
+        'mother_id_type', 'mother_cnic', 'mother_cnic_doi', 'mother_cnic_exp', 'mother_mwa',
+        'household_role', 'household_name', 'hh_gender', 'hh_date_of_birth', 'recipient_type',
+        'alternate_name', 'alternate_date_of_birth', 'alternate_marital_status',
+        'alternate_id_type', 'alternate_cnic', 'alternate_cnic_doi', 'alternate_cnic_exp',
+        'alternate_mwa', 'alternate_relationship_with_mother', 'created_at', 'updated_at',
+        'created_by', 'updated_by', 'created_by_username', 'updated_by_username',
+        'created_by_phone', 'updated_by_phone', 'version', 'is_deleted', 'deleted_at',
+        'deleted_by', 'deleted_by_username', 'deleted_by_phone'
+    )
+    
+    # Pre-delta audit rows: columns compared between consecutive snapshots for their history
+    LEGACY_HISTORY_FIELDS = (
+        ('student_name', 'Student Name'),
+        ('class', 'Class'),
+        ('section', 'Section'),
+        ('father_name', "Father's Name"),
+        ('father_phone', "Father's Phone"),
+        ('address', 'Address'),
+    )
+    
     def __init__(self):
         """Initialize database with enhanced security."""
         self.db_conn = DatabaseConnection()
@@ -76,6 +249,9 @@ class Database:
             self._create_tables()
             self._create_indexes()
             self._create_triggers()
+            self._create_mother_info_tracking()
+            self._create_audit_delta_storage()
+            self._register_restore_listener()
             
             # Skip dummy data insertion - clean database for production
             logger.info("Database initialized without dummy data")
@@ -298,8 +474,11 @@ class Database:
                     audit_username TEXT,
                     audit_user_phone TEXT,
                     audit_reason TEXT,
+                    audit_format TEXT NOT NULL DEFAULT 'full',
+                    audit_changes TEXT,
+                    audit_summary TEXT,
                     
-                    -- Original student data (exact copy of students table structure)
+                    -- Original student data (all columns on keyframes, identity only on deltas)
                     id INTEGER,
                     status TEXT,
                     student_id TEXT,
@@ -421,6 +600,40 @@ class Database:
                     checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )''')
                 
+                # Closed academic years moved to archive databases (see services.archive_service)
+                self.cursor.execute('''CREATE TABLE IF NOT EXISTS archive_catalog (
+                    academic_year INTEGER NOT NULL,
+                    table_name TEXT NOT NULL,
+                    file_name TEXT NOT NULL,
+                    start_date TEXT NOT NULL,
+                    end_date TEXT NOT NULL,
+                    row_count INTEGER,
+                    archived_at TIMESTAMP,
+                    PRIMARY KEY (academic_year, table_name)
+                )''')
+                
+                # How far incremental integrity checks have got (see services.integrity_service)
+                self.cursor.execute('''CREATE TABLE IF NOT EXISTS integrity_checkpoints (
+                    check_type TEXT PRIMARY KEY,
+                    checked_through TIMESTAMP NOT NULL,
+                    mode TEXT,
+                    updated_at TIMESTAMP
+                )''')
+                
+                # Write counters of the tables in PREFETCH_TABLES, kept by triggers
+                self.cursor.execute('''CREATE TABLE IF NOT EXISTS table_versions (
+                    table_name TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL DEFAULT 0
+                )''')
+                
+                # Last run of each idle-time maintenance task (see services.maintenance_service)
+                self.cursor.execute('''CREATE TABLE IF NOT EXISTS maintenance_runs (
+                    task TEXT PRIMARY KEY,
+                    last_run_at TIMESTAMP NOT NULL,
+                    duration_ms REAL,
+                    details TEXT
+                )''')
+                
                 # Student history table (used by add_student_history/get_student_history)
                 self.cursor.execute('''CREATE TABLE IF NOT EXISTS student_history (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -509,10 +722,17 @@ class Database:
                 # Attendance and audit indexes
                 "CREATE INDEX IF NOT EXISTS idx_attendance_student_date ON attendance(student_id, date)",
                 "CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance(date)",
+                "CREATE INDEX IF NOT EXISTS idx_attendance_updated_at ON attendance(updated_at)",
+                "CREATE INDEX IF NOT EXISTS idx_students_updated_at ON students(updated_at)",
                 "CREATE INDEX IF NOT EXISTS idx_audit_log_table_record ON audit_log(table_name, record_id)",
                 "CREATE INDEX IF NOT EXISTS idx_audit_log_timestamp ON audit_log(timestamp)",
                 "CREATE INDEX IF NOT EXISTS idx_activity_log_user_timestamp ON activity_log(user_id, timestamp)",
                 
+                # Retention purge lookups (see services.retention_service)
+                "CREATE INDEX IF NOT EXISTS idx_activity_log_timestamp ON activity_log(timestamp)",
+                "CREATE INDEX IF NOT EXISTS idx_data_integrity_checks_checked_at ON data_integrity_checks(checked_at)",
+                "CREATE INDEX IF NOT EXISTS idx_students_deleted_at ON students(deleted_at) WHERE is_deleted = 1",
+                
                 # Composite indexes for common queries
                 "CREATE INDEX IF NOT EXISTS idx_students_search ON students(student_name, student_id, father_name)"
             ]
@@ -524,7 +744,7 @@ class Database:
                     # Log but don't fail - some indexes might reference columns that don't exist yet
                     logger.warning(f"Could not create index: {index_sql} - {index_error}")
             
-            self.conn.commit()
+            self.db_conn.commit()
             logger.info("Database indexes created successfully")
             
         except Exception as e:
@@ -560,7 +780,22 @@ class Database:
                 END
             ''')
             
-            self.conn.commit()
+            # Count writes per table so prefetched reads of other tables stay valid
+            existing = {row[0] for row in self.cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            ).fetchall()}
+            for table in sorted(PREFETCH_TABLES & existing):
+                for event in ('INSERT', 'UPDATE', 'DELETE'):
+                    self.cursor.execute(f'''
+                        CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()}
+                        AFTER {event} ON {table}
+                        BEGIN
+                            INSERT INTO table_versions (table_name, version) VALUES ('{table}', 1)
+                            ON CONFLICT(table_name) DO UPDATE SET version = version + 1;
+                        END
+                    ''')
+            
+            self.db_conn.commit()
             logger.info("Database triggers created successfully")
             
         except Exception as e:
@@ -568,6 +803,221 @@ class Database:
             # Don't raise exception for triggers as they're not critical
             logger.warning("Continuing without database triggers")
     
+    def _create_mother_info_tracking(self):
+        """Create the needs_mother_info flag, its partial index and progress counters.
+        
+        ``needs_mother_info`` is a VIRTUAL generated column (SQLite 3.31+) so it is
+        always consistent with the row. ``mother_info_progress`` holds outstanding
+        counts per school/class and is kept current by triggers, so progress badges
+        never scan the students table.
+        """
+        self.mother_info_flag_supported = False
+        try:
+            columns = [row[1] for row in self.cursor.execute("PRAGMA table_xinfo(students)").fetchall()]
+            column_added = False
+            if 'needs_mother_info' not in columns:
+                self.cursor.execute(f"""
+                    ALTER TABLE students ADD COLUMN needs_mother_info INTEGER
+                    GENERATED ALWAYS AS (
+                        CASE WHEN is_deleted = 0 AND status = 'Active' AND {MOTHER_INFO_MISSING_CONDITION}
+                        THEN 1 ELSE 0 END
+                    ) VIRTUAL
+                """)
+                column_added = True
+            
+            self.cursor.execute('''CREATE TABLE IF NOT EXISTS mother_info_progress (
+                school_id INTEGER NOT NULL,
+                class TEXT NOT NULL DEFAULT '',
+                pending INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (school_id, class)
+            )''')
+            
+            self.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_students_needs_mother_info
+                ON students(class, section, student_name) WHERE needs_mother_info = 1
+            """)
+            
+            self.cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS mother_info_progress_insert
+                AFTER INSERT ON students
+                FOR EACH ROW WHEN NEW.needs_mother_info = 1
+                BEGIN
+                    INSERT INTO mother_info_progress (school_id, class, pending)
+                    VALUES (NEW.school_id, COALESCE(NEW.class, ''), 1)
+                    ON CONFLICT(school_id, class) DO UPDATE
+                    SET pending = pending + 1, updated_at = CURRENT_TIMESTAMP;
+                END
+            ''')
+            
+            self.cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS mother_info_progress_update
+                AFTER UPDATE OF mother_name, mother_cnic, alternate_name, alternate_cnic,
+                    alternate_relationship_with_mother, status, is_deleted, school_id, class
+                ON students
+                FOR EACH ROW WHEN OLD.needs_mother_info = 1 OR NEW.needs_mother_info = 1
+                BEGIN
+                    UPDATE mother_info_progress
+                    SET pending = pending - 1, updated_at = CURRENT_TIMESTAMP
+                    WHERE OLD.needs_mother_info = 1
+                    AND school_id = OLD.school_id AND class = COALESCE(OLD.class, '');
+                    
+                    INSERT INTO mother_info_progress (school_id, class, pending)
+                    SELECT NEW.school_id, COALESCE(NEW.class, ''), 1
+                    WHERE NEW.needs_mother_info = 1
+                    ON CONFLICT(school_id, class) DO UPDATE
+                    SET pending = pending + 1, updated_at = CURRENT_TIMESTAMP;
+                END
+            ''')
+            
+            self.cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS mother_info_progress_delete
+                AFTER DELETE ON students
+                FOR EACH ROW WHEN OLD.needs_mother_info = 1
+                BEGIN
+                    UPDATE mother_info_progress
+                    SET pending = pending - 1, updated_at = CURRENT_TIMESTAMP
+                    WHERE school_id = OLD.school_id AND class = COALESCE(OLD.class, '');
+                END
+            ''')
+            
+            self.db_conn.commit()
+            self.mother_info_flag_supported = True
+            
+            if column_added:
+                self.rebuild_mother_info_progress()
+            
+            logger.info("Mother info tracking initialized")
+        
+        except Exception as e:
+            logger.error(f"Error creating mother info tracking: {e}")
+            # Older SQLite builds lack generated columns - fall back to the inline condition
+            logger.warning("Continuing without needs_mother_info flag - worklist queries will scan")
+    
+    def _create_audit_delta_storage(self):
+        """Add the delta-encoding and summary columns to students_audit and their indexes.
+        
+        Existing rows keep ``audit_format = 'full'`` until ``compact_student_audit``
+        (or the 3.0 schema migration) converts them. ``idx_students_audit_timeline``
+        covers the history list, so a page of history is an index range scan.
+        """
+        try:
+            from services.audit_service import register_sql_functions
+            register_sql_functions(self.conn)
+            
+            columns = [row[1] for row in self.cursor.execute("PRAGMA table_info(students_audit)").fetchall()]
+            if 'audit_format' not in columns:
+                self.cursor.execute("ALTER TABLE students_audit ADD COLUMN audit_format TEXT NOT NULL DEFAULT 'full'")
+            if 'audit_changes' not in columns:
+                self.cursor.execute("ALTER TABLE students_audit ADD COLUMN audit_changes TEXT")
+            if 'audit_summary' not in columns:
+                self.cursor.execute("ALTER TABLE students_audit ADD COLUMN audit_summary TEXT")
+            
+            self.cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_students_audit_record "
+                "ON students_audit(original_record_id, audit_format, audit_id)"
+            )
+            self.cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_students_audit_timeline "
+                "ON students_audit(student_id, audit_timestamp, audit_id, audit_action, audit_username, audit_summary)"
+            )
+            self.db_conn.commit()
+        except Exception as e:
+            logger.error(f"Error creating audit delta storage: {e}")
+            raise DatabaseError(f"Failed to prepare students_audit for delta storage: {e}")
+    
+    def _register_restore_listener(self):
+        """Re-check restored schema features when a backup is restored online."""
+        try:
+            from services.backup_service import register_restore_listener
+            register_restore_listener(self._on_database_restored)
+        except Exception as e:
+            logger.warning(f"Could not register restore listener: {e}")
+    
+    def _on_database_restored(self, backup_path: str):
+        """Refresh state derived from the schema after an online restore.
+        
+        An older backup may predate tables, indexes or triggers added since, so
+        the idempotent schema steps run again in their startup order.
+        """
+        logger.info(f"Database restored from {backup_path}; refreshing derived state")
+        self._create_tables()
+        self._create_indexes()
+        self._create_triggers()
+        self._create_mother_info_tracking()
+        self._create_audit_delta_storage()
+    
+    def unit_of_work(self):
+        """Group the writes of one user action into a single transaction and commit.
+        
+        Methods called inside (save_student, update_student, mark_attendance,
+        add_student_history, ...) skip their own commits; see
+        DatabaseConnection.unit_of_work for the rollback rules.
+        
+        Example:
+            with db.unit_of_work():
+                db.update_student(data, user_id, username, user_phone)
+                db.add_student_history(...)
+        """
+        return self.db_conn.unit_of_work()
+    
+    def mother_info_filter_sql(self) -> str:
+        """Return the WHERE fragment selecting students that still need mother info."""
+        if getattr(self, 'mother_info_flag_supported', False):
+            return "needs_mother_info = 1"
+        return f"is_deleted = 0 AND status = 'Active' AND {MOTHER_INFO_MISSING_CONDITION}"
+    
+    def rebuild_mother_info_progress(self) -> int:
+        """Recompute mother_info_progress from the students table. Returns total pending."""
+        try:
+            with self.db_conn.transaction():
+                self.cursor.execute("DELETE FROM mother_info_progress")
+                self.cursor.execute(f"""
+                    INSERT INTO mother_info_progress (school_id, class, pending)
+                    SELECT school_id, COALESCE(class, ''), COUNT(*)
+                    FROM students
+                    WHERE {self.mother_info_filter_sql()}
+                    GROUP BY school_id, COALESCE(class, '')
+                """)
+            self.cursor.execute("SELECT COALESCE(SUM(pending), 0) FROM mother_info_progress")
+            total = self.cursor.fetchone()[0]
+            logger.info(f"Mother info progress rebuilt: {total} students pending")
+            return total
+        except Exception as e:
+            logger.error(f"Error rebuilding mother info progress: {e}")
+            return 0
+    
+    def get_mother_info_progress(self, school_id=None, class_name=None) -> List[Dict[str, Any]]:
+        """Get outstanding mother-info counts per school/class without scanning students."""
+        try:
+            if getattr(self, 'mother_info_flag_supported', False):
+                query = "SELECT school_id, class, pending FROM mother_info_progress WHERE pending > 0"
+            else:
+                query = f"""
+                    SELECT school_id, class, pending FROM (
+                        SELECT school_id, COALESCE(class, '') AS class, COUNT(*) AS pending
+                        FROM students WHERE {self.mother_info_filter_sql()}
+                        GROUP BY school_id, COALESCE(class, '')
+                    ) WHERE pending > 0
+                """
+            params = []
+            
+            if school_id and school_id != "All Schools":
+                query += " AND school_id = ?"
+                params.append(school_id)
+            
+            if class_name and class_name != "All Classes":
+                query += " AND class = ?"
+                params.append(class_name)
+            
+            query += " ORDER BY school_id, class"
+            
+            self.cursor.execute(query, params)
+            return [dict(row) for row in self.cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error getting mother info progress: {e}")
+            return []
+
     def execute_secure_query(self, query: str, params: Tuple = (), 
                            user_id: int = None) -> List[sqlite3.Row]:
         """Execute query with security validation and logging."""
@@ -580,13 +1030,14 @@ class Database:
             if user_id and Config.ENABLE_AUDIT_LOG:
                 log_audit_event("database_query", user_id, "database", details={'query': query})
             
-            with PerformanceLogger(f"Database Query: {query[:50]}..."):
+            with PerformanceLogger(f"Database Query: {query[:50]}...",
+                                   metric_name=f"db.query: {normalize_operation(query)}"):
                 self.cursor.execute(query, params)
                 
                 if query.strip().upper().startswith('SELECT'):
                     return self.cursor.fetchall()
                 else:
-                    self.conn.commit()
+                    self.db_conn.commit()
                     return []
                     
         except Exception as e:
@@ -616,6 +1067,7 @@ class Database:
         return True
 
     
+    @_prefetchable('students', 'schools', 'organizations', 'provinces', 'districts', 'union_councils')
     def get_students(self, school_id=None, class_name=None, section=None, status=None,
                     page: int = 1, per_page: int = None, user_id: int = None) -> Dict[str, Any]:
         """Get filtered and paginated list of students with enhanced security."""
@@ -745,6 +1197,48 @@ class Database:
             logger.error(f"Error searching students: {e}")
             return []
     
+    @_prefetchable('students')
+    def get_total_students(self) -> int:
+        """Count active, non-deleted students."""
+        try:
+            self.cursor.execute(
+                "SELECT COUNT(*) FROM students WHERE is_deleted = 0 AND LOWER(status) = 'active'"
+            )
+            return self.cursor.fetchone()[0]
+        except Exception as e:
+            logger.error(f"Error counting students: {e}")
+            return 0
+    
+    @_prefetchable('attendance')
+    def get_attendance_rate(self, days: int = 30) -> float:
+        """Percentage of Present/Late attendance marks over the last ``days`` days."""
+        try:
+            self.cursor.execute("""
+                SELECT COUNT(*), COALESCE(SUM(status IN ('Present', 'Late')), 0)
+                FROM attendance
+                WHERE date >= DATE('now', ?)
+            """, (f"-{int(days)} days",))
+            total, attended = self.cursor.fetchone()
+            return (attended * 100.0 / total) if total else 0.0
+        except Exception as e:
+            logger.error(f"Error getting attendance rate: {e}")
+            return 0.0
+    
+    @_prefetchable('students')
+    def get_active_classes(self) -> int:
+        """Count distinct school/class/section groups with active students."""
+        try:
+            self.cursor.execute("""
+                SELECT COUNT(*) FROM (
+                    SELECT DISTINCT school_id, class, section FROM students
+                    WHERE is_deleted = 0 AND LOWER(status) = 'active'
+                )
+            """)
+            return self.cursor.fetchone()[0]
+        except Exception as e:
+            logger.error(f"Error counting active classes: {e}")
+            return 0
+    
     def save_student(self, data: Dict[str, Any], user_id: int = None, username: str = None, user_phone: str = None) -> int:
         """Save a new student record with validation and auditing."""
         try:
@@ -826,7 +1320,7 @@ class Database:
             )
             
             self.cursor.execute(insert_sql, values)
-            self.conn.commit()
+            self.db_conn.commit()
             
             student_id = self.cursor.lastrowid
             logger.info(f"Student created successfully: {data.get('student_id')} by {username}")
@@ -848,9 +1342,6 @@ class Database:
             if not original_student:
                 raise ValueError(f"Student not found: {student_id}")
             
-            # Save original record to audit table before updating
-            self._save_student_to_audit(original_student, 'UPDATE', user_id, username, user_phone, 'Student record update')
-            
             # Build update query dynamically based on provided data
             update_fields = []
             values = []
@@ -911,6 +1402,14 @@ class Database:
                 logger.info(f"No fields to update for student: {student_id}")
                 return True  # Nothing to update
             
+            # Save original record (or just what changes) to audit table before updating
+            from services.audit_service import diff_snapshots
+            changes = diff_snapshots(original_student, {
+                db_field: data[key] for key, db_field in field_mappings.items() if data.get(key) is not None
+            })
+            self._save_student_to_audit(original_student, 'UPDATE', user_id, username, user_phone,
+                                        'Student record update', changes)
+            
             # Add audit fields
             update_fields.extend([
                 "updated_by = ?",
@@ -936,7 +1435,7 @@ class Database:
             if self.cursor.rowcount == 0:
                 raise ValueError(f"No student record updated. Student {student_id} may not exist or is deleted.")
             
-            self.conn.commit()
+            self.db_conn.commit()
             
             # Log the successful update
             logger.info(f"Student updated successfully: {student_id} by {username}")
@@ -948,7 +1447,7 @@ class Database:
             logger.error(f"Error updating student: {e}")
             print(f"❌ Error updating student: {e}")
             if self.conn:
-                self.conn.rollback()
+                self.db_conn.rollback()
             return False
     
     def update_student_status(self, student_ids: list, new_status: str, user_id: int = None, username: str = None, user_phone: str = None) -> bool:
@@ -989,7 +1488,8 @@ class Database:
                         user_id, 
                         username, 
                         user_phone, 
-                        f'Status changed from {original_student.get("status", "Unknown")} to {new_status}'
+                        f'Status changed from {original_student.get("status", "Unknown")} to {new_status}',
+                        {'status': [original_student.get('status'), db_status]}
                     )
                     
                     # Update the student status
@@ -1019,7 +1519,7 @@ class Database:
                     continue
             
             # Commit all changes
-            self.conn.commit()
+            self.db_conn.commit()
             
             # Log results
             if updated_count > 0:
@@ -1036,66 +1536,41 @@ class Database:
             logger.error(f"Error in bulk status update: {e}")
             print(f"❌ Error in bulk status update: {e}")
             if self.conn:
-                self.conn.rollback()
+                self.db_conn.rollback()
             return False
     
-    def _save_student_to_audit(self, original_data: Dict[str, Any], action: str, user_id: int = None, username: str = None, user_phone: str = None, reason: str = ""):
-        """Save the original student record to audit table before modification."""
+    def _save_student_to_audit(self, original_data: Dict[str, Any], action: str, user_id: int = None, username: str = None, user_phone: str = None, reason: str = "", changes: Optional[Dict[str, List[Any]]] = None):
+        """Record a student change in the audit table before it is applied.
+        
+        ``changes`` is the change set ``{column: [old, new]}``. Deletes, changes
+        without a change set and every ``Config.AUDIT_KEYFRAME_INTERVAL``-th change
+        of a student store the whole original row as a keyframe; other changes
+        store only the change set.
+        """
         try:
-            audit_sql = """
+            from services.audit_service import (AUDIT_IDENTITY_COLUMNS, encode_changes,
+                                                keyframe_due_sql, summarize_changes)
+            
+            action = action.upper()
+            record_id = original_data.get('id')
+            keyframe = action == 'DELETE' or changes is None
+            if not keyframe:
+                self.cursor.execute(f"SELECT {keyframe_due_sql('r.id')} FROM (SELECT ? AS id) r", (record_id,))
+                keyframe = bool(self.cursor.fetchone()[0])
+            
+            columns = self.AUDIT_SNAPSHOT_COLUMNS if keyframe else AUDIT_IDENTITY_COLUMNS
+            audit_sql = f"""
                 INSERT INTO students_audit (
-                    original_record_id, audit_action, audit_user_id, audit_username, 
-                    audit_user_phone, audit_reason,
-                    id, status, student_id, final_unique_codes, org_id, school_id,
-                    province_id, district_id, union_council_id, nationality_id,
-                    registration_number, class_teacher_name, student_name, gender,
-                    date_of_birth, students_bform_number, year_of_admission, year_of_admission_alt,
-                    class, section, address, father_name, father_cnic, father_phone,
-                    household_size, mother_name, mother_date_of_birth, mother_marital_status,
-                    mother_id_type, mother_cnic, mother_cnic_doi, mother_cnic_exp, mother_mwa,
-                    household_role, household_name, hh_gender, hh_date_of_birth, recipient_type,
-                    alternate_name, alternate_date_of_birth, alternate_marital_status,
-                    alternate_id_type, alternate_cnic, alternate_cnic_doi, alternate_cnic_exp,
-                    alternate_mwa, alternate_relationship_with_mother, created_at, updated_at,
-                    created_by, updated_by, created_by_username, updated_by_username,
-                    created_by_phone, updated_by_phone, version, is_deleted, deleted_at, 
-                    deleted_by, deleted_by_username, deleted_by_phone
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    original_record_id, audit_action, audit_user_id, audit_username,
+                    audit_user_phone, audit_reason, audit_format, audit_changes, audit_summary,
+                    {', '.join(columns)}
+                ) VALUES ({', '.join(['?'] * (9 + len(columns)))})
             """
-            
-            audit_values = (
-                original_data.get('id'), action, user_id, username, user_phone, reason,
-                original_data.get('id'), original_data.get('status'), original_data.get('student_id'),
-                original_data.get('final_unique_codes'), original_data.get('org_id'), 
-                original_data.get('school_id'), original_data.get('province_id'),
-                original_data.get('district_id'), original_data.get('union_council_id'),
-                original_data.get('nationality_id'), original_data.get('registration_number'),
-                original_data.get('class_teacher_name'), original_data.get('student_name'),
-                original_data.get('gender'), original_data.get('date_of_birth'),
-                original_data.get('students_bform_number'), original_data.get('year_of_admission'),
-                original_data.get('year_of_admission_alt'), original_data.get('class'),
-                original_data.get('section'), original_data.get('address'),
-                original_data.get('father_name'), original_data.get('father_cnic'),
-                original_data.get('father_phone'), original_data.get('household_size'),
-                original_data.get('mother_name'), original_data.get('mother_date_of_birth'),
-                original_data.get('mother_marital_status'), original_data.get('mother_id_type'),
-                original_data.get('mother_cnic'), original_data.get('mother_cnic_doi'),
-                original_data.get('mother_cnic_exp'), original_data.get('mother_mwa'),
-                original_data.get('household_role'), original_data.get('household_name'),
-                original_data.get('hh_gender'), original_data.get('hh_date_of_birth'),
-                original_data.get('recipient_type'), original_data.get('alternate_name'),
-                original_data.get('alternate_date_of_birth'), original_data.get('alternate_marital_status'),
-                original_data.get('alternate_id_type'), original_data.get('alternate_cnic'),
-                original_data.get('alternate_cnic_doi'), original_data.get('alternate_cnic_exp'),
-                original_data.get('alternate_mwa'), original_data.get('alternate_relationship_with_mother'),
-                original_data.get('created_at'), original_data.get('updated_at'),
-                original_data.get('created_by'), original_data.get('updated_by'),
-                original_data.get('created_by_username'), original_data.get('updated_by_username'),
-                original_data.get('created_by_phone'), original_data.get('updated_by_phone'),
-                original_data.get('version'), original_data.get('is_deleted'), 
-                original_data.get('deleted_at'), original_data.get('deleted_by'),
-                original_data.get('deleted_by_username'), original_data.get('deleted_by_phone')
-            )
+            audit_values = [
+                record_id, action, user_id, username, user_phone, reason,
+                'keyframe' if keyframe else 'delta', encode_changes(changes),
+                summarize_changes(changes) if changes is not None else None
+            ] + [original_data.get(column) for column in columns]
             
             self.cursor.execute(audit_sql, audit_values)
             logger.info(f"Original student record saved to audit: {original_data.get('student_id')} by {username}")
@@ -1121,13 +1596,16 @@ class Database:
             
             if original_record:
                 # Save original record to audit table before deletion
+                original_record = dict(original_record)
                 self._save_student_to_audit(
                     original_record, 
                     action='delete',
                     user_id=user_id,
                     username=username,
                     user_phone=user_phone,
-                    reason=f'Student deleted by {username}'
+                    reason=f'Student deleted by {username}',
+                    changes={'is_deleted': [original_record.get('is_deleted'), 1],
+                             'status': [original_record.get('status'), 'inactive']}
                 )
             
             # Soft delete - mark as deleted instead of actual deletion
@@ -1139,7 +1617,7 @@ class Database:
             """
             
             self.cursor.execute(delete_sql, (user_id, username, user_phone, user_id, username, user_phone, student_id))
-            self.conn.commit()
+            self.db_conn.commit()
             
             logger.info(f"Student soft deleted successfully: {student_id} by {username}")
             return True
@@ -1231,140 +1709,34 @@ class Database:
         """Get fields that changed between old and new data."""
         return {}  # Simplified - no change tracking for now
     
-    def run_data_integrity_check(self) -> Dict[str, Any]:
-        """Run comprehensive data integrity checks."""
-        try:
-            results = {
-                'passed': 0,
-                'failed': 0,
-                'warnings': 0,
-                'checks': []
-            }
-            
-            # Check for duplicate student numbers
-            check_result = self._check_duplicate_student_numbers()
-            results['checks'].append(check_result)
-            results[check_result['status']] += 1
-            
-            # Check for orphaned attendance records
-            check_result = self._check_orphaned_attendance()
-            results['checks'].append(check_result)
-            results[check_result['status']] += 1
-            
-            # Check for invalid dates
-            check_result = self._check_invalid_dates()
-            results['checks'].append(check_result)
-            results[check_result['status']] += 1
-            
-            # Store check results
-            with self.db_conn.transaction():
-                for check in results['checks']:
-                    self.cursor.execute("""
-                        INSERT INTO data_integrity_checks (check_type, status, details)
-                        VALUES (?, ?, ?)
-                    """, (check['name'], check['status'], check['details']))
-            
-            return results
-            
-        except Exception as e:
-            logger.error(f"Data integrity check failed: {e}")
-            raise DatabaseError(f"Data integrity check failed: {e}")
+    def run_data_integrity_check(self, incremental: bool = False) -> Dict[str, Any]:
+        """Run comprehensive data integrity checks.
+        
+        Synchronous; from the GUI use IntegrityCheckService on a worker thread.
+        """
+        from services.integrity_service import IntegrityCheckService
+        return IntegrityCheckService().run(incremental=incremental)
     
-    def _check_duplicate_student_numbers(self) -> Dict[str, Any]:
-        """Check for duplicate student IDs."""
-        try:
-            query = """
-                SELECT student_id, COUNT(*) as count 
-                FROM students 
-                WHERE is_deleted = 0 
-                GROUP BY student_id 
-                HAVING COUNT(*) > 1
-            """
-            duplicates = self.execute_secure_query(query)
-            
-            if duplicates:
-                return {
-                    'name': 'Duplicate Student Numbers',
-                    'status': 'failed',
-                    'details': f"Found {len(duplicates)} duplicate student numbers"
-                }
-            else:
-                return {
-                    'name': 'Duplicate Student Numbers',
-                    'status': 'passed',
-                    'details': 'No duplicate student numbers found'
-                }
-        except Exception:
-            return {
-                'name': 'Duplicate Student Numbers',
-                'status': 'failed',
-                'details': 'Check failed due to error'
-            }
+    def purge_expired_data(self, time_budget: Optional[float] = None) -> Dict[str, Any]:
+        """Apply the retention periods to logs and soft-deleted students (see RetentionService)."""
+        from services.retention_service import get_retention_service
+        return get_retention_service().run(time_budget=time_budget)
     
-    def _check_orphaned_attendance(self) -> Dict[str, Any]:
-        """Check for orphaned attendance records."""
-        try:
-            query = """
-                SELECT COUNT(*) 
-                FROM attendance a 
-                LEFT JOIN students s ON a.student_id = s.id 
-                WHERE s.id IS NULL
-            """
-            result = self.execute_secure_query(query)
-            orphaned_count = result[0][0]
-            
-            if orphaned_count > 0:
-                return {
-                    'name': 'Orphaned Attendance Records',
-                    'status': 'warning',
-                    'details': f"Found {orphaned_count} orphaned attendance records"
-                }
-            else:
-                return {
-                    'name': 'Orphaned Attendance Records',
-                    'status': 'passed',
-                    'details': 'No orphaned attendance records found'
-                }
-        except Exception:
-            return {
-                'name': 'Orphaned Attendance Records',
-                'status': 'failed',
-                'details': 'Check failed due to error'
-            }
+    def compact_student_audit(self, batch_size: int = 200) -> Dict[str, Any]:
+        """Convert full-copy students_audit rows to keyframes and deltas."""
+        from services.audit_service import StudentAuditService
+        return StudentAuditService().compact(batch_size=batch_size)
     
-    def _check_invalid_dates(self) -> Dict[str, Any]:
-        """Check for invalid date formats."""
+    def get_student_audit_snapshot(self, audit_id: int) -> Optional[Dict[str, Any]]:
+        """The student row as it was before the given audit entry, rebuilt from keyframes and deltas."""
         try:
-            # This is a simplified check - you could make it more comprehensive
-            query = """
-                SELECT COUNT(*) 
-                FROM students 
-                WHERE dob IS NOT NULL 
-                AND dob != '' 
-                AND status = 'active'
-                AND (length(dob) != 10 OR dob NOT LIKE '____-__-__')
-            """
-            result = self.execute_secure_query(query)
-            invalid_count = result[0][0]
-            
-            if invalid_count > 0:
-                return {
-                    'name': 'Invalid Date Formats',
-                    'status': 'warning',
-                    'details': f"Found {invalid_count} records with invalid date formats"
-                }
-            else:
-                return {
-                    'name': 'Invalid Date Formats',
-                    'status': 'passed',
-                    'details': 'All date formats are valid'
-                }
-        except Exception:
-            return {
-                'name': 'Invalid Date Formats',
-                'status': 'failed',
-                'details': 'Check failed due to error'
-            }
+            from services.archive_service import get_archive_service
+            from services.audit_service import get_student_audit_service
+            source = get_archive_service().relation_for(self.conn, 'students_audit')
+            return get_student_audit_service().snapshot(self.conn, audit_id, source)
+        except Exception as e:
+            logger.error(f"Error rebuilding audit snapshot {audit_id}: {e}")
+            return None
     
     def close(self):
         """Close database connection."""
@@ -1377,6 +1749,7 @@ class Database:
     #     logging.info("Dummy data insertion is disabled - production mode")
     #     pass
 
+    @_prefetchable('schools')
     def get_schools(self):
         """Get all schools from schools table."""
         try:
@@ -1443,6 +1816,7 @@ class Database:
             logging.error(f"Error getting school organizational data: {e}")
             return None
 
+    @_prefetchable('classes', 'students')
     def get_classes(self, school_id=None):
         """Get classes from classes table."""
         try:
@@ -1475,6 +1849,7 @@ class Database:
                 logging.error(f"Error getting classes from students table: {fallback_error}")
                 return []
 
+    @_prefetchable('sections', 'students')
     def get_sections(self, school_id=None, class_name=None):
         """Get sections from sections table."""
         try:
@@ -1511,6 +1886,7 @@ class Database:
                 logging.error(f"Error getting sections from students table: {fallback_error}")
                 return []
 
+    @_prefetchable('organizations')
     def get_organizations(self):
         """Get all organizations from organizations table."""
         try:
@@ -1524,6 +1900,7 @@ class Database:
             logging.error(f"Error getting organizations: {e}")
             return []
 
+    @_prefetchable('provinces')
     def get_provinces(self):
         """Get all provinces from provinces table."""
         try:
@@ -1537,6 +1914,7 @@ class Database:
             logging.error(f"Error getting provinces: {e}")
             return []
 
+    @_prefetchable('districts')
     def get_districts(self, province_id=None):
         """Get districts from districts table, optionally filtered by province."""
         try:
@@ -1558,6 +1936,7 @@ class Database:
             logging.error(f"Error getting districts: {e}")
             return []
 
+    @_prefetchable('union_councils')
     def get_union_councils(self, district_id=None, province_id=None):
         """Get union councils from union_councils table, optionally filtered by district or province."""
         try:
@@ -1583,6 +1962,7 @@ class Database:
             logging.error(f"Error getting union councils: {e}")
             return []
 
+    @_prefetchable()
     def get_nationalities(self):
         """Get nationalities list. For now, return Pakistani and common nationalities."""
         try:
@@ -1615,24 +1995,36 @@ class Database:
             logging.error(f"Error getting student database ID: {e}")
             return None
 
-    def get_attendance(self, student_id=None, date=None):
-        """Get attendance records."""
+    def get_attendance(self, student_id=None, date=None, start_date=None, end_date=None):
+        """Get attendance records, optionally for one date or an inclusive date range.
+        
+        Reads that reach back before the data kept in school.db also cover the
+        archived academic years (see services.archive_service).
+        """
         try:
-            # Updated query to work with the new schema where attendance.student_id is TEXT
-            # and matches students.student_id directly
-            query = """SELECT a.*, s.student_name as student_name 
-                      FROM attendance a 
-                      JOIN students s ON a.student_id = s.student_id 
+            from services.archive_service import get_archive_service
+            source = get_archive_service().relation_for(self.conn, 'attendance', date or start_date)
+            
+            # attendance.student_id references students.id
+            query = f"""SELECT a.*, s.student_name as student_name 
+                      FROM {source} a 
+                      JOIN students s ON a.student_id = s.id 
                       WHERE s.is_deleted = 0"""
             params = []
             
             if student_id:
-                # No need to convert - we now use student_id directly
-                query += " AND a.student_id = ?"
+                # The S# code (as the pages pass it) or the students.id
+                query += " AND s.student_id = ?" if isinstance(student_id, str) else " AND a.student_id = ?"
                 params.append(student_id)
             if date:
                 query += " AND a.date = ?"
                 params.append(date)
+            if start_date:
+                query += " AND a.date >= ?"
+                params.append(start_date)
+            if end_date:
+                query += " AND a.date <= ?"
+                params.append(end_date)
                 
             query += " ORDER BY a.date DESC, s.student_name"
             
@@ -1645,14 +2037,13 @@ class Database:
     def mark_attendance(self, student_id, date, status, remarks=""):
         """Mark attendance for a student."""
         try:
-            # Ensure student_id is a string format (like 'STD054')
-            if not isinstance(student_id, str):
-                # Convert numeric id to student_id string if needed
-                self.cursor.execute("SELECT student_id FROM students WHERE id = ?", (student_id,))
+            # attendance.student_id references students.id; pages may pass the S# code instead
+            if isinstance(student_id, str):
+                self.cursor.execute("SELECT id FROM students WHERE student_id = ?", (student_id,))
                 result = self.cursor.fetchone()
                 if not result:
-                    raise ValueError(f"Student with ID {student_id} not found")
-                student_id = result['student_id']
+                    raise ValueError(f"Student {student_id} not found")
+                student_id = result['id']
                 
             # Check if attendance already exists for this date
             self.cursor.execute("""SELECT id FROM attendance 
@@ -1662,7 +2053,7 @@ class Database:
             if existing:
                 # Update existing record
                 self.cursor.execute("""UPDATE attendance 
-                                   SET status = ?, remarks = ? 
+                                   SET status = ?, remarks = ?, updated_at = CURRENT_TIMESTAMP 
                                    WHERE student_id = ? AND date = ?""", 
                                  (status, remarks, student_id, date))
             else:
@@ -1672,7 +2063,7 @@ class Database:
                                    VALUES (?, ?, ?, ?)""", 
                                  (student_id, date, status, remarks))
             
-            self.conn.commit()
+            self.db_conn.commit()
             logging.info(f"Attendance marked: Student {student_id}, Date {date}, Status {status}")
             
         except Exception as e:
@@ -1686,14 +2077,14 @@ class Database:
                                (student_id, student_s_no, field_name, old_value, new_value, change_type, changed_by, changed_by_username, changed_by_phone, change_reason) 
                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", 
                              (student_id, student_s_no, field_name, old_value, new_value, change_type, changed_by, changed_by_username, changed_by_phone, change_reason))
-            self.conn.commit()
+            self.db_conn.commit()
             logging.info(f"History added for student {student_s_no}: {field_name} changed from '{old_value}' to '{new_value}' by {changed_by_username or changed_by}")
         except Exception as e:
             logging.error(f"Error adding student history: {e}")
             raise
 
-    def get_student_history(self, student_id):
-        """Get complete history for a student."""
+    def get_student_field_history(self, student_id):
+        """Get complete field-level history for a student from student_history."""
         try:
             self.cursor.execute("""SELECT * FROM student_history 
                                WHERE student_id = ? 
@@ -1723,22 +2114,23 @@ class Database:
             
             student_s_no = current_student['student_id']
             
-            # Track changes for each field
-            for field_name, new_value in updates.items():
-                if field_name in dict(current_student).keys():
-                    old_value = current_student[field_name]
-                    if str(old_value) != str(new_value):  # Only track actual changes
-                        self.add_student_history(
-                            student_id, student_s_no, field_name, 
-                            old_value, new_value, 'UPDATE', changed_by, change_reason
-                        )
-            
-            # Build update query
-            set_clause = ", ".join([f"{field} = ?" for field in updates.keys()])
-            values = list(updates.values()) + [student_id]
-            
-            self.cursor.execute(f"UPDATE students SET {set_clause} WHERE id = ?", values)
-            self.conn.commit()
+            # History rows and the update commit together
+            with self.unit_of_work():
+                # Track changes for each field
+                for field_name, new_value in updates.items():
+                    if field_name in dict(current_student).keys():
+                        old_value = current_student[field_name]
+                        if str(old_value) != str(new_value):  # Only track actual changes
+                            self.add_student_history(
+                                student_id, student_s_no, field_name, 
+                                old_value, new_value, 'UPDATE', changed_by, change_reason
+                            )
+                
+                # Build update query
+                set_clause = ", ".join([f"{field} = ?" for field in updates.keys()])
+                values = list(updates.values()) + [student_id]
+                
+                self.cursor.execute(f"UPDATE students SET {set_clause} WHERE id = ?", values)
             logging.info(f"Student {student_s_no} updated successfully with history tracking")
             
         except Exception as e:
@@ -1748,22 +2140,22 @@ class Database:
     def add_student_with_history(self, student_data, added_by="System", add_reason="New student registration"):
         """Add new student and create initial history record."""
         try:
-            # Insert the student
-            fields = ", ".join(student_data.keys())
-            placeholders = ", ".join(["?" for _ in student_data])
-            values = list(student_data.values())
-            
-            self.cursor.execute(f"INSERT INTO students ({fields}) VALUES ({placeholders})", values)
-            student_id = self.cursor.lastrowid
-            
-            # Add history for creation
-            student_s_no = student_data.get('student_id', f'STU_{student_id}')
-            self.add_student_history(
-                student_id, student_s_no, 'RECORD_CREATED', 
-                '', 'Student record created', 'INSERT', added_by, add_reason
-            )
+            with self.unit_of_work():
+                # Insert the student
+                fields = ", ".join(student_data.keys())
+                placeholders = ", ".join(["?" for _ in student_data])
+                values = list(student_data.values())
+                
+                self.cursor.execute(f"INSERT INTO students ({fields}) VALUES ({placeholders})", values)
+                student_id = self.cursor.lastrowid
+                
+                # Add history for creation
+                student_s_no = student_data.get('student_id', f'STU_{student_id}')
+                self.add_student_history(
+                    student_id, student_s_no, 'RECORD_CREATED', 
+                    '', 'Student record created', 'INSERT', added_by, add_reason
+                )
             
-            self.conn.commit()
             logging.info(f"New student {student_s_no} added with history tracking")
             return student_id
             
@@ -1877,12 +2269,12 @@ class Database:
             self.cursor.execute(query, values)
             student_id = self.cursor.lastrowid
             
-            self.conn.commit()
+            self.db_conn.commit()
             logger.info(f"Student {filtered_data.get('student_id')} added successfully with ID: {student_id}")
             return student_id
             
         except Exception as e:
-            self.conn.rollback()
+            self.db_conn.rollback()
             logger.error(f"Error adding student: {e}")
             raise DatabaseError(f"Failed to add student: {e}")
 
@@ -1893,13 +2285,7 @@ class Database:
             if not sanitized_id:
                 raise ValidationError("student_id", "Invalid student ID")
             # Allow only known columns
-            allowed = [
-                'household_size', 'mother_name', 'mother_marital_status', 'mother_cnic',
-                'mother_cnic_doi', 'mother_cnic_exp', 'mother_mwa', 'household_name',
-                'alternate_cnic', 'alternate_cnic_doi', 'alternate_cnic_exp',
-                'alternate_marital_status', 'alternate_mwa', 'father_phone', 'alternate_relationship_with_mother'
-            ]
-            updates = {k: info.get(k) for k in allowed if k in info}
+            updates = {k: info.get(k) for k in self.MOTHER_INFO_COLUMNS if k in info}
             if not updates:
                 return False
             set_clause = ", ".join([f"{k} = ?" for k in updates.keys()])
@@ -1908,51 +2294,129 @@ class Database:
                 f"UPDATE students SET {set_clause}, updated_at = CURRENT_TIMESTAMP WHERE student_id = ?",
                 tuple(values)
             )
-            self.conn.commit()
+            self.db_conn.commit()
             return self.cursor.rowcount > 0
         except Exception as e:
             logging.error(f"Error updating mother info: {e}")
             raise
 
-    def update_mother_info_bulk(self, student_snos: List[str], info: Dict[str, Any]) -> int:
+    def update_mother_info_bulk(self, student_snos: List[str], info: Dict[str, Any],
+                                user_id: int = None, username: str = None, user_phone: str = None) -> int:
         """Bulk update mother/guardian fields for multiple students by S#.
-        Returns the number of updated rows.
+        Returns the number of rows actually changed.
         """
+        return self.apply_mother_info_batch(student_snos, info, user_id, username, user_phone)['changed']
+    
+    def apply_mother_info_batch(self, student_snos: List[str], info: Dict[str, Any],
+                                user_id: int = None, username: str = None, user_phone: str = None,
+                                reason: str = "Mother/guardian information update") -> Dict[str, Any]:
+        """Apply one set of mother/guardian fields to many students in a single transaction.
+        
+        Validation happens once for the whole batch. Rows whose values would actually
+        change are recorded in students_audit with one INSERT ... SELECT (change sets
+        built by SQLite's JSON functions, full rows only where a keyframe is due),
+        then updated with one UPDATE, and everything commits together.
+        
+        Returns:
+            dict: requested, matched and changed counts plus the S# values not found
+        """
+        result = {'requested': 0, 'matched': 0, 'changed': 0, 'missing': []}
         if not student_snos:
-            return 0
+            return result
         try:
             # Sanitize S# values and remove empties/dupes
-            safe_snos = []
-            for s in student_snos:
-                ss = SQLSanitizer.sanitize_query_param(str(s))
-                if ss:
-                    safe_snos.append(ss)
-            safe_snos = list(dict.fromkeys(safe_snos))
+            safe_snos = SQLSanitizer.sanitize_many(student_snos)
+            result['requested'] = len(safe_snos)
             if not safe_snos:
-                return 0
-            # Allowed columns
-            allowed = [
-                'household_size', 'mother_name', 'mother_marital_status', 'mother_cnic',
-                'mother_cnic_doi', 'mother_cnic_exp', 'mother_mwa', 'household_name',
-                'alternate_cnic', 'alternate_cnic_doi', 'alternate_cnic_exp',
-                'alternate_marital_status', 'alternate_mwa', 'father_phone', 'alternate_relationship_with_mother'
-            ]
-            updates = {k: info.get(k) for k in allowed if k in info}
+                return result
+            
+            updates = {k: info.get(k) for k in self.MOTHER_INFO_COLUMNS if k in info}
             if not updates:
-                return 0
-            set_clause = ", ".join([f"{k} = ?" for k in updates.keys()]) + ", updated_at = CURRENT_TIMESTAMP"
-            params_template = list(updates.values())
-            # Use a transaction and executemany for performance
+                return result
+            
+            set_clause = ", ".join([f"{k} = ?" for k in updates.keys()])
+            # Only touch rows where at least one value differs
+            change_clause = " OR ".join([f"{k} IS NOT ?" for k in updates.keys()])
+            values = list(updates.values())
+            target_clause = "student_id IN (SELECT student_id FROM temp.mother_info_batch) AND is_deleted = 0"
+            
+            from services.audit_service import AUDIT_IDENTITY_COLUMNS, keyframe_due_sql
+            audit_columns = ", ".join(self.AUDIT_SNAPSHOT_COLUMNS)
+            # Keyframes copy the whole row; deltas keep identity columns only
+            snapshot_select = ", ".join(
+                f"s.{c}" if c in AUDIT_IDENTITY_COLUMNS else f"CASE WHEN b.keyframe THEN s.{c} END"
+                for c in self.AUDIT_SNAPSHOT_COLUMNS
+            )
+            # json_patch drops the NULL members, leaving {column: [old, new]} for changed columns
+            change_set = "json_patch('{}', json_object(" + ", ".join(
+                f"'{k}', CASE WHEN s.{k} IS NOT ? THEN json_array(s.{k}, ?) END" for k in updates.keys()
+            ) + "))"
+            change_set_values = [v for value in values for v in (value, value)]
+            
             with self.db_conn.transaction() as cur:
-                param_rows = [tuple(params_template + [sno]) for sno in safe_snos]
-                cur.executemany(
-                    f"UPDATE students SET {set_clause} WHERE student_id = ?",
-                    param_rows
+                cur.execute(
+                    "CREATE TEMP TABLE IF NOT EXISTS mother_info_batch "
+                    "(student_id TEXT PRIMARY KEY, keyframe INTEGER NOT NULL DEFAULT 0)"
                 )
-                # Calculate number of rows changed in this transaction
-                # sqlite3 total_changes is cumulative per connection; capture delta
-                # However within this transaction we can approximate via len(safe_snos)
-            return len(safe_snos)
+                cur.execute("DELETE FROM temp.mother_info_batch")
+                cur.executemany("INSERT OR IGNORE INTO temp.mother_info_batch (student_id) VALUES (?)",
+                                [(sno,) for sno in safe_snos])
+                
+                cur.execute(f"SELECT COUNT(*) FROM students WHERE {target_clause}")
+                result['matched'] = cur.fetchone()[0]
+                
+                if result['matched'] < len(safe_snos):
+                    cur.execute("""
+                        SELECT b.student_id FROM temp.mother_info_batch b
+                        WHERE NOT EXISTS (
+                            SELECT 1 FROM students s WHERE s.student_id = b.student_id AND s.is_deleted = 0
+                        )
+                    """)
+                    result['missing'] = [row[0] for row in cur.fetchall()]
+                
+                # Decide keyframes before any audit row is added, then record every
+                # row about to change set-wise
+                cur.execute(f"""
+                    UPDATE temp.mother_info_batch SET keyframe = COALESCE((
+                        SELECT {keyframe_due_sql('s.id')} FROM students s
+                        WHERE s.student_id = mother_info_batch.student_id AND s.is_deleted = 0
+                        LIMIT 1
+                    ), 0)
+                """)
+                cur.execute("SELECT COALESCE(MAX(audit_id), 0) FROM students_audit")
+                last_audit_id = cur.fetchone()[0]
+                cur.execute(f"""
+                    INSERT INTO students_audit (
+                        original_record_id, audit_action, audit_user_id, audit_username,
+                        audit_user_phone, audit_reason, audit_format, audit_changes, {audit_columns}
+                    )
+                    SELECT s.id, 'UPDATE', ?, ?, ?, ?,
+                        CASE WHEN b.keyframe THEN 'keyframe' ELSE 'delta' END,
+                        {change_set}, {snapshot_select}
+                    FROM students s
+                    JOIN temp.mother_info_batch b ON b.student_id = s.student_id
+                    WHERE s.is_deleted = 0 AND ({change_clause})
+                """, [user_id, username, user_phone, reason] + change_set_values + values)
+                cur.execute(
+                    "UPDATE students_audit SET audit_summary = audit_change_summary(audit_changes) WHERE audit_id > ?",
+                    (last_audit_id,)
+                )
+                
+                cur.execute(f"""
+                    UPDATE students SET {set_clause},
+                        updated_by = ?, updated_by_username = ?, updated_by_phone = ?,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE {target_clause} AND ({change_clause})
+                """, values + [user_id, username, user_phone] + values)
+                result['changed'] = cur.rowcount
+                
+                cur.execute("DELETE FROM temp.mother_info_batch")
+            
+            logger.info(
+                f"Mother info batch applied by {username}: {result['changed']} changed, "
+                f"{result['matched']} matched, {len(result['missing'])} missing"
+            )
+            return result
         except Exception as e:
             logging.error(f"Error bulk updating mother info: {e}")
             raise
@@ -1974,144 +2438,155 @@ class Database:
             logging.error(f"Error getting school info: {e}")
             return None
 
-    def get_student_history(self, student_id):
-        """Get complete change history for a student from audit table with detailed field changes."""
+    def get_student_history_page(self, student_id, limit: Optional[int] = None,
+                                 before: Optional[Tuple[str, int]] = None) -> Dict[str, Any]:
+        """One page of a student's change history, latest change first.
+        
+        Pages are keyset-paged on (audit_timestamp, audit_id): pass the previous
+        page's ``next_before`` as ``before`` to get the next older page. The page
+        is read from idx_students_audit_timeline, then only its rows are fetched
+        for old/new values, so the cost depends on ``limit`` and not on the size
+        of students_audit.
+        
+        Returns:
+            dict: records (history entries), next_before (None on the last page)
+            and total (the student's number of audit entries)
+        """
+        page = {'records': [], 'next_before': None, 'total': 0}
         try:
+            from services.archive_service import get_archive_service
+            from services.audit_service import decode_changes, field_label
+            audit_source = get_archive_service().relation_for(self.conn, 'students_audit')
             cursor = self.conn.cursor()
             
-            # Get audit records for this student with proper field changes
-            audit_query = """
-                SELECT 
-                    audit_timestamp as action_date,
-                    audit_action,
-                    audit_username,
-                    audit_reason,
-                    student_name,
-                    class,
-                    section,
-                    father_name,
-                    father_phone,
-                    address,
-                    created_by_username,
-                    updated_by_username,
-                    audit_id
-                FROM students_audit 
-                WHERE student_id = ? 
-                ORDER BY audit_timestamp DESC
-            """
-            
-            cursor.execute(audit_query, (student_id,))
-            audit_records = cursor.fetchall()
-            
-            # Get current student data for comparison
-            current_query = """
-                SELECT 
-                    created_at,
-                    updated_at,
-                    created_by_username,
-                    updated_by_username,
-                    student_name,
-                    class,
-                    section,
-                    father_name,
-                    father_phone,
-                    address
-                FROM students 
-                WHERE student_id = ? AND is_deleted = 0
-            """
-            
-            cursor.execute(current_query, (student_id,))
-            current_data = cursor.fetchone()
-            
-            history_records = []
-            
-            # Process audit records to detect actual field changes
-            for i, record in enumerate(audit_records):
-                action_date = record[0] or 'Unknown'
-                action_type = record[1] or 'UPDATE'
-                username = record[2] or record[10] or record[11] or 'System'
-                reason = record[3] or 'Record update'
+            cursor.execute(f"SELECT COUNT(*) FROM {audit_source} WHERE student_id = ?", (student_id,))
+            page['total'] = cursor.fetchone()[0]
+            
+            # Timeline from the covering index; one extra row tells whether an older page
+            # exists and is the comparison base for a pre-delta row at the end of the page
+            keyset_clause, params = "", [student_id]
+            if before:
+                keyset_clause = "AND (audit_timestamp, audit_id) < (?, ?)"
+                params.extend(before)
+            limit_clause = ""
+            if limit:
+                limit_clause = "LIMIT ?"
+                params.append(int(limit) + 1)
+            cursor.execute(f"""
+                SELECT audit_id, audit_timestamp, audit_action, audit_username, audit_summary
+                FROM {audit_source}
+                WHERE student_id = ? {keyset_clause}
+                ORDER BY audit_timestamp DESC, audit_id DESC
+                {limit_clause}
+            """, params)
+            timeline = [tuple(row) for row in cursor.fetchall()]
+            
+            has_more = bool(limit) and len(timeline) > limit
+            audit_ids = [row[0] for row in timeline]
+            details = {}
+            if audit_ids:
+                legacy_columns = ", ".join(column for column, label in self.LEGACY_HISTORY_FIELDS)
+                cursor.execute(f"""
+                    SELECT audit_id, audit_reason, audit_changes, created_by_username, updated_by_username,
+                           {legacy_columns}
+                    FROM {audit_source}
+                    WHERE audit_id IN ({', '.join('?' * len(audit_ids))})
+                """, audit_ids)
+                details = {row[0]: tuple(row) for row in cursor.fetchall()}
+            
+            shown = timeline[:limit] if has_more else timeline
+            for i, (audit_id, action_date, action_type, username, summary) in enumerate(shown):
+                detail = details.get(audit_id) or (audit_id, None, None, None, None) + (None,) * len(self.LEGACY_HISTORY_FIELDS)
+                action_date = action_date or 'Unknown'
+                action_type = action_type or 'UPDATE'
+                username = username or detail[3] or detail[4] or 'System'
+                reason = detail[1] or 'Record update'
                 
-                # Compare with previous record to detect actual changes
                 changed_fields = []
                 old_values = []
                 new_values = []
                 
-                if i < len(audit_records) - 1:  # Not the last record
-                    prev_record = audit_records[i + 1]
-                    
-                    # Check each field for changes
-                    field_mapping = {
-                        4: 'Student Name',
-                        5: 'Class', 
-                        6: 'Section',
-                        7: "Father's Name",
-                        8: "Father's Phone",
-                        9: 'Address'
-                    }
-                    
-                    for field_idx, field_name in field_mapping.items():
-                        if record[field_idx] != prev_record[field_idx]:
-                            changed_fields.append(field_name)
-                            old_values.append(str(prev_record[field_idx] or ''))
-                            new_values.append(str(record[field_idx] or ''))
-                
-                else:  # First record (original creation)
-                    if action_type == 'INSERT' or len(audit_records) == 1:
-                        changed_fields = ['RECORD_CREATED']
-                        old_values = ['']
-                        new_values = [f"Student '{record[4]}' added to system"]
-                
-                # Create history entry for each changed field or group them
-                if changed_fields:
-                    if len(changed_fields) == 1:
-                        # Single field change
-                        history_records.append({
-                            'date_time': action_date,
-                            'field_changed': changed_fields[0],
-                            'old_value': old_values[0] if old_values else '',
-                            'new_value': new_values[0] if new_values else '',
-                            'change_type': action_type,
-                            'changed_by': username
-                        })
-                    else:
-                        # Multiple field changes - create one entry with summary
-                        field_summary = f"{len(changed_fields)} fields: " + ", ".join(changed_fields)
-                        value_summary = " | ".join([f"{field}: '{old}' → '{new}'" 
-                                                  for field, old, new in zip(changed_fields, old_values, new_values)])
-                        
-                        history_records.append({
-                            'date_time': action_date,
-                            'field_changed': field_summary,
-                            'old_value': 'Multiple changes',
-                            'new_value': value_summary,
-                            'change_type': action_type,
-                            'changed_by': username
-                        })
+                if detail[2] is not None:
+                    # Change set recorded at write time
+                    for column, (old, new) in decode_changes(detail[2]).items():
+                        changed_fields.append(field_label(column))
+                        old_values.append(str(old if old is not None else ''))
+                        new_values.append(str(new if new is not None else ''))
+                
+                elif i + 1 < len(timeline):
+                    # Pre-delta row: compare the snapshot with the next older one
+                    older = details.get(timeline[i + 1][0])
+                    if older is not None and older[2] is None:
+                        for offset, (column, label) in enumerate(self.LEGACY_HISTORY_FIELDS, start=5):
+                            if detail[offset] != older[offset]:
+                                changed_fields.append(label)
+                                old_values.append(str(older[offset] or ''))
+                                new_values.append(str(detail[offset] or ''))
+                
+                elif before is None and len(timeline) == 1:
+                    # Only entry of a student with pre-delta history
+                    changed_fields = ['RECORD_CREATED']
+                    old_values = ['']
+                    new_values = [f"Student '{detail[5]}' added to system"]
+                
+                entry = {
+                    'audit_id': audit_id,
+                    'date_time': action_date,
+                    'change_type': action_type,
+                    'changed_by': username
+                }
+                if len(changed_fields) == 1:
+                    entry.update({
+                        'field_changed': changed_fields[0],
+                        'old_value': old_values[0],
+                        'new_value': new_values[0]
+                    })
+                elif changed_fields:
+                    # Multiple field changes - one entry with summary
+                    value_summary = " | ".join([f"{field}: '{old}' → '{new}'"
+                                              for field, old, new in zip(changed_fields, old_values, new_values)])
+                    entry.update({
+                        'field_changed': summary or f"{len(changed_fields)} fields: " + ", ".join(changed_fields),
+                        'old_value': 'Multiple changes',
+                        'new_value': value_summary
+                    })
                 else:
                     # No specific field changes detected, show generic update
-                    history_records.append({
-                        'date_time': action_date,
+                    entry.update({
                         'field_changed': 'Record updated',
                         'old_value': 'Previous state',
-                        'new_value': reason,
-                        'change_type': action_type,
-                        'changed_by': username
+                        'new_value': reason
                     })
+                page['records'].append(entry)
+            
+            if has_more:
+                page['next_before'] = (shown[-1][1], shown[-1][0])
             
             # Add current record creation if no audit records exist
-            if not history_records and current_data:
-                history_records.append({
-                    'date_time': current_data[0] or 'Unknown',
-                    'field_changed': 'RECORD_CREATED',
-                    'old_value': '',
-                    'new_value': f"Student '{current_data[4]}' added to system",
-                    'change_type': 'INSERT',
-                    'changed_by': current_data[2] or 'System'
-                })
-            
-            return history_records
+            if page['total'] == 0:
+                cursor.execute("""
+                    SELECT created_at, created_by_username, student_name
+                    FROM students
+                    WHERE student_id = ? AND is_deleted = 0
+                """, (student_id,))
+                current_data = cursor.fetchone()
+                if current_data:
+                    page['records'].append({
+                        'audit_id': None,
+                        'date_time': current_data[0] or 'Unknown',
+                        'field_changed': 'RECORD_CREATED',
+                        'old_value': '',
+                        'new_value': f"Student '{current_data[2]}' added to system",
+                        'change_type': 'INSERT',
+                        'changed_by': current_data[1] or 'System'
+                    })
+            
+            return page
             
         except Exception as e:
             logging.error(f"Error getting student history: {e}")
-            return []
+            return page
+    
+    def get_student_history(self, student_id, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get a student's change history from the audit table, latest first (at most ``limit`` entries)."""
+        return self.get_student_history_page(student_id, limit)['records']
@@ -47,7 +47,7 @@ class DatabaseMigration:
         # Add more migrations as needed
     }
     
-    LATEST_VERSION = '2.0'  # Current latest schema version
+    LATEST_VERSION = '3.0'  # Current latest schema version
     
     def __init__(self, db_path: str = None):
         """
@@ -336,9 +336,42 @@ class DatabaseMigration:
             raise
     
     def migrate_2_0_to_3_0(self):
-        """Migrate database from version 2.0 to 3.0."""
-        # Implement migration logic when needed
-        logger.info("Migration from 2.0 to 3.0 not yet implemented")
+        """Migrate database from version 2.0 to 3.0.
+        
+        Compacts students_audit: full-copy rows become keyframes plus deltas
+        that store only the changed fields.
+        """
+        from services.audit_service import StudentAuditService
+        
+        try:
+            self.cursor.execute("PRAGMA table_info(students_audit)")
+            columns = [row[1] for row in self.cursor.fetchall()]
+            if not columns:
+                logger.info("No students_audit table, nothing to compact")
+                return
+            
+            if 'audit_format' not in columns:
+                self.cursor.execute("ALTER TABLE students_audit ADD COLUMN audit_format TEXT NOT NULL DEFAULT 'full'")
+            if 'audit_changes' not in columns:
+                self.cursor.execute("ALTER TABLE students_audit ADD COLUMN audit_changes TEXT")
+            if 'audit_summary' not in columns:
+                self.cursor.execute("ALTER TABLE students_audit ADD COLUMN audit_summary TEXT")
+            self.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_students_audit_record
+                ON students_audit(original_record_id, audit_format, audit_id)
+            """)
+            self.conn.commit()
+            
+            stats = StudentAuditService(self.db_path).compact()
+            logger.info(
+                f"Migration from 2.0 to 3.0 completed: {stats['rows']} audit rows compacted "
+                f"into {stats['keyframes']} keyframes and {stats['deltas']} deltas"
+            )
+            
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            logger.error(f"Migration 2.0 to 3.0 failed: {e}")
+            raise
 
 
 def main():
@@ -27,18 +27,9 @@ class MotherRegistrationService:
             where_clauses = []
             params = []
             
-            # Core condition: students missing BOTH mother AND alternate guardian info
-            where_clauses.append("""
-                (
-                    (COALESCE(mother_name,'') = '' OR COALESCE(mother_cnic,'') = '') 
-                    AND 
-                    (COALESCE(alternate_name,'') = '' OR COALESCE(alternate_cnic,'') = '' OR COALESCE(alternate_relationship_with_mother,'') = '')
-                )
-            """)
-            
-            # Always exclude deleted records and only show active students
-            where_clauses.append("is_deleted = 0")
-            where_clauses.append("status = 'Active'")
+            # Core condition: students missing BOTH mother AND alternate guardian info.
+            # Backed by the needs_mother_info flag and its partial index.
+            where_clauses.append(self.db.mother_info_filter_sql())
             
             # Apply filters if provided
             if filters:
@@ -60,16 +51,77 @@ class MotherRegistrationService:
             
             # Build complete query
             where_clause = " AND ".join(where_clauses)
-            query = f"SELECT * FROM students WHERE {where_clause} ORDER BY name ASC"
+            query = f"SELECT * FROM students WHERE {where_clause} ORDER BY student_name ASC"
             
             # Execute query
-            result = self.db.execute_query(query, params)
-            return result if result else []
+            result = self.db.execute_secure_query(query, tuple(params))
+            return [dict(row) for row in result] if result else []
             
         except Exception as e:
             print(f"Error loading students needing mother info: {e}")
             return []
     
+    def get_outstanding_counts(self, class_name=None):
+        """
+        Get outstanding mother-info counts for progress badges.
+        
+        Args:
+            class_name (str): Optional class to restrict the counts to
+            
+        Returns:
+            dict: Total pending count and per school/class breakdown
+        """
+        try:
+            progress = self.db.get_mother_info_progress(class_name=class_name)
+            return {
+                'total': sum(row['pending'] for row in progress),
+                'by_class': progress
+            }
+        except Exception as e:
+            print(f"Error loading outstanding mother info counts: {e}")
+            return {'total': 0, 'by_class': []}
+    
+    def _build_update_fields(self, mother_data):
+        """
+        Map form fields to database columns based on recipient type.
+        
+        Args:
+            mother_data (dict): Mother/guardian information
+            
+        Returns:
+            dict: Column/value pairs to write
+        """
+        recipient_type = mother_data.get("recipient_type", "Principal")
+        
+        if recipient_type == "Principal":
+            # Map principal fields
+            field_mapping = {
+                "household_size": "household_size",
+                "mother_name": "mother_name", 
+                "mother_marital_status": "mother_marital_status",
+                "mother_cnic": "mother_cnic",
+                "mother_cnic_doi": "mother_cnic_doi",
+                "mother_cnic_exp": "mother_cnic_exp",
+                "mother_mwa": "mother_mwa"
+            }
+        else:  # Alternate Guardian
+            # Map guardian fields
+            field_mapping = {
+                "household_name": "alternate_name",
+                "guardian_cnic": "alternate_cnic",
+                "guardian_cnic_doi": "alternate_cnic_doi", 
+                "guardian_cnic_exp": "alternate_cnic_exp",
+                "guardian_marital_status": "alternate_marital_status",
+                "guardian_mwa": "alternate_mwa",
+                "guardian_relation": "alternate_relationship_with_mother"
+            }
+        
+        update_fields = {}
+        for form_field, db_field in field_mapping.items():
+            if form_field in mother_data and mother_data[form_field]:
+                update_fields[db_field] = mother_data[form_field]
+        return update_fields
+    
     def save_mother_info(self, student_id, mother_data):
         """
         Save mother/guardian information for a student.
@@ -82,47 +134,13 @@ class MotherRegistrationService:
             bool: True if successful, False otherwise
         """
         try:
-            recipient_type = mother_data.get("recipient_type", "Principal")
-            
-            # Prepare update data based on recipient type
-            update_fields = {}
-            
-            if recipient_type == "Principal":
-                # Map principal fields
-                field_mapping = {
-                    "household_size": "household_size",
-                    "mother_name": "mother_name", 
-                    "mother_marital_status": "mother_marital_status",
-                    "mother_cnic": "mother_cnic",
-                    "mother_cnic_doi": "mother_cnic_doi",
-                    "mother_cnic_exp": "mother_cnic_exp",
-                    "mother_mwa": "mother_mwa"
-                }
-            else:  # Alternate Guardian
-                # Map guardian fields
-                field_mapping = {
-                    "household_name": "alternate_name",
-                    "guardian_cnic": "alternate_cnic",
-                    "guardian_cnic_doi": "alternate_cnic_doi", 
-                    "guardian_cnic_exp": "alternate_cnic_exp",
-                    "guardian_marital_status": "alternate_marital_status",
-                    "guardian_mwa": "alternate_mwa",
-                    "guardian_phone": "alternate_phone",
-                    "guardian_relation": "alternate_relationship_with_mother"
-                }
-            
-            # Build update fields
-            for form_field, db_field in field_mapping.items():
-                if form_field in mother_data and mother_data[form_field]:
-                    update_fields[db_field] = mother_data[form_field]
-            
-            # Update database
-            if update_fields:
-                success = self.db.update_student(student_id, update_fields)
-                return success
-            else:
+            update_fields = self._build_update_fields(mother_data)
+            if not update_fields:
                 print("No valid data to update")
                 return False
+            
+            result = self.db.apply_mother_info_batch([student_id], update_fields)
+            return result['matched'] > 0
                 
         except Exception as e:
             print(f"Error saving mother information: {e}")
@@ -206,16 +224,23 @@ class MotherRegistrationService:
             'errors': []
         }
         
-        for student_id in student_ids:
-            try:
-                if self.save_mother_info(student_id, mother_data):
-                    results['success_count'] += 1
-                else:
-                    results['error_count'] += 1
-                    results['errors'].append(f"Failed to update student {student_id}")
-            except Exception as e:
-                results['error_count'] += 1
-                results['errors'].append(f"Error updating student {student_id}: {str(e)}")
+        update_fields = self._build_update_fields(mother_data)
+        if not student_ids or not update_fields:
+            return results
+        
+        # One validation pass and one transaction for the whole selection
+        try:
+            batch = self.db.apply_mother_info_batch(student_ids, update_fields)
+        except Exception as e:
+            results['error_count'] = len(student_ids)
+            results['errors'].append(f"Error updating students: {str(e)}")
+            return results
+        
+        results['success_count'] = batch['matched']
+        results['changed_count'] = batch['changed']
+        for student_id in batch['missing']:
+            results['error_count'] += 1
+            results['errors'].append(f"Failed to update student {student_id}")
         
         return results
     
@@ -0,0 +1,302 @@
+"""Archive of closed academic years in per-year SQLite databases."""
+import os
+import logging
+import sqlite3
+import threading
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config.settings import Config, DATABASE_CONFIG
+from core.exceptions import BackupError, DatabaseError
+from utils.performance.metrics import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+# SQLite attaches at most 10 databases per connection by default; keep one spare
+MAX_ATTACHED_ARCHIVES = 9
+
+
+class ArchiveService:
+    """Moves closed academic years of history tables out of school.db.
+    
+    Each academic year (``Config.ACADEMIC_YEAR_START_MONTH`` to the same month
+    a year later) goes to ``ARCHIVE_DIR/archive_<year>.db``, recorded in the
+    ``archive_catalog`` table of the hot database. Reads that reach back
+    before the hot data go through ``relation_for``, which ATTACHes the
+    archives to the caller's connection and returns a TEMP view (views in
+    ``main`` cannot reference attached databases) that is the hot table
+    UNION ALL every archived copy.
+    
+    A year is copied and committed to its archive first, the archive file is
+    stored in the backup store, and only then is the year catalogued and
+    deleted from the hot table in one transaction, so an interrupted run
+    never loses rows and can simply be repeated. Archives are written once,
+    so the backup store keeps a single copy of each.
+    """
+    
+    # Archivable table -> (column whose date decides the academic year, row key)
+    TABLES = {
+        'attendance': ('date', 'id'),
+        'students_audit': ('audit_timestamp', 'audit_id'),
+    }
+    # Lookup indexes created in each archive, besides the unique row key
+    ARCHIVE_INDEXES = {
+        'attendance': ["student_id, date", "date"],
+        'students_audit': ["student_id, audit_timestamp, audit_id"],
+    }
+    
+    def __init__(self, db_path: Optional[str] = None, archive_dir: Optional[str] = None):
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.archive_dir = archive_dir or Config.ARCHIVE_DIR
+        self._catalog: Optional[List[Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def academic_year_of(day: date) -> int:
+        """Calendar year in which the academic year containing ``day`` starts."""
+        return day.year if day.month >= Config.ACADEMIC_YEAR_START_MONTH else day.year - 1
+    
+    @staticmethod
+    def year_bounds(year: int) -> Tuple[str, str]:
+        """[start, end) of an academic year as ISO dates, comparable with date/timestamp text."""
+        month = Config.ACADEMIC_YEAR_START_MONTH
+        return f"{year:04d}-{month:02d}-01", f"{year + 1:04d}-{month:02d}-01"
+    
+    def archive_path(self, year: int) -> str:
+        return os.path.join(self.archive_dir, f"archive_{year}.db")
+    
+    def _year_expression(self, column: str) -> str:
+        """SQL expression giving the academic year of a date/timestamp text column."""
+        return (f"(CAST(substr({column}, 1, 4) AS INTEGER) - "
+                f"(CAST(substr({column}, 6, 2) AS INTEGER) < {int(Config.ACADEMIC_YEAR_START_MONTH)}))")
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=DATABASE_CONFIG['timeout'], isolation_level=None)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+    
+    def closed_years(self, table: str = 'attendance') -> List[int]:
+        """Academic years of ``table`` still in the hot database but older than ARCHIVE_HOT_YEARS."""
+        column = self.TABLES[table][0]
+        first_hot = self.academic_year_of(date.today()) - max(Config.ARCHIVE_HOT_YEARS, 1) + 1
+        conn = self._connect()
+        try:
+            rows = conn.execute(f"""
+                SELECT DISTINCT {self._year_expression(column)} FROM {table}
+                WHERE {column} < ? AND {column} IS NOT NULL
+            """, (self.year_bounds(first_hot)[0],)).fetchall()
+        finally:
+            conn.close()
+        return sorted(row[0] for row in rows if row[0] is not None)
+    
+    def archive_closed_years(self, include_audit: bool = False,
+                             progress: Optional[Callable[[str], None]] = None) -> List[Dict[str, Any]]:
+        """Archive every closed academic year. Returns one summary per year."""
+        years = set(self.closed_years('attendance'))
+        if include_audit:
+            years.update(self.closed_years('students_audit'))
+        return [self.archive_year(year, include_audit, progress) for year in sorted(years)]
+    
+    def archive_year(self, year: int, include_audit: bool = False,
+                     progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """Move one academic year of attendance (and optionally students_audit) to its archive.
+        
+        Raises:
+            DatabaseError: If the year is not closed yet, the archive cannot be
+                backed up or the move fails
+        """
+        first_hot = self.academic_year_of(date.today()) - max(Config.ARCHIVE_HOT_YEARS, 1) + 1
+        if year >= first_hot:
+            raise DatabaseError(f"Academic year {year} is still kept in the main database")
+        
+        tables = ['attendance'] + (['students_audit'] if include_audit else [])
+        start, end = self.year_bounds(year)
+        summary = {'year': year, 'path': self.archive_path(year), 'moved': {}}
+        report = progress or (lambda message: None)
+        
+        os.makedirs(self.archive_dir, exist_ok=True)
+        conn = self._connect()
+        try:
+            with get_metrics_registry().timer("archive.year"):
+                conn.execute("ATTACH DATABASE ? AS archive", (summary['path'],))
+                for table in tables:
+                    report(f"Archiving {table} for {year}-{year + 1}...")
+                    self._copy_rows(conn, table, start, end)
+                
+                # The hot rows go only once a backup holds the archive
+                report(f"Backing up the {year}-{year + 1} archive...")
+                self._backup_archive(summary['path'])
+                
+                for table in tables:
+                    summary['moved'][table] = self._release_rows(conn, table, year, start, end)
+                conn.execute("DETACH DATABASE archive")
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to archive academic year {year}: {e}")
+        finally:
+            conn.close()
+        
+        self.invalidate_catalog()
+        logger.info(f"Archived academic year {year} to {summary['path']}: {summary['moved']}")
+        return summary
+    
+    @staticmethod
+    def _backup_archive(path: str):
+        from services.backup_service import get_backup_manager
+        try:
+            get_backup_manager().backup_archive(path)
+        except BackupError as e:
+            raise DatabaseError(f"Archive kept in the main database, backup failed: {e}")
+    
+    def _copy_rows(self, conn: sqlite3.Connection, table: str, start: str, end: str):
+        """Copy a year of ``table`` into the attached archive and commit it there."""
+        column, key = self.TABLES[table]
+        columns = [row[1] for row in conn.execute(f"PRAGMA main.table_info({table})")]
+        column_list = ", ".join(columns)
+        
+        exists = conn.execute(
+            "SELECT 1 FROM archive.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone()
+        if not exists:
+            # Plain columns without the hot table's constraints; foreign keys
+            # would point at tables that only exist in school.db
+            conn.execute(f"CREATE TABLE archive.{table} AS SELECT {column_list} FROM main.{table} WHERE 0")
+            # The unique key makes re-running a year replace rather than duplicate
+            conn.execute(f"CREATE UNIQUE INDEX archive.idx_{table}_key ON {table} ({key})")
+            for i, index_columns in enumerate(self.ARCHIVE_INDEXES[table]):
+                conn.execute(f"CREATE INDEX archive.idx_{table}_{i} ON {table} ({index_columns})")
+        else:
+            archived = {row[1] for row in conn.execute(f"PRAGMA archive.table_info({table})")}
+            for name in columns:
+                if name not in archived:
+                    conn.execute(f"ALTER TABLE archive.{table} ADD COLUMN {name}")
+        
+        # 1. Copy and commit to the archive; only the archive file is written
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(f"""
+                INSERT OR REPLACE INTO archive.{table} ({column_list})
+                SELECT {column_list} FROM main.{table} WHERE {column} >= ? AND {column} < ?
+            """, (start, end))
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+    
+    def _release_rows(self, conn: sqlite3.Connection, table: str, year: int, start: str, end: str) -> int:
+        """Catalogue a copied year and delete it from the hot table. Returns rows moved."""
+        column, key = self.TABLES[table]
+        
+        # 2. Catalogue and delete from the hot table together, after checking the copy
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            hot_count = conn.execute(
+                f"SELECT COUNT(*) FROM main.{table} WHERE {column} >= ? AND {column} < ?", (start, end)
+            ).fetchone()[0]
+            copied = conn.execute(f"""
+                SELECT COUNT(*) FROM main.{table} h
+                WHERE h.{column} >= ? AND h.{column} < ?
+                  AND EXISTS (SELECT 1 FROM archive.{table} a WHERE a.{key} = h.{key})
+            """, (start, end)).fetchone()[0]
+            if copied != hot_count:
+                raise sqlite3.DatabaseError(f"{hot_count - copied} {table} rows missing from archive")
+            
+            total = conn.execute(f"SELECT COUNT(*) FROM archive.{table}").fetchone()[0]
+            conn.execute("""
+                INSERT INTO main.archive_catalog
+                    (academic_year, table_name, file_name, start_date, end_date, row_count, archived_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(academic_year, table_name) DO UPDATE SET
+                    file_name = excluded.file_name, row_count = excluded.row_count,
+                    archived_at = excluded.archived_at
+            """, (year, table, os.path.basename(self.archive_path(year)), start, end, total,
+                  datetime.now().isoformat()))
+            conn.execute(f"DELETE FROM main.{table} WHERE {column} >= ? AND {column} < ?", (start, end))
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        return hot_count
+    
+    def invalidate_catalog(self, *args):
+        """Drop the cached catalog (also registered as a restore listener)."""
+        with self._lock:
+            self._catalog = None
+    
+    def catalog(self) -> List[Dict[str, Any]]:
+        """Archived (year, table) entries, cached until the next archive run."""
+        with self._lock:
+            if self._catalog is None:
+                conn = self._connect()
+                try:
+                    conn.row_factory = sqlite3.Row
+                    self._catalog = [dict(row) for row in conn.execute(
+                        "SELECT * FROM archive_catalog ORDER BY academic_year DESC"
+                    )]
+                except sqlite3.Error:
+                    self._catalog = []  # older database without the catalog table
+                finally:
+                    conn.close()
+            return self._catalog
+    
+    def hot_start(self, table: str) -> Optional[str]:
+        """Earliest date guaranteed to be in the hot table, or None if nothing is archived."""
+        ends = [entry['end_date'] for entry in self.catalog() if entry['table_name'] == table]
+        return max(ends) if ends else None
+    
+    def relation_for(self, conn: sqlite3.Connection, table: str, start_date: Optional[str] = None) -> str:
+        """Name to select ``table`` rows from for a read beginning at ``start_date``.
+        
+        The hot table itself when nothing older is needed; otherwise the TEMP
+        view ``<table>_all`` over the hot table and its archives, attaching
+        them to ``conn`` as required.
+        """
+        hot_start = self.hot_start(table)
+        if hot_start is None or (start_date and str(start_date) >= hot_start):
+            return table
+        
+        entries = [entry for entry in self.catalog() if entry['table_name'] == table]
+        if len(entries) > MAX_ATTACHED_ARCHIVES:
+            logger.warning(f"{len(entries)} {table} archives; only the newest {MAX_ATTACHED_ARCHIVES} are attached")
+            entries = entries[:MAX_ATTACHED_ARCHIVES]
+        
+        attached = {row[1] for row in conn.execute("PRAGMA database_list")}
+        aliases = []
+        for entry in entries:
+            alias = f"archive_{entry['academic_year']}"
+            path = os.path.join(self.archive_dir, entry['file_name'])
+            if alias not in attached:
+                if not os.path.exists(path):
+                    logger.warning(f"Archive missing, {table} for {entry['academic_year']} unavailable: {path}")
+                    continue
+                conn.execute("ATTACH DATABASE ? AS " + alias, (path,))
+            aliases.append(alias)
+        
+        view = f"{table}_all"
+        signature = f"-- archives: {','.join(sorted(aliases))}"
+        existing = conn.execute(
+            "SELECT sql FROM sqlite_temp_master WHERE type = 'view' AND name = ?", (view,)
+        ).fetchone()
+        if existing is None or not existing[0].endswith(signature):
+            columns = [row[1] for row in conn.execute(f"PRAGMA main.table_info({table})")]
+            selects = [f"SELECT {', '.join(columns)} FROM main.{table}"]
+            for alias in aliases:
+                archived = {row[1] for row in conn.execute(f"PRAGMA {alias}.table_info({table})")}
+                select_list = ", ".join(c if c in archived else f"NULL AS {c}" for c in columns)
+                selects.append(f"SELECT {select_list} FROM {alias}.{table}")
+            conn.execute(f"DROP VIEW IF EXISTS temp.{view}")
+            conn.execute(f"CREATE TEMP VIEW {view} AS " + " UNION ALL ".join(selects) + "\n" + signature)
+        return f"temp.{view}"
+
+
+# Global archive service instance
+_archive_service = None
+
+
+def get_archive_service() -> ArchiveService:
+    """Get global archive service instance."""
+    global _archive_service
+    if _archive_service is None:
+        _archive_service = ArchiveService()
+        from services.backup_service import register_restore_listener
+        register_restore_listener(_archive_service.invalidate_catalog)
+    return _archive_service
@@ -0,0 +1,325 @@
+"""Delta-encoded students_audit storage: change sets, keyframes and compaction."""
+import json
+import time
+import logging
+import sqlite3
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from config.settings import Config, DATABASE_CONFIG
+from core.exceptions import DatabaseError
+from utils.performance.metrics import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+# Columns every UPDATE rewrites; their new values are the audit row's own
+# audit_timestamp / audit_user_* fields, so change sets leave them out
+AUDIT_BOOKKEEPING_COLUMNS = ('updated_at', 'updated_by', 'updated_by_username', 'updated_by_phone', 'version')
+
+# Snapshot columns kept on delta rows so they can be looked up without reconstruction
+AUDIT_IDENTITY_COLUMNS = ('id', 'student_id', 'version')
+
+# Display names for change sets; other columns are title-cased
+AUDIT_FIELD_LABELS = {
+    'student_name': 'Student Name',
+    'father_name': "Father's Name",
+    'father_phone': "Father's Phone",
+    'father_cnic': "Father's CNIC",
+    'mother_name': "Mother's Name",
+    'mother_cnic': "Mother's CNIC",
+    'students_bform_number': 'B-Form Number',
+    'date_of_birth': 'Date of Birth',
+    'is_deleted': 'Deleted',
+}
+
+
+def field_label(column: str) -> str:
+    """Human-readable name of a students column."""
+    return AUDIT_FIELD_LABELS.get(column) or column.replace('_', ' ').title()
+
+
+def _same(old: Any, new: Any) -> bool:
+    # Form values arrive as text while SQLite returns INTEGER affinity columns as int
+    return old == new or (old is not None and new is not None and str(old) == str(new))
+
+
+def diff_snapshots(before: Dict[str, Any], after: Dict[str, Any],
+                   columns: Optional[Iterable[str]] = None) -> Dict[str, List[Any]]:
+    """Change set ``{column: [old, new]}`` for the columns of ``after`` that differ from ``before``.
+    
+    Bookkeeping columns are skipped, as are columns missing from ``after``.
+    """
+    changes = {}
+    for column in (after.keys() if columns is None else columns):
+        if column in AUDIT_BOOKKEEPING_COLUMNS or column not in after:
+            continue
+        old, new = before.get(column), after[column]
+        if not _same(old, new):
+            changes[column] = [old, new]
+    return changes
+
+
+def encode_changes(changes: Optional[Dict[str, List[Any]]]) -> Optional[str]:
+    """Compact JSON text for ``audit_changes``; the same shape SQLite's json_object builds."""
+    if changes is None:
+        return None
+    return json.dumps(changes, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def decode_changes(text: Optional[str]) -> Dict[str, List[Any]]:
+    """Change set stored in ``audit_changes`` (empty for legacy rows or bad JSON)."""
+    if not text:
+        return {}
+    try:
+        changes = json.loads(text)
+    except (TypeError, ValueError):
+        logger.warning("Ignoring unreadable audit change set")
+        return {}
+    return changes if isinstance(changes, dict) else {}
+
+
+def summarize_changes(changes: Dict[str, List[Any]]) -> str:
+    """One-line summary of a change set, stored in ``audit_summary`` for history lists."""
+    labels = [field_label(column) for column in changes]
+    if not labels:
+        return 'Record updated'
+    if len(labels) == 1:
+        return labels[0]
+    return f"{len(labels)} fields: " + ", ".join(labels)
+
+
+def summarize_change_json(text: Optional[str]) -> Optional[str]:
+    """``summarize_changes`` for stored change sets; registered in SQLite as audit_change_summary."""
+    return summarize_changes(decode_changes(text)) if text is not None else None
+
+
+def register_sql_functions(conn: sqlite3.Connection):
+    """Make audit_change_summary(audit_changes) available to SQL on ``conn``."""
+    conn.create_function('audit_change_summary', 1, summarize_change_json, deterministic=True)
+
+
+def keyframe_interval() -> int:
+    return max(Config.AUDIT_KEYFRAME_INTERVAL, 1)
+
+
+def keyframe_due_sql(record_expr: str) -> str:
+    """SQL condition, true when the next audit row of ``record_expr`` must be a keyframe.
+    
+    That is when the student has no keyframe in the hot table yet, or already
+    has ``AUDIT_KEYFRAME_INTERVAL - 1`` deltas after its latest one. Both
+    subqueries are served by idx_students_audit_record.
+    """
+    last_keyframe = (f"(SELECT MAX(k.audit_id) FROM students_audit k "
+                     f"WHERE k.original_record_id = {record_expr} AND k.audit_format = 'keyframe')")
+    return (f"({last_keyframe} IS NULL OR (SELECT COUNT(*) FROM students_audit d "
+            f"WHERE d.original_record_id = {record_expr} AND d.audit_format = 'delta' "
+            f"AND d.audit_id > {last_keyframe}) >= {keyframe_interval() - 1})")
+
+
+def snapshot_columns(conn: sqlite3.Connection, table: str = 'main.students_audit') -> List[str]:
+    """Student columns of an audit table, i.e. everything but the audit_* fields."""
+    schema, _, name = table.rpartition('.')
+    pragma = f"PRAGMA {schema}.table_info({name})" if schema else f"PRAGMA table_info({name})"
+    return [row[1] for row in conn.execute(pragma)
+            if not row[1].startswith('audit_') and row[1] != 'original_record_id']
+
+
+class StudentAuditService:
+    """Reads and compacts delta-encoded ``students_audit`` rows.
+    
+    Rows written before delta storage (``audit_format = 'full'``) hold the
+    whole student row as it was before the change and nothing about the
+    change itself. New rows always carry the change set in
+    ``audit_changes`` as ``{column: [old, new]}``, so history can be
+    rendered from one row. Keyframes (every
+    ``Config.AUDIT_KEYFRAME_INTERVAL``-th change of a student, and every
+    delete) also keep the full original row; deltas keep only
+    ``AUDIT_IDENTITY_COLUMNS`` and leave the rest NULL.
+    
+    The row as it was before any change is rebuilt by ``snapshot``: the
+    nearest earlier keyframe rolled forward through the change sets in
+    between.
+    """
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or Config.DATABASE_PATH
+    
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=DATABASE_CONFIG['timeout'], isolation_level=None)
+    
+    @staticmethod
+    def _fetch(conn: sqlite3.Connection, sql: str, params: Sequence = ()) -> List[Dict[str, Any]]:
+        # Works whatever row_factory the caller's connection uses
+        cursor = conn.execute(sql, params)
+        names = [desc[0] for desc in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+    
+    def snapshot(self, conn: sqlite3.Connection, audit_id: int,
+                 source: str = 'students_audit') -> Optional[Dict[str, Any]]:
+        """The student row as it was just before audit row ``audit_id``, or None if unknown.
+        
+        ``source`` is the relation to read audit rows from, e.g. the view
+        returned by ``ArchiveService.relation_for``.
+        """
+        rows = self._fetch(conn, f"SELECT * FROM {source} WHERE audit_id = ?", (audit_id,))
+        if not rows:
+            return None
+        target = rows[0]
+        columns = [c for c in target if not c.startswith('audit_') and c != 'original_record_id']
+        if target.get('audit_format') != 'delta':
+            return {c: target[c] for c in columns}
+        
+        record_id = target['original_record_id']
+        base = self._fetch(conn, f"""
+            SELECT * FROM {source}
+            WHERE original_record_id = ? AND audit_id < ? AND audit_format != 'delta'
+            ORDER BY audit_id DESC LIMIT 1
+        """, (record_id, audit_id))
+        if base:
+            # Roll the keyframe forward through its own and later changes
+            chain = self._fetch(conn, f"""
+                SELECT audit_id, audit_changes FROM {source}
+                WHERE original_record_id = ? AND audit_id >= ? AND audit_id < ?
+                ORDER BY audit_id
+            """, (record_id, base[0]['audit_id'], audit_id))
+            state = {c: base[0].get(c) for c in columns}
+            for row in chain:
+                for column, (old, new) in decode_changes(row['audit_changes']).items():
+                    state[column] = new
+        else:
+            # Keyframe archived or missing: roll the live row back instead
+            current = self._fetch(conn, "SELECT * FROM students WHERE id = ?", (record_id,))
+            if not current:
+                return None
+            state = {c: current[0].get(c) for c in columns}
+            chain = self._fetch(conn, f"""
+                SELECT audit_changes FROM {source}
+                WHERE original_record_id = ? AND audit_id >= ?
+                ORDER BY audit_id DESC
+            """, (record_id, audit_id))
+            for row in chain:
+                for column, (old, new) in decode_changes(row['audit_changes']).items():
+                    state[column] = old
+        
+        for column in AUDIT_IDENTITY_COLUMNS:
+            if column in target:
+                state[column] = target[column]
+        previous = self._fetch(conn, f"""
+            SELECT audit_timestamp, audit_user_id, audit_username, audit_user_phone FROM {source}
+            WHERE original_record_id = ? AND audit_id < ?
+            ORDER BY audit_id DESC LIMIT 1
+        """, (record_id, audit_id))
+        if previous:
+            # The previous change is what last stamped the bookkeeping columns
+            state.update({
+                'updated_at': previous[0]['audit_timestamp'],
+                'updated_by': previous[0]['audit_user_id'],
+                'updated_by_username': previous[0]['audit_username'],
+                'updated_by_phone': previous[0]['audit_user_phone'],
+            })
+        return state
+    
+    def compact(self, batch_size: int = 200,
+                progress: Optional[Callable[[int, str], None]] = None) -> Dict[str, Any]:
+        """Convert legacy full-copy audit rows to keyframes and deltas.
+        
+        Each legacy row's change set is the difference between its snapshot
+        and the next one (or the live row for the newest). Students are
+        processed ``batch_size`` at a time, one transaction per batch, so the
+        run can be interrupted and repeated. Rows already in an archive are
+        left as they are. Freed pages are reused by later writes; VACUUM
+        returns them to the file system.
+        
+        Returns:
+            dict: students and rows processed, keyframes and deltas written, duration
+        
+        Raises:
+            DatabaseError: If the compaction fails
+        """
+        report = progress or (lambda percent, message: None)
+        stats = {'students': 0, 'rows': 0, 'keyframes': 0, 'deltas': 0}
+        started = time.perf_counter()
+        conn = self._connect()
+        try:
+            columns = snapshot_columns(conn)
+            record_ids = [row[0] for row in conn.execute(
+                "SELECT DISTINCT original_record_id FROM students_audit WHERE audit_format = 'full' ORDER BY 1"
+            )]
+            with get_metrics_registry().timer("audit.compact"):
+                for start in range(0, len(record_ids), max(batch_size, 1)):
+                    batch = record_ids[start:start + max(batch_size, 1)]
+                    report(int(start * 100 / len(record_ids)), f"Compacting audit history ({start}/{len(record_ids)} students)...")
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        for record_id in batch:
+                            self._compact_record(conn, record_id, columns, stats)
+                        conn.execute("COMMIT")
+                    except sqlite3.Error:
+                        conn.execute("ROLLBACK")
+                        raise
+                    stats['students'] += len(batch)
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to compact student audit history: {e}")
+        finally:
+            conn.close()
+        
+        stats['duration_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        report(100, "Audit history compacted")
+        logger.info(
+            f"Compacted {stats['rows']} audit rows of {stats['students']} students into "
+            f"{stats['keyframes']} keyframes and {stats['deltas']} deltas in {stats['duration_ms']:.0f} ms"
+        )
+        return stats
+    
+    def _compact_record(self, conn: sqlite3.Connection, record_id: int,
+                        columns: List[str], stats: Dict[str, int]):
+        rows = self._fetch(conn, f"""
+            SELECT audit_id, audit_action, audit_format, {', '.join(columns)}
+            FROM students_audit WHERE original_record_id = ? ORDER BY audit_id
+        """, (record_id,))
+        current = self._fetch(conn, f"SELECT {', '.join(columns)} FROM students WHERE id = ?", (record_id,))
+        blanked = [c for c in columns if c not in AUDIT_IDENTITY_COLUMNS]
+        interval = keyframe_interval()
+        since_keyframe = None
+        
+        for index, row in enumerate(rows):
+            if row['audit_format'] != 'full':
+                since_keyframe = 0 if row['audit_format'] == 'keyframe' else (since_keyframe or 0) + 1
+                continue
+            
+            following = rows[index + 1] if index + 1 < len(rows) else (current[0] if current else None)
+            if following is not None and following.get('audit_format') == 'delta':
+                following = None  # no snapshot to diff against
+            changes = diff_snapshots(row, following, columns) if following is not None else None
+            
+            summary = summarize_changes(changes) if changes is not None else None
+            keyframe = (since_keyframe is None or since_keyframe >= interval - 1
+                        or changes is None or row['audit_action'] == 'DELETE')
+            if keyframe:
+                conn.execute(
+                    "UPDATE students_audit SET audit_format = 'keyframe', audit_changes = ?, audit_summary = ? "
+                    "WHERE audit_id = ?",
+                    (encode_changes(changes), summary, row['audit_id'])
+                )
+                since_keyframe = 0
+                stats['keyframes'] += 1
+            else:
+                conn.execute(f"""
+                    UPDATE students_audit SET audit_format = 'delta', audit_changes = ?, audit_summary = ?,
+                        {', '.join(f'{c} = NULL' for c in blanked)}
+                    WHERE audit_id = ?
+                """, (encode_changes(changes), summary, row['audit_id']))
+                since_keyframe += 1
+                stats['deltas'] += 1
+            stats['rows'] += 1
+
+
+# Global student audit service instance
+_student_audit_service = None
+
+
+def get_student_audit_service() -> StudentAuditService:
+    """Get global student audit service instance."""
+    global _student_audit_service
+    if _student_audit_service is None:
+        _student_audit_service = StudentAuditService()
+    return _student_audit_service
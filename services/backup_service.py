@@ -1,4 +1,8 @@
 """Automated backup and recovery service."""
+import hashlib
+import hmac
+import io
+import json
 import os
 import shutil
 import sqlite3
@@ -6,15 +10,67 @@ import logging
 import zipfile
 import schedule
 import time
+import struct
+import tempfile
 import threading
+import weakref
+import zlib
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import List, Optional
-from config.settings import Config
+from typing import BinaryIO, Callable, Dict, List, Optional
+from config.settings import Config, DATABASE_CONFIG
 from config.security import DataEncryption
 from core.exceptions import BackupError
 
 logger = logging.getLogger(__name__)
 
+# Chunked encryption format: magic, then frames of [4-byte length][Fernet token].
+# Each token authenticates an 8-byte frame index and a final-frame flag along with
+# the data, so reordered, dropped or truncated frames are rejected on restore.
+ENCRYPTED_BACKUP_MAGIC = b'SMISBAK2'
+_FRAME_LENGTH = struct.Struct('>I')
+_FRAME_HEADER = struct.Struct('>Q?')
+
+def _page_size_from_header(header: bytes) -> int:
+    """Page size recorded in a SQLite database header (bytes 16-17; 1 means 65536)."""
+    page_size = struct.unpack('>H', header[16:18])[0]
+    return 65536 if page_size == 1 else page_size
+
+class _EncryptingWriter(io.RawIOBase):
+    """Write-only stream that encrypts everything written to it in fixed-size frames."""
+    
+    def __init__(self, fileobj, cipher, chunk_size: int):
+        super().__init__()
+        self._file = fileobj
+        self._cipher = cipher
+        self._chunk_size = max(1, chunk_size)
+        self._buffer = bytearray()
+        self._index = 0
+        self._file.write(ENCRYPTED_BACKUP_MAGIC)
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._buffer.extend(data)
+        while len(self._buffer) > self._chunk_size:
+            self._write_frame(bytes(self._buffer[:self._chunk_size]), final=False)
+            del self._buffer[:self._chunk_size]
+        return len(data)
+    
+    def _write_frame(self, chunk: bytes, final: bool):
+        token = self._cipher.encrypt(_FRAME_HEADER.pack(self._index, final) + chunk)
+        self._file.write(_FRAME_LENGTH.pack(len(token)))
+        self._file.write(token)
+        self._index += 1
+    
+    def close(self):
+        if not self.closed:
+            # Always emit a final frame, even if empty, so truncation is detectable
+            self._write_frame(bytes(self._buffer), final=True)
+            self._buffer.clear()
+        super().close()
+
 class BackupManager:
     """Manages database backups and recovery operations."""
     
@@ -23,6 +79,8 @@ class BackupManager:
         self.encryption = DataEncryption() if Config.ENCRYPTION_ENABLED else None
         self.backup_thread = None
         self.running = False
+        self._store_lock = threading.Lock()
+        self._chunk_naming = 'hmac-sha256' if self.encryption else 'sha256'
         self._ensure_backup_directory()
     
     def _ensure_backup_directory(self):
@@ -33,64 +91,147 @@ class BackupManager:
         except Exception as e:
             raise BackupError(f"Failed to create backup directory: {e}")
     
-    def create_backup(self, backup_name: str = None) -> str:
-        """Create a database backup."""
+    def create_backup(self, backup_name: str = None,
+                      progress_callback: Optional[Callable[[str, int, int], None]] = None) -> str:
+        """Create a database backup.
+        
+        A consistent snapshot of the database (see _database_snapshot) is streamed
+        through zip compression and, when enabled, chunked encryption into the
+        final file. No plaintext copy is written to the backup directory.
+        
+        Args:
+            backup_name: Name for the backup (defaults to a timestamped name)
+            progress_callback: Optional callable receiving (stage, done, total) where
+                stage is 'snapshot' (pages) or 'compress' (bytes)
+        """
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_name = backup_name or f"backup_{timestamp}"
-            backup_path = os.path.join(self.backup_dir, f"{backup_name}.db")
-            
-            # Create backup using sqlite3 backup API
-            source_conn = sqlite3.connect(Config.DATABASE_PATH)
-            backup_conn = sqlite3.connect(backup_path)
-            
-            source_conn.backup(backup_conn)
-            
-            source_conn.close()
-            backup_conn.close()
             
-            # Create compressed backup with metadata
-            compressed_backup_path = self._create_compressed_backup(backup_path, backup_name)
-            
-            # Remove uncompressed backup
-            os.remove(backup_path)
-            
-            # Encrypt backup if encryption is enabled
-            if self.encryption:
-                encrypted_path = self._encrypt_backup(compressed_backup_path)
-                os.remove(compressed_backup_path)
-                compressed_backup_path = encrypted_path
+            # Compress (and encrypt) a consistent snapshot in a single streaming pass
+            with self._database_snapshot(progress_callback) as snapshot:
+                backup_path = self._create_compressed_backup(snapshot, backup_name, progress_callback)
             
             # Create backup metadata
-            self._create_backup_metadata(compressed_backup_path, backup_name)
+            self._create_backup_metadata(backup_path, backup_name)
             
-            logger.info(f"Backup created successfully: {compressed_backup_path}")
-            return compressed_backup_path
+            logger.info(f"Backup created successfully: {backup_path}")
+            return backup_path
             
         except Exception as e:
             logger.error(f"Backup creation failed: {e}")
             raise BackupError(f"Failed to create backup: {e}")
     
-    def _create_compressed_backup(self, backup_path: str, backup_name: str) -> str:
-        """Create compressed backup with additional files."""
+    @contextmanager
+    def _database_snapshot(self, progress_callback: Optional[Callable[[str, int, int], None]] = None,
+                           source_path: Optional[str] = None):
+        """Yield a readable stream over a consistent image of the live database (or ``source_path``).
+        
+        Databases up to BACKUP_MEMORY_SNAPSHOT_MAX_BYTES are serialized from a
+        single read transaction straight into memory, so no plaintext copy
+        reaches the disk and writers are not blocked in WAL mode. Larger files
+        are copied with the backup API in page steps into an owner-only
+        temporary file in the system temp directory, which is removed as soon
+        as the stream is closed.
+        """
+        source = source_path or Config.DATABASE_PATH
+        source_conn = sqlite3.connect(source, timeout=DATABASE_CONFIG['timeout'])
+        try:
+            if (hasattr(source_conn, 'serialize')
+                    and os.path.getsize(source) <= Config.BACKUP_MEMORY_SNAPSHOT_MAX_BYTES):
+                image = source_conn.serialize()
+                source_conn.close()
+                if progress_callback:
+                    pages = len(image) // _page_size_from_header(image)
+                    progress_callback('snapshot', pages, pages)
+                with io.BytesIO(image) as stream:
+                    yield stream
+                return
+            
+            fd, temp_path = tempfile.mkstemp(prefix='smis_snapshot_', suffix='.db')
+            os.close(fd)
+            try:
+                self._copy_database(source_conn, temp_path, progress_callback)
+                source_conn.close()
+                with open(temp_path, 'rb') as stream:
+                    yield stream
+            finally:
+                try:
+                    os.remove(temp_path)
+                except OSError as e:
+                    logger.warning(f"Failed to remove backup snapshot {temp_path}: {e}")
+        finally:
+            source_conn.close()
+    
+    @staticmethod
+    def _copy_database(source_conn: sqlite3.Connection, target_path: str,
+                       progress_callback: Optional[Callable[[str, int, int], None]] = None):
+        """Copy a database to target_path using the backup API in page steps."""
+        def _on_progress(status, remaining, total):
+            if progress_callback:
+                progress_callback('snapshot', total - remaining, total)
+        
+        target_conn = sqlite3.connect(target_path)
+        try:
+            source_conn.backup(
+                target_conn,
+                pages=max(1, Config.BACKUP_PAGES_PER_STEP),
+                progress=_on_progress
+            )
+        finally:
+            target_conn.close()
+    
+    def _create_compressed_backup(self, snapshot: BinaryIO, backup_name: str,
+                                  progress_callback: Optional[Callable[[str, int, int], None]] = None) -> str:
+        """Create compressed backup with additional files.
+        
+        The snapshot stream is read and compressed in BACKUP_CHUNK_SIZE pieces; when
+        encryption is enabled the zip stream is encrypted frame by frame as it is
+        produced, so the zip never reaches the disk in plaintext.
+        """
         compressed_path = os.path.join(self.backup_dir, f"{backup_name}.zip")
+        if self.encryption:
+            compressed_path += '.enc'
+        chunk_size = max(1, Config.BACKUP_CHUNK_SIZE)
         
         try:
-            with zipfile.ZipFile(compressed_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                # Add database backup
-                zipf.write(backup_path, os.path.basename(backup_path))
-                
-                # Add configuration files if they exist
-                config_files = ['config/settings.py', 'config/security.py']
-                for config_file in config_files:
-                    if os.path.exists(config_file):
-                        zipf.write(config_file, config_file)
-                
-                # Add recent logs
-                self._add_recent_logs_to_backup(zipf)
+            with open(compressed_path, 'wb') as out_file:
+                sink = _EncryptingWriter(out_file, self.encryption.cipher, chunk_size) if self.encryption else out_file
+                try:
+                    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                        # Add database backup
+                        total = snapshot.seek(0, io.SEEK_END)
+                        snapshot.seek(0)
+                        done = 0
+                        with zipf.open(f"{backup_name}.db", 'w', force_zip64=True) as dest:
+                            while True:
+                                chunk = snapshot.read(chunk_size)
+                                if not chunk:
+                                    break
+                                dest.write(chunk)
+                                done += len(chunk)
+                                if progress_callback:
+                                    progress_callback('compress', done, total)
+                        
+                        # Add configuration files if they exist
+                        config_files = ['config/settings.py', 'config/security.py']
+                        for config_file in config_files:
+                            if os.path.exists(config_file):
+                                zipf.write(config_file, config_file)
+                        
+                        # Add recent logs
+                        self._add_recent_logs_to_backup(zipf)
+                        
+                        # Reference closed-year archives, which are not in the main database
+                        self._add_archive_manifests_to_backup(zipf)
+                finally:
+                    if sink is not out_file:
+                        sink.close()
             
             return compressed_path
         except Exception as e:
+            if os.path.exists(compressed_path):
+                os.remove(compressed_path)
             raise BackupError(f"Failed to compress backup: {e}")
     
     def _add_recent_logs_to_backup(self, zipf: zipfile.ZipFile):
@@ -105,6 +246,25 @@ class BackupManager:
         except Exception as e:
             logger.warning(f"Failed to add logs to backup: {e}")
     
+    def _archive_files(self) -> List[str]:
+        """Academic-year archive files currently in ARCHIVE_DIR."""
+        if not os.path.isdir(Config.ARCHIVE_DIR):
+            return []
+        return sorted(
+            os.path.join(Config.ARCHIVE_DIR, filename) for filename in os.listdir(Config.ARCHIVE_DIR)
+            if filename.startswith('archive_') and filename.endswith('.db')
+        )
+    
+    def _add_archive_manifests_to_backup(self, zipf: zipfile.ZipFile):
+        """Add each archive's store manifest under archives/ instead of the archive itself.
+        
+        Archives are stored once in the incremental store (see backup_archive),
+        so a full backup only carries the few-KB manifest of the version it
+        saw; the cold years are not read or compressed again.
+        """
+        for archive_path in self._archive_files():
+            zipf.write(self.backup_archive(archive_path), f"archives/{os.path.basename(archive_path)}.json")
+    
     def _get_recent_log_files(self) -> List[str]:
         """Get list of recent log files."""
         log_files = []
@@ -125,22 +285,6 @@ class BackupManager:
         
         return log_files
     
-    def _encrypt_backup(self, backup_path: str) -> str:
-        """Encrypt backup file."""
-        try:
-            with open(backup_path, 'rb') as f:
-                backup_data = f.read()
-            
-            encrypted_data = self.encryption.cipher.encrypt(backup_data)
-            
-            encrypted_path = backup_path + '.enc'
-            with open(encrypted_path, 'wb') as f:
-                f.write(encrypted_data)
-            
-            return encrypted_path
-        except Exception as e:
-            raise BackupError(f"Failed to encrypt backup: {e}")
-    
     def _create_backup_metadata(self, backup_path: str, backup_name: str):
         """Create metadata file for backup."""
         try:
@@ -151,7 +295,10 @@ class BackupManager:
                 'backup_path': backup_path,
                 'encrypted': self.encryption is not None,
                 'compressed': True,
-                'version': '1.0'
+                'encryption_format': 'chunked' if self.encryption is not None else None,
+                'chunk_size': Config.BACKUP_CHUNK_SIZE,
+                'size': os.path.getsize(backup_path),
+                'version': '2.0'
             }
             
             metadata_path = backup_path + '.meta'
@@ -163,56 +310,215 @@ class BackupManager:
             logger.warning(f"Failed to create backup metadata: {e}")
     
     def restore_backup(self, backup_path: str) -> bool:
-        """Restore database from backup."""
+        """Restore database from backup while the application keeps running.
+        
+        The backup is resolved to a plain database file (incremental manifest,
+        encrypted and/or zipped archive), checked with PRAGMA quick_check, and then
+        copied page-by-page into the live database with the SQLite backup API. Open
+        connections see the restored content on their next statement, and registered
+        restore listeners are notified so they can drop cached state.
+        """
+        temp_files = []
         try:
             if not os.path.exists(backup_path):
                 raise BackupError(f"Backup file not found: {backup_path}")
             
-            # Create backup of current database before restore
-            current_backup = self.create_backup("pre_restore_backup")
-            logger.info(f"Current database backed up to: {current_backup}")
+            # Resolve the backup to a database file
+            source_path = backup_path
+            bundled_archives = None
+            archive_manifests = None
+            if source_path.endswith('.json'):
+                archive_manifests = self._load_manifest(source_path).get('archive_manifests')
+                source_path = self.restore_incremental_backup(source_path)
+                temp_files.append(source_path)
             
             # Decrypt if necessary
-            if backup_path.endswith('.enc'):
-                backup_path = self._decrypt_backup(backup_path)
+            if source_path.endswith('.enc'):
+                source_path = self._decrypt_backup(source_path)
+                temp_files.append(source_path)
             
             # Extract if compressed
-            if backup_path.endswith('.zip'):
-                backup_path = self._extract_backup(backup_path)
+            if source_path.endswith('.zip'):
+                source_path = self._extract_backup(source_path)
+                temp_files.append(source_path)
+                bundled_archives = os.path.join(os.path.dirname(source_path), 'archives')
+            
+            # Check the candidate before touching the live database
+            if not self._verify_database_integrity(source_path, quick=True):
+                raise BackupError("Backup failed integrity check; live database left untouched")
             
-            # Restore database
-            if os.path.exists(Config.DATABASE_PATH):
-                os.remove(Config.DATABASE_PATH)
+            # Cheap snapshot of the current database before restore
+            current_backup = self._create_pre_restore_snapshot()
+            if current_backup:
+                logger.info(f"Current database backed up to: {current_backup}")
             
-            shutil.copy2(backup_path, Config.DATABASE_PATH)
+            # Restore database into the live file through SQLite
+            source_conn = sqlite3.connect(source_path)
+            live_conn = sqlite3.connect(Config.DATABASE_PATH, timeout=DATABASE_CONFIG['timeout'])
+            try:
+                source_conn.backup(live_conn)
+            finally:
+                source_conn.close()
+                live_conn.close()
             
             # Verify restored database
-            if self._verify_database_integrity():
-                logger.info(f"Database restored successfully from: {backup_path}")
-                return True
-            else:
+            if not self._verify_database_integrity(quick=True):
                 raise BackupError("Restored database failed integrity check")
             
+            self._restore_archives(bundled_archives, archive_manifests)
+            
+            _notify_restore_listeners(backup_path)
+            logger.info(f"Database restored successfully from: {backup_path}")
+            return True
+            
         except Exception as e:
             logger.error(f"Restore failed: {e}")
             raise BackupError(f"Failed to restore backup: {e}")
+        finally:
+            # Rebuilt, decrypted and extracted copies are no longer needed
+            for temp_file in temp_files:
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+            if bundled_archives:
+                shutil.rmtree(bundled_archives, ignore_errors=True)
+    
+    def _restore_archives(self, bundled_dir: Optional[str] = None,
+                          archive_manifests: Optional[Dict[str, str]] = None) -> List[str]:
+        """Put back archive files that the restored catalog lists but ARCHIVE_DIR lacks.
+        
+        Each archive is rebuilt from the store manifest of the version the
+        backup referenced: bundled in a full backup (``bundled_dir``) or named
+        in an incremental manifest (``archive_manifests``). Older full backups
+        bundled the archive file itself, and without either the latest stored
+        version is used. Archives found nowhere are logged and stay
+        unavailable; reads through ArchiveService skip them.
+        
+        Returns:
+            list: file names of archives that are still missing
+        """
+        conn = sqlite3.connect(Config.DATABASE_PATH)
+        try:
+            file_names = [row[0] for row in conn.execute("SELECT DISTINCT file_name FROM archive_catalog")]
+        except sqlite3.Error:
+            file_names = []  # backup taken before archiving existed
+        finally:
+            conn.close()
+        
+        missing = []
+        for file_name in file_names:
+            target_path = os.path.join(Config.ARCHIVE_DIR, file_name)
+            if os.path.exists(target_path):
+                continue
+            bundled_path = os.path.join(bundled_dir, file_name) if bundled_dir else None
+            manifest_path = self._archive_manifest_path(file_name)
+            if bundled_path and os.path.exists(bundled_path + '.json'):
+                manifest_path = bundled_path + '.json'
+            elif archive_manifests and file_name in archive_manifests:
+                manifest_path = self._store_path('archives', archive_manifests[file_name])
+            try:
+                os.makedirs(Config.ARCHIVE_DIR, exist_ok=True)
+                if bundled_path and os.path.exists(bundled_path):
+                    temp_path = target_path + '.tmp'
+                    shutil.copyfile(bundled_path, temp_path)
+                    os.replace(temp_path, target_path)
+                elif os.path.exists(manifest_path):
+                    self.restore_incremental_backup(manifest_path, target_path)
+                else:
+                    missing.append(file_name)
+                    continue
+                logger.info(f"Archive restored: {target_path}")
+            except Exception as e:
+                logger.warning(f"Failed to restore archive {file_name}: {e}")
+                missing.append(file_name)
+        
+        if missing:
+            logger.warning(f"Archives listed in the restored catalog are unavailable: {', '.join(missing)}")
+        return missing
+    
+    def _create_pre_restore_snapshot(self) -> Optional[str]:
+        """Snapshot the live database before it is overwritten.
+        
+        Uses the incremental store so only pages that differ from the last snapshot
+        are written; falls back to VACUUM INTO if that fails.
+        """
+        if not os.path.exists(Config.DATABASE_PATH):
+            return None
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        try:
+            return self.create_incremental_backup(f"pre_restore_{timestamp}")
+        except Exception as e:
+            logger.warning(f"Incremental pre-restore snapshot failed, using VACUUM INTO: {e}")
+        
+        snapshot_path = os.path.join(self.backup_dir, f"pre_restore_{timestamp}.db")
+        try:
+            conn = sqlite3.connect(Config.DATABASE_PATH)
+            try:
+                conn.execute("VACUUM INTO ?", (snapshot_path,))
+            finally:
+                conn.close()
+            return snapshot_path
+        except Exception as e:
+            logger.warning(f"Pre-restore snapshot failed: {e}")
+            return None
     
     def _decrypt_backup(self, encrypted_path: str) -> str:
-        """Decrypt backup file."""
+        """Decrypt backup file.
+        
+        Chunked backups are decrypted one frame at a time; files written by the
+        older single-token format are still accepted.
+        """
         try:
-            with open(encrypted_path, 'rb') as f:
-                encrypted_data = f.read()
-            
-            decrypted_data = self.encryption.cipher.decrypt(encrypted_data)
+            if not self.encryption:
+                raise BackupError("Encryption is disabled; cannot decrypt backup")
             
-            decrypted_path = encrypted_path.replace('.enc', '')
-            with open(decrypted_path, 'wb') as f:
-                f.write(decrypted_data)
+            decrypted_path = encrypted_path[:-len('.enc')]
+            with open(encrypted_path, 'rb') as src:
+                magic = src.read(len(ENCRYPTED_BACKUP_MAGIC))
+                if magic != ENCRYPTED_BACKUP_MAGIC:
+                    # Legacy format: one Fernet token for the whole archive
+                    decrypted_data = self.encryption.cipher.decrypt(magic + src.read())
+                    with open(decrypted_path, 'wb') as f:
+                        f.write(decrypted_data)
+                    return decrypted_path
+                
+                try:
+                    with open(decrypted_path, 'wb') as dest:
+                        self._decrypt_frames(src, dest)
+                except Exception:
+                    # Never leave a partially decrypted archive behind
+                    if os.path.exists(decrypted_path):
+                        os.remove(decrypted_path)
+                    raise
             
             return decrypted_path
         except Exception as e:
             raise BackupError(f"Failed to decrypt backup: {e}")
     
+    def _decrypt_frames(self, src, dest):
+        """Decrypt and verify chunked frames from src into dest."""
+        expected_index = 0
+        while True:
+            length_bytes = src.read(_FRAME_LENGTH.size)
+            if len(length_bytes) < _FRAME_LENGTH.size:
+                raise BackupError("Backup is truncated")
+            (length,) = _FRAME_LENGTH.unpack(length_bytes)
+            token = src.read(length)
+            if len(token) < length:
+                raise BackupError("Backup is truncated")
+            
+            plaintext = self.encryption.cipher.decrypt(token)
+            index, final = _FRAME_HEADER.unpack_from(plaintext)
+            if index != expected_index:
+                raise BackupError(f"Backup frame out of order (expected {expected_index}, got {index})")
+            dest.write(plaintext[_FRAME_HEADER.size:])
+            expected_index += 1
+            
+            if final:
+                if src.read(1):
+                    raise BackupError("Unexpected data after final backup frame")
+                return
+    
     def _extract_backup(self, zip_path: str) -> str:
         """Extract database from compressed backup."""
         try:
@@ -232,14 +538,14 @@ class BackupManager:
         except Exception as e:
             raise BackupError(f"Failed to extract backup: {e}")
     
-    def _verify_database_integrity(self) -> bool:
-        """Verify database integrity after restore."""
+    def _verify_database_integrity(self, database_path: str = None, quick: bool = False) -> bool:
+        """Verify database integrity (quick_check skips the slower index checks)."""
         try:
-            conn = sqlite3.connect(Config.DATABASE_PATH)
+            conn = sqlite3.connect(database_path or Config.DATABASE_PATH)
             cursor = conn.cursor()
             
             # Run integrity check
-            cursor.execute("PRAGMA integrity_check")
+            cursor.execute("PRAGMA quick_check" if quick else "PRAGMA integrity_check")
             result = cursor.fetchone()
             
             conn.close()
@@ -290,6 +596,353 @@ class BackupManager:
         
         return backups
     
+    # ------------------------------------------------------------------
+    # Incremental (content-addressed) backups
+    # ------------------------------------------------------------------
+    
+    def _store_path(self, *parts: str) -> str:
+        """Path inside the incremental backup store."""
+        return os.path.join(self.backup_dir, 'incremental', *parts)
+    
+    def _chunk_path(self, digest: str) -> str:
+        """Path of a stored chunk, fanned out by the first two hex digits."""
+        return self._store_path('chunks', digest[:2], digest)
+    
+    def _chunk_hasher(self, naming: str):
+        """Hash for chunk names and checksums.
+        
+        Encrypted stores key it with an HMAC derived from the encryption key, so
+        chunk names do not reveal whether a known page is in a backup; plain
+        stores use SHA-256 as before.
+        """
+        if naming == 'sha256':
+            return hashlib.sha256()
+        if naming != 'hmac-sha256':
+            raise BackupError(f"Unknown backup chunk naming: {naming}")
+        if not self.encryption:
+            raise BackupError("Backup chunks are keyed but encryption is disabled")
+        name_key = hmac.new(self.encryption.key, b'smis-backup-chunk-names', hashlib.sha256).digest()
+        return hmac.new(name_key, digestmod=hashlib.sha256)
+    
+    def _chunk_digest(self, data: bytes, naming: str) -> str:
+        hasher = self._chunk_hasher(naming)
+        hasher.update(data)
+        return hasher.hexdigest()
+    
+    def _store_chunk(self, digest: str, data: bytes) -> int:
+        """Store a chunk if it is not already present. Returns bytes written."""
+        chunk_path = self._chunk_path(digest)
+        if os.path.exists(chunk_path):
+            return 0
+        
+        payload = zlib.compress(data, 6)
+        if self.encryption:
+            payload = self.encryption.cipher.encrypt(payload)
+        
+        os.makedirs(os.path.dirname(chunk_path), exist_ok=True)
+        temp_path = chunk_path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(temp_path, chunk_path)
+        return len(payload)
+    
+    def _load_chunk(self, digest: str, manifest: dict) -> bytes:
+        """Load a chunk of ``manifest`` and verify it still hashes to its name.
+        
+        Whether the chunk is encrypted comes from the manifest that wrote it,
+        not from the current settings.
+        """
+        chunk_path = self._chunk_path(digest)
+        if not os.path.exists(chunk_path):
+            raise BackupError(f"Backup chunk missing: {digest}")
+        
+        with open(chunk_path, 'rb') as f:
+            payload = f.read()
+        if manifest.get('encrypted'):
+            if not self.encryption:
+                raise BackupError("Backup is encrypted but encryption is disabled")
+            payload = self.encryption.cipher.decrypt(payload)
+        data = zlib.decompress(payload)
+        
+        if self._chunk_digest(data, manifest.get('chunk_naming', 'sha256')) != digest:
+            raise BackupError(f"Backup chunk failed hash verification: {digest}")
+        return data
+    
+    def _store_snapshot(self, snapshot: BinaryIO,
+                        progress_callback: Optional[Callable[[str, int, int], None]] = None) -> dict:
+        """Split a database snapshot stream into chunks in the store; returns the manifest fields."""
+        total = snapshot.seek(0, io.SEEK_END)
+        snapshot.seek(0)
+        page_size = _page_size_from_header(snapshot.read(100))
+        snapshot.seek(0)
+        chunk_size = page_size * max(1, Config.BACKUP_CHUNK_PAGES)
+        
+        naming = self._chunk_naming
+        file_hash = self._chunk_hasher(naming)
+        chunks = []
+        new_chunks = 0
+        new_bytes = 0
+        
+        while True:
+            data = snapshot.read(chunk_size)
+            if not data:
+                break
+            digest = self._chunk_digest(data, naming)
+            file_hash.update(data)
+            written = self._store_chunk(digest, data)
+            if written:
+                new_chunks += 1
+                new_bytes += written
+            chunks.append(digest)
+            if progress_callback:
+                progress_callback('chunk', snapshot.tell(), total)
+        
+        return {
+            'page_size': page_size,
+            'chunk_size': chunk_size,
+            'size': total,
+            'chunk_naming': naming,
+            'checksum': file_hash.hexdigest(),
+            'encrypted': self.encryption is not None,
+            'chunks': chunks,
+            'new_chunks': new_chunks,
+            'new_bytes': new_bytes,
+        }
+    
+    @staticmethod
+    def _write_manifest(manifest_path: str, manifest: dict):
+        temp_path = manifest_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temp_path, manifest_path)
+    
+    def create_incremental_backup(self, backup_name: str = None,
+                                  progress_callback: Optional[Callable[[str, int, int], None]] = None) -> str:
+        """Create a deduplicated snapshot in the content-addressed store.
+        
+        The database snapshot is split into fixed runs of BACKUP_CHUNK_PAGES pages,
+        each chunk is stored once under its hash (see _chunk_hasher), and a manifest
+        lists the chunk hashes in order. Unchanged pages cost nothing on subsequent
+        snapshots.
+        Archive files are stored alongside (see backup_archive); the manifest
+        lists them in ``archives`` and the stored version of each in
+        ``archive_manifests``.
+        
+        Returns:
+            str: Path to the snapshot manifest
+        """
+        try:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            backup_name = backup_name or f"incremental_{timestamp}"
+            
+            archive_manifests = {
+                os.path.basename(archive_path): os.path.basename(self.backup_archive(archive_path))
+                for archive_path in self._archive_files()
+            }
+            
+            with self._store_lock:
+                os.makedirs(self._store_path('manifests'), exist_ok=True)
+                with self._database_snapshot(progress_callback) as snapshot:
+                    stored = self._store_snapshot(snapshot, progress_callback)
+                
+                manifest = {
+                    'backup_name': backup_name,
+                    'created_at': datetime.now().isoformat(),
+                    'database_path': Config.DATABASE_PATH,
+                    **stored,
+                    'archives': sorted(archive_manifests),
+                    'archive_manifests': archive_manifests,
+                    'version': '1.0'
+                }
+                
+                manifest_path = self._store_path('manifests', f"{backup_name}.json")
+                self._write_manifest(manifest_path, manifest)
+            
+            logger.info(
+                f"Incremental backup created: {manifest_path} "
+                f"({len(manifest['chunks'])} chunks, {manifest['new_chunks']} new, "
+                f"{manifest['new_bytes']} bytes stored)"
+            )
+            return manifest_path
+            
+        except BackupError:
+            raise
+        except Exception as e:
+            logger.error(f"Incremental backup failed: {e}")
+            raise BackupError(f"Failed to create incremental backup: {e}")
+    
+    def _archive_manifest_path(self, file_name: str) -> str:
+        return self._store_path('archives', f"{file_name}.json")
+    
+    def backup_archive(self, archive_path: str) -> str:
+        """Store an academic-year archive file in the incremental store.
+        
+        Archives are written once, so a file whose size and modification time
+        match its stored manifest is not read again. ArchiveService calls this
+        before it deletes the archived rows from the main database.
+        
+        Besides ``<file>.json`` (the latest version), each stored version keeps
+        a ``<file>@<checksum>.json`` manifest. Backups reference that one, and
+        garbage collection keeps its chunks, so an archive that is extended
+        later still restores as the backup saw it.
+        
+        Returns:
+            str: Path to the manifest of the stored version
+        """
+        file_name = os.path.basename(archive_path)
+        manifest_path = self._archive_manifest_path(file_name)
+        try:
+            stat = os.stat(archive_path)
+            if os.path.exists(manifest_path):
+                stored = self._load_manifest(manifest_path)
+                if stored.get('source_size') == stat.st_size and stored.get('source_mtime') == stat.st_mtime:
+                    return self._pin_archive_version(stored)
+            
+            with self._store_lock:
+                os.makedirs(self._store_path('archives'), exist_ok=True)
+                with self._database_snapshot(source_path=archive_path) as snapshot:
+                    stored = self._store_snapshot(snapshot)
+                manifest = {
+                    'backup_name': file_name,
+                    'created_at': datetime.now().isoformat(),
+                    'archive_path': archive_path,
+                    'source_size': stat.st_size,
+                    'source_mtime': stat.st_mtime,
+                    **stored,
+                    'version': '1.0'
+                }
+                self._write_manifest(manifest_path, manifest)
+                version_path = self._pin_archive_version(manifest)
+            
+            logger.info(f"Archive backed up: {archive_path} ({manifest['new_bytes']} bytes stored)")
+            return version_path
+            
+        except BackupError:
+            raise
+        except Exception as e:
+            logger.error(f"Archive backup failed: {e}")
+            raise BackupError(f"Failed to back up archive {file_name}: {e}")
+    
+    def _pin_archive_version(self, manifest: dict) -> str:
+        """Write (once) the per-version copy of an archive manifest and return its path."""
+        version_path = self._archive_manifest_path(f"{manifest['backup_name']}@{manifest['checksum'][:16]}")
+        if not os.path.exists(version_path):
+            self._write_manifest(version_path, manifest)
+        return version_path
+    
+    def _load_manifest(self, manifest_path: str) -> dict:
+        """Read a snapshot manifest."""
+        if not os.path.exists(manifest_path):
+            raise BackupError(f"Backup manifest not found: {manifest_path}")
+        with open(manifest_path, 'r') as f:
+            return json.load(f)
+    
+    def restore_incremental_backup(self, manifest_path: str, target_path: str = None) -> str:
+        """Rebuild a database file from a manifest, verifying every chunk.
+        
+        Args:
+            manifest_path: Path to the snapshot manifest
+            target_path: Where to write the database (defaults to the extract dir)
+            
+        Returns:
+            str: Path to the rebuilt database file
+        """
+        try:
+            manifest = self._load_manifest(manifest_path)
+            if target_path is None:
+                extract_dir = os.path.join(self.backup_dir, 'temp_extract')
+                os.makedirs(extract_dir, exist_ok=True)
+                target_path = os.path.join(extract_dir, f"{manifest['backup_name']}.db")
+            
+            file_hash = self._chunk_hasher(manifest.get('chunk_naming', 'sha256'))
+            try:
+                with open(target_path, 'wb') as f:
+                    for digest in manifest['chunks']:
+                        data = self._load_chunk(digest, manifest)
+                        file_hash.update(data)
+                        f.write(data)
+                    size = f.tell()
+                
+                checksum = manifest.get('checksum', manifest.get('sha256'))
+                if size != manifest['size'] or file_hash.hexdigest() != checksum:
+                    raise BackupError("Rebuilt database does not match manifest checksum")
+            except Exception:
+                if os.path.exists(target_path):
+                    os.remove(target_path)
+                raise
+            
+            logger.info(f"Incremental backup rebuilt: {target_path}")
+            return target_path
+            
+        except BackupError:
+            raise
+        except Exception as e:
+            logger.error(f"Incremental restore failed: {e}")
+            raise BackupError(f"Failed to rebuild incremental backup: {e}")
+    
+    def list_incremental_backups(self) -> List[dict]:
+        """List incremental snapshots (newest first)."""
+        backups = []
+        manifest_dir = self._store_path('manifests')
+        
+        try:
+            if not os.path.exists(manifest_dir):
+                return backups
+            
+            for filename in os.listdir(manifest_dir):
+                if not filename.endswith('.json'):
+                    continue
+                manifest_path = os.path.join(manifest_dir, filename)
+                try:
+                    manifest = self._load_manifest(manifest_path)
+                except Exception as e:
+                    logger.warning(f"Skipping unreadable manifest {filename}: {e}")
+                    continue
+                
+                backups.append({
+                    'filename': filename,
+                    'path': manifest_path,
+                    'size': manifest.get('size', 0),
+                    'new_bytes': manifest.get('new_bytes', 0),
+                    'created': datetime.fromisoformat(manifest['created_at']),
+                    'chunks': manifest.get('chunks', [])
+                })
+            
+            backups.sort(key=lambda x: x['created'], reverse=True)
+            
+        except Exception as e:
+            logger.error(f"Failed to list incremental backups: {e}")
+        
+        return backups
+    
+    def _collect_unreferenced_chunks(self) -> int:
+        """Delete chunks no longer referenced by any manifest. Returns bytes freed."""
+        chunk_root = self._store_path('chunks')
+        if not os.path.exists(chunk_root):
+            return 0
+        
+        referenced = set()
+        for backup in self.list_incremental_backups():
+            referenced.update(backup['chunks'])
+        # Archive manifests are kept for good; archives are written once
+        archive_dir = self._store_path('archives')
+        if os.path.isdir(archive_dir):
+            for filename in os.listdir(archive_dir):
+                if filename.endswith('.json'):
+                    referenced.update(self._load_manifest(os.path.join(archive_dir, filename))['chunks'])
+        
+        freed = 0
+        for prefix in os.listdir(chunk_root):
+            prefix_dir = os.path.join(chunk_root, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for digest in os.listdir(prefix_dir):
+                if digest not in referenced:
+                    chunk_path = os.path.join(prefix_dir, digest)
+                    freed += os.path.getsize(chunk_path)
+                    os.remove(chunk_path)
+        return freed
+    
     def cleanup_old_backups(self, keep_days: int = 30):
         """Remove backups older than specified days."""
         try:
@@ -309,6 +962,21 @@ class BackupManager:
                     except Exception as e:
                         logger.warning(f"Failed to remove backup {backup['filename']}: {e}")
             
+            # Prune incremental snapshots, always keeping the newest one
+            with self._store_lock:
+                for backup in self.list_incremental_backups()[1:]:
+                    if backup['created'] < cutoff_date:
+                        try:
+                            os.remove(backup['path'])
+                            removed_count += 1
+                            logger.info(f"Removed old incremental backup: {backup['filename']}")
+                        except Exception as e:
+                            logger.warning(f"Failed to remove backup {backup['filename']}: {e}")
+                
+                freed = self._collect_unreferenced_chunks()
+                if freed:
+                    logger.info(f"Freed {freed} bytes of unreferenced backup chunks")
+            
             logger.info(f"Cleanup completed. Removed {removed_count} old backups.")
             
         except Exception as e:
@@ -336,7 +1004,8 @@ class BackupManager:
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_name = f"scheduled_backup_{timestamp}"
-            self.create_backup(backup_name)
+            # Deduplicated snapshot: only chunks changed since the last run are stored
+            self.create_incremental_backup(backup_name)
             
             # Cleanup old backups
             self.cleanup_old_backups()
@@ -350,6 +1019,34 @@ class BackupManager:
             schedule.run_pending()
             time.sleep(60)  # Check every minute
 
+# Callbacks notified after a successful restore
+_restore_listeners = []
+
+def register_restore_listener(callback: Callable[[str], None]):
+    """Register a callback invoked with the backup path after a restore.
+    
+    Bound methods are held weakly so short-lived objects (pages, Database
+    instances) do not need to unregister.
+    """
+    # Drop listeners whose owners have been garbage collected
+    _restore_listeners[:] = [ref for ref in _restore_listeners if ref() is not None]
+    if hasattr(callback, '__self__'):
+        _restore_listeners.append(weakref.WeakMethod(callback))
+    else:
+        _restore_listeners.append(lambda: callback)
+
+def _notify_restore_listeners(backup_path: str):
+    """Notify live listeners that the database was restored."""
+    for ref in list(_restore_listeners):
+        callback = ref()
+        if callback is None:
+            _restore_listeners.remove(ref)
+            continue
+        try:
+            callback(backup_path)
+        except Exception as e:
+            logger.warning(f"Restore listener failed: {e}")
+
 # Global backup manager instance
 _backup_manager = None
 
@@ -0,0 +1,252 @@
+"""Data integrity checks that run off the GUI thread, in full or incremental mode."""
+import time
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from config.settings import Config, DATABASE_CONFIG
+from core.exceptions import DatabaseError
+from utils.performance.metrics import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+# progress(percent, message)
+ProgressCallback = Callable[[int, str], None]
+
+
+class IntegrityCheckService:
+    """Runs PRAGMA quick_check plus targeted data checks on its own connection.
+    
+    In incremental mode the targeted checks only look at rows whose
+    ``updated_at`` is at or after the checkpoint stored by the last completed
+    run, so a nightly check costs roughly the day's changes. ``quick_check``
+    reads every page whatever changed, so incremental runs only include it
+    once ``Config.INTEGRITY_STRUCTURE_CHECK_HOURS`` have passed since it last
+    completed; full runs always do. Without a checkpoint an incremental run
+    is a full run.
+    Hard deletes do not touch ``updated_at``; rows orphaned that way are only
+    found by a full run.
+    
+    ``run`` is synchronous and meant for a worker thread. ``cancel`` may be
+    called from any thread; it interrupts the running
+    statement and the run returns with ``cancelled`` set and nothing stored.
+    """
+    
+    CHECKPOINT_TYPE = 'data_integrity'
+    STRUCTURE_CHECKPOINT_TYPE = 'database_structure'
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or Config.DATABASE_PATH
+        self._conn: Optional[sqlite3.Connection] = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+    
+    # Each check: (name, method); methods return status, details and rows examined
+    def _checks(self, structure: bool = True) -> List[tuple]:
+        checks = [
+            ('Database Structure', self._check_structure),
+            ('Duplicate Student Numbers', self._check_duplicate_student_numbers),
+            ('Orphaned Attendance Records', self._check_orphaned_attendance),
+            ('Invalid Date Formats', self._check_invalid_dates),
+        ]
+        return checks if structure else checks[1:]
+    
+    def cancel(self):
+        """Stop a running check as soon as possible."""
+        self._cancel.set()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.interrupt()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+    
+    def last_checkpoint(self, check_type: Optional[str] = None) -> Optional[str]:
+        """UTC timestamp the last completed run (of ``check_type``) checked through, or None."""
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=DATABASE_CONFIG['timeout'])
+            try:
+                row = conn.execute(
+                    "SELECT checked_through FROM integrity_checkpoints WHERE check_type = ?",
+                    (check_type or self.CHECKPOINT_TYPE,)
+                ).fetchone()
+            finally:
+                conn.close()
+            return row[0] if row else None
+        except sqlite3.Error:
+            return None
+    
+    def run(self, incremental: bool = True, progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """Run every check and store the outcome.
+        
+        Returns:
+            dict: mode, the checkpoint used (``since``), passed/failed/warnings
+            counts, per-check results, duration and whether it was cancelled
+        
+        Raises:
+            DatabaseError: If the database cannot be opened or results cannot be stored
+        """
+        self._cancel.clear()
+        report = progress or (lambda percent, message: None)
+        metrics = get_metrics_registry()
+        started = time.perf_counter()
+        
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=DATABASE_CONFIG['timeout'],
+                                   check_same_thread=False)
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Integrity check could not open database: {e}")
+        with self._lock:
+            self._conn = conn
+        
+        try:
+            # Taken from SQLite so it matches CURRENT_TIMESTAMP in updated_at
+            checked_through = conn.execute("SELECT strftime('%Y-%m-%d %H:%M:%S', 'now')").fetchone()[0]
+            since = self.last_checkpoint() if incremental else None
+            structure = since is None or self._structure_check_due(conn)
+            results = {
+                'mode': 'incremental' if since else 'full',
+                'since': since,
+                'structure_checked': structure,
+                'passed': 0,
+                'failed': 0,
+                'warnings': 0,
+                'checks': [],
+                'cancelled': False,
+            }
+            
+            checks = self._checks(structure)
+            for index, (name, check) in enumerate(checks):
+                if self._cancel.is_set():
+                    break
+                report(int(index * 100 / len(checks)), f"Checking {name.lower()}...")
+                check_started = time.perf_counter()
+                try:
+                    with metrics.timer(f"integrity.{check.__name__.lstrip('_')}"):
+                        status, details, rows = check(conn, since)
+                except sqlite3.OperationalError as e:
+                    if self._cancel.is_set():
+                        break
+                    status, details, rows = 'failed', f"Check failed due to error: {e}", 0
+                results['checks'].append({
+                    'name': name,
+                    'status': status,
+                    'details': details,
+                    'rows_checked': rows,
+                    'duration_ms': round((time.perf_counter() - check_started) * 1000, 1),
+                })
+                results['warnings' if status == 'warning' else status] += 1
+            
+            results['duration_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            if self._cancel.is_set():
+                results['cancelled'] = True
+                logger.info(f"Integrity check cancelled after {len(results['checks'])} checks")
+                return results
+            
+            self._store_results(conn, results, checked_through)
+            report(100, "Integrity check complete")
+            logger.info(
+                f"Integrity check ({results['mode']}) finished in {results['duration_ms']:.0f} ms: "
+                f"{results['passed']} passed, {results['failed']} failed, {results['warnings']} warnings"
+            )
+            return results
+        finally:
+            with self._lock:
+                self._conn = None
+            conn.close()
+    
+    def _structure_check_due(self, conn: sqlite3.Connection) -> bool:
+        """Whether quick_check's own interval has passed since it last completed."""
+        hours = Config.INTEGRITY_STRUCTURE_CHECK_HOURS
+        if hours <= 0:
+            return True
+        row = conn.execute(
+            "SELECT checked_through > datetime('now', ?) FROM integrity_checkpoints WHERE check_type = ?",
+            (f"-{int(hours)} hours", self.STRUCTURE_CHECKPOINT_TYPE)
+        ).fetchone()
+        return not (row and row[0])
+    
+    def _store_results(self, conn: sqlite3.Connection, results: Dict[str, Any], checked_through: str):
+        """Record each check and advance the checkpoints, in one transaction."""
+        checkpoints = [self.CHECKPOINT_TYPE]
+        if results['structure_checked']:
+            checkpoints.append(self.STRUCTURE_CHECKPOINT_TYPE)
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO data_integrity_checks (check_type, status, details) VALUES (?, ?, ?)",
+                    [(check['name'], check['status'], check['details']) for check in results['checks']]
+                )
+                conn.executemany("""
+                    INSERT INTO integrity_checkpoints (check_type, checked_through, mode, updated_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(check_type) DO UPDATE SET
+                        checked_through = excluded.checked_through,
+                        mode = excluded.mode,
+                        updated_at = excluded.updated_at
+                """, [(check_type, checked_through, results['mode'], datetime.now().isoformat())
+                      for check_type in checkpoints])
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to store integrity check results: {e}")
+    
+    @staticmethod
+    def _changed_since(alias: str, since: Optional[str]) -> tuple:
+        """SQL condition and parameters restricting a check to rows changed since the checkpoint."""
+        if since is None:
+            return "1", ()
+        return f"{alias}.updated_at >= ?", (since,)
+    
+    def _check_structure(self, conn: sqlite3.Connection, since: Optional[str]) -> tuple:
+        # quick_check skips index-content verification, which is what makes
+        # integrity_check slow; it still validates every page and constraint
+        problems = [row[0] for row in conn.execute("PRAGMA quick_check(20)").fetchall()]
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        if problems == ['ok']:
+            return 'passed', f"Database structure is valid ({pages} pages checked)", pages
+        return 'failed', "Database structure problems: " + "; ".join(problems), pages
+    
+    def _check_duplicate_student_numbers(self, conn: sqlite3.Connection, since: Optional[str]) -> tuple:
+        changed, params = self._changed_since('s', since)
+        rows = conn.execute(f"SELECT COUNT(*) FROM students s WHERE is_deleted = 0 AND {changed}", params).fetchone()[0]
+        # Probe each (changed) row's student_id through idx_students_student_id
+        duplicates = conn.execute(f"""
+            SELECT COUNT(DISTINCT s.student_id)
+            FROM students s
+            WHERE s.is_deleted = 0 AND {changed}
+              AND EXISTS (
+                  SELECT 1 FROM students d
+                  WHERE d.student_id = s.student_id AND d.id != s.id AND d.is_deleted = 0
+              )
+        """, params).fetchone()[0]
+        if duplicates:
+            return 'failed', f"Found {duplicates} duplicate student numbers", rows
+        return 'passed', 'No duplicate student numbers found', rows
+    
+    def _check_orphaned_attendance(self, conn: sqlite3.Connection, since: Optional[str]) -> tuple:
+        changed, params = self._changed_since('a', since)
+        rows, orphaned = conn.execute(f"""
+            SELECT COUNT(*), COALESCE(SUM(NOT EXISTS (SELECT 1 FROM students s WHERE s.id = a.student_id)), 0)
+            FROM attendance a
+            WHERE {changed}
+        """, params).fetchone()
+        if orphaned:
+            return 'warning', f"Found {orphaned} orphaned attendance records", rows
+        return 'passed', 'No orphaned attendance records found', rows
+    
+    def _check_invalid_dates(self, conn: sqlite3.Connection, since: Optional[str]) -> tuple:
+        changed, params = self._changed_since('s', since)
+        rows, invalid = conn.execute(f"""
+            SELECT COUNT(*), COALESCE(SUM(
+                length(date_of_birth) != 10 OR date_of_birth NOT LIKE '____-__-__'
+                OR date(date_of_birth) IS NULL
+            ), 0)
+            FROM students s
+            WHERE date_of_birth IS NOT NULL AND date_of_birth != ''
+              AND status = 'Active' AND is_deleted = 0 AND {changed}
+        """, params).fetchone()
+        if invalid:
+            return 'warning', f"Found {invalid} records with invalid date formats", rows
+        return 'passed', 'All date formats are valid', rows
@@ -0,0 +1,315 @@
+"""Idle-time database maintenance: checkpoints, statistics, vacuum, retention, integrity and archiving."""
+import os
+import json
+import time
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from config.settings import Config, DATABASE_CONFIG
+from core.exceptions import DatabaseError
+from utils.performance.metrics import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+
+class MaintenanceScheduler:
+    """Runs periodic database upkeep on a background thread while the app is idle.
+    
+    The app counts as idle once no input has been seen for
+    ``Config.MAINTENANCE_IDLE_SECONDS`` (the main window reports input through
+    ``note_activity``). Every ``MAINTENANCE_POLL_SECONDS`` the thread runs,
+    in order, the tasks that are due; it stops between tasks as soon as the
+    user is back, and the long tasks (retention, vacuum) stop between steps.
+    A task that did not finish stays due and resumes at the next idle period.
+    
+    Last runs are stored in ``maintenance_runs`` so daily and weekly tasks
+    keep their rhythm across restarts. Each task is timed into the metrics
+    registry as ``maintenance.<task>``. A task whose interval is 0 is off;
+    archiving is off unless ``MAINTENANCE_ARCHIVE_HOURS`` is set.
+    """
+    
+    # Task -> (Config attribute with the interval, unit); run in this order, so
+    # statistics, vacuum and the checkpoint see what the bulk jobs changed
+    TASKS = {
+        'retention': ('RETENTION_INTERVAL_HOURS', 'hours'),
+        'archive': ('MAINTENANCE_ARCHIVE_HOURS', 'hours'),
+        'integrity': ('MAINTENANCE_INTEGRITY_HOURS', 'hours'),
+        'optimize': ('MAINTENANCE_OPTIMIZE_HOURS', 'hours'),
+        'vacuum': ('MAINTENANCE_VACUUM_HOURS', 'hours'),
+        'checkpoint': ('MAINTENANCE_CHECKPOINT_MINUTES', 'minutes'),
+    }
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or Config.DATABASE_PATH
+        self._last_activity = time.monotonic()
+        self._stop = threading.Event()
+        self._run_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+    
+    def note_activity(self):
+        """Record user input; maintenance waits until the app has been idle for a while."""
+        self._last_activity = time.monotonic()
+    
+    def is_idle(self) -> bool:
+        return time.monotonic() - self._last_activity >= Config.MAINTENANCE_IDLE_SECONDS
+    
+    def start(self):
+        """Start the maintenance thread."""
+        if not Config.MAINTENANCE_ENABLED or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="db-maintenance", daemon=True)
+        self._thread.start()
+        logger.info(f"Idle-time maintenance started (after {Config.MAINTENANCE_IDLE_SECONDS} s without input)")
+    
+    def stop(self):
+        """Stop the maintenance thread after the current step."""
+        self._stop.set()
+        logger.info("Idle-time maintenance stopped")
+    
+    def _run(self):
+        while not self._stop.wait(Config.MAINTENANCE_POLL_SECONDS):
+            try:
+                self.run_pending()
+            except Exception as e:
+                logger.error(f"Maintenance run failed: {e}")
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=DATABASE_CONFIG['timeout'],
+                               isolation_level=None, check_same_thread=False)
+        # Give up on a lock quickly rather than hold up the user's next write
+        conn.execute(f"PRAGMA busy_timeout = {int(Config.MAINTENANCE_BUSY_TIMEOUT_MS)}")
+        return conn
+    
+    def last_runs(self, conn: Optional[sqlite3.Connection] = None) -> Dict[str, Dict[str, Any]]:
+        """Last completed run of each task: when, how long and what it did."""
+        own = conn is None
+        conn = conn or self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT task, last_run_at, duration_ms, details FROM maintenance_runs"
+            ).fetchall()
+        except sqlite3.Error:
+            return {}
+        finally:
+            if own:
+                conn.close()
+        return {task: {'last_run_at': last_run_at, 'duration_ms': duration_ms,
+                       'details': json.loads(details) if details else None}
+                for task, last_run_at, duration_ms, details in rows}
+    
+    def due_tasks(self, conn: sqlite3.Connection) -> List[str]:
+        """Tasks whose interval has passed since their last completed run, in run order."""
+        last = self.last_runs(conn)
+        now = datetime.now()
+        due = []
+        for task, (setting, unit) in self.TASKS.items():
+            interval = getattr(Config, setting)
+            if interval <= 0:
+                continue
+            ran = last.get(task, {}).get('last_run_at')
+            if ran is None or now - datetime.fromisoformat(ran) >= timedelta(**{unit: interval}):
+                due.append(task)
+        return due
+    
+    def run_pending(self, force: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Run the due tasks while the app stays idle (or regardless, with ``force``).
+        
+        Returns:
+            dict: per task run, its result, duration and whether it completed
+        
+        Raises:
+            DatabaseError: If the database cannot be opened
+        """
+        if not force and not self.is_idle():
+            return {}
+        if not self._run_lock.acquire(blocking=False):
+            return {}
+        try:
+            try:
+                conn = self._connect()
+            except sqlite3.Error as e:
+                raise DatabaseError(f"Maintenance could not open database: {e}")
+            try:
+                results = {}
+                for task in self.due_tasks(conn):
+                    if self._stop.is_set() or not (force or self.is_idle()):
+                        break
+                    results[task] = self._run_task(conn, task, force)
+                return results
+            finally:
+                conn.close()
+        finally:
+            self._run_lock.release()
+    
+    def _run_task(self, conn: sqlite3.Connection, task: str, force: bool) -> Dict[str, Any]:
+        deadline = time.monotonic() + Config.MAINTENANCE_TASK_BUDGET_SECONDS
+        
+        def keep_going() -> bool:
+            return (not self._stop.is_set() and time.monotonic() < deadline
+                    and (force or self.is_idle()))
+        
+        started = time.perf_counter()
+        try:
+            with get_metrics_registry().timer(f"maintenance.{task}"):
+                details, complete = getattr(self, f"_task_{task}")(conn, keep_going)
+        except Exception as e:
+            # Recorded like a run, so a failing task waits out its interval
+            # instead of being retried every poll
+            logger.error(f"Maintenance task {task} failed: {e}")
+            details, complete = {'error': str(e)}, True
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        
+        if complete:
+            try:
+                conn.execute("""
+                    INSERT INTO maintenance_runs (task, last_run_at, duration_ms, details)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(task) DO UPDATE SET
+                        last_run_at = excluded.last_run_at,
+                        duration_ms = excluded.duration_ms,
+                        details = excluded.details
+                """, (task, datetime.now().isoformat(), duration_ms, json.dumps(details)))
+            except sqlite3.Error as e:
+                logger.warning(f"Could not record maintenance run of {task}: {e}")
+        logger.info(f"Maintenance {task} {'done' if complete else 'paused'} in {duration_ms:.0f} ms: {details}")
+        return {'complete': complete, 'duration_ms': duration_ms, 'details': details}
+    
+    def _task_retention(self, conn: sqlite3.Connection, keep_going: Callable[[], bool]) -> tuple:
+        from services.retention_service import get_retention_service
+        result = get_retention_service().run(
+            time_budget=Config.MAINTENANCE_TASK_BUDGET_SECONDS, should_continue=keep_going
+        )
+        return {'purged': result['purged'], 'reclaimed_bytes': result['reclaimed_bytes']}, result['complete']
+    
+    def _task_archive(self, conn: sqlite3.Connection, keep_going: Callable[[], bool]) -> tuple:
+        from services.archive_service import get_archive_service
+        archive = get_archive_service()
+        archived = []
+        for year in archive.closed_years('attendance'):
+            if not keep_going():
+                return {'years': archived}, False
+            archived.append(archive.archive_year(year)['year'])
+        return {'years': archived}, True
+    
+    def _task_integrity(self, conn: sqlite3.Connection, keep_going: Callable[[], bool]) -> tuple:
+        from services.integrity_service import IntegrityCheckService
+        service = IntegrityCheckService(self.db_path)
+        finished = threading.Event()
+        
+        def watch():
+            # cancel() interrupts the running statement, so a long quick_check
+            # stops as soon as the user is back rather than when it finishes
+            while not finished.wait(Config.MAINTENANCE_CANCEL_POLL_SECONDS):
+                if not keep_going():
+                    service.cancel()
+                    return
+        
+        watcher = threading.Thread(target=watch, name="integrity-watch", daemon=True)
+        watcher.start()
+        try:
+            result = service.run(incremental=True)
+        finally:
+            finished.set()
+            watcher.join()
+        details = {key: result[key] for key in ('mode', 'structure_checked', 'passed', 'failed', 'warnings')}
+        return details, not result['cancelled']
+    
+    def _task_optimize(self, conn: sqlite3.Connection, keep_going: Callable[[], bool]) -> tuple:
+        # Sample at most this many rows per index so ANALYZE stays short on big tables
+        conn.execute(f"PRAGMA analysis_limit = {int(Config.MAINTENANCE_ANALYSIS_LIMIT)}")
+        # Row counts as of the last ANALYZE; sampled statistics only estimate them
+        previous = (self.last_runs(conn).get('optimize', {}).get('details') or {}).get('rows', {})
+        stale, rows = self._stale_tables(conn, previous)
+        analyzed = []
+        for table in stale:
+            if not keep_going():
+                return {'analyzed': analyzed}, False
+            conn.execute(f'ANALYZE "{table}"')
+            analyzed.append(table)
+        get_metrics_registry().counter("maintenance.tables_analyzed").inc(len(analyzed))
+        # optimize only looks at what this connection has queried, hence the
+        # explicit ANALYZE above; it still catches anything those missed
+        conn.execute("PRAGMA optimize")
+        # Tables left alone keep the count they were last analyzed at, so slow drift adds up
+        rows.update({table: count for table, count in previous.items() if table in rows and table not in stale})
+        return {'analyzed': analyzed, 'rows': rows}, True
+    
+    @staticmethod
+    def _stale_tables(conn: sqlite3.Connection, previous: Dict[str, int]) -> tuple:
+        """Indexed tables never analyzed, or whose row count drifted from ``previous``.
+        
+        Returns (stale tables, current row count of every indexed table).
+        """
+        tables = [row[0] for row in conn.execute("""
+            SELECT DISTINCT tbl_name FROM sqlite_master
+            WHERE type = 'index' AND tbl_name NOT LIKE 'sqlite_%'
+        """)]
+        analyzed = set()
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone():
+            analyzed = {row[0] for row in conn.execute("SELECT DISTINCT tbl FROM sqlite_stat1")}
+        
+        stale, rows = [], {}
+        for table in tables:
+            rows[table] = conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+            before = previous.get(table)
+            if table not in analyzed or before is None:
+                if rows[table]:
+                    stale.append(table)
+            elif abs(rows[table] - before) > Config.MAINTENANCE_ANALYZE_DRIFT * max(before, 1):
+                stale.append(table)
+        return stale, rows
+    
+    def _task_vacuum(self, conn: sqlite3.Connection, keep_going: Callable[[], bool]) -> tuple:
+        from services.retention_service import get_retention_service
+        retention = get_retention_service()
+        converted = False
+        if Config.MAINTENANCE_CONVERT_AUTO_VACUUM and conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            # One-time switch of a database created before incremental auto-vacuum;
+            # the full VACUUM cannot pause, so it only starts while still idle
+            if not keep_going():
+                return {'converted': False}, False
+            converted = retention.enable_incremental_vacuum()
+        pages = retention.release_free_pages(should_continue=keep_going)
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return {'converted': converted, 'released_pages': pages, 'free_pages': free}, free == 0 or pages == 0
+    
+    def _wal_bytes(self) -> int:
+        try:
+            return os.path.getsize(self.db_path + '-wal')
+        except OSError:
+            return 0
+    
+    def _task_checkpoint(self, conn: sqlite3.Connection, keep_going: Callable[[], bool]) -> tuple:
+        metrics = get_metrics_registry()
+        wal_before = self._wal_bytes()
+        # PASSIVE copies what it can without waiting for anyone
+        busy, frames, copied = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+        truncated = False
+        if frames >= 0 and copied == frames and keep_going():
+            # Everything is in the database: reset the WAL to zero bytes. Waits at
+            # most busy_timeout for readers to leave and gives up if they don't
+            busy, frames, copied = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+            truncated = busy == 0
+        wal_after = self._wal_bytes()
+        metrics.gauge("maintenance.wal_bytes").set(wal_after)
+        if not truncated and frames >= 0:
+            metrics.counter("maintenance.checkpoint_busy").inc()
+        details = {'wal_bytes_before': wal_before, 'wal_bytes_after': wal_after, 'truncated': truncated}
+        # A checkpoint that could not finish is retried at the next poll
+        return details, truncated or frames < 0
+
+
+# Global maintenance scheduler instance
+_maintenance_scheduler = None
+
+
+def get_maintenance_scheduler() -> MaintenanceScheduler:
+    """Get global maintenance scheduler instance."""
+    global _maintenance_scheduler
+    if _maintenance_scheduler is None:
+        _maintenance_scheduler = MaintenanceScheduler()
+    return _maintenance_scheduler
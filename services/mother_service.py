@@ -42,8 +42,9 @@ class MotherFilters:
     """Data transfer object for filter criteria."""
     
     def __init__(self, school: str = "", class_name: str = "", 
-                 section: str = "", status: str = ""):
+                 section: str = "", status: str = "", school_id: Optional[Any] = None):
         self.school = school
+        self.school_id = school_id
         self.class_name = class_name
         self.section = section
         self.status = status
@@ -58,6 +59,8 @@ class MotherFilters:
         
         if self.is_active_filter(self.school, ["Please Select School", "All Schools"]):
             active["school"] = self.school
+            if self.school_id not in (None, ""):
+                active["school_id"] = self.school_id
             
         if self.is_active_filter(self.class_name, ["Please Select Class", "All Classes"]):
             active["class"] = self.class_name
@@ -74,26 +77,42 @@ class MotherFilters:
 class MotherService:
     """Service layer for mother registration operations."""
     
+    # Form field -> students column
+    FIELD_MAPPING = {
+        'household_size': 'household_size',
+        'household_head_name': 'household_name',
+        'mother_name': 'mother_name',
+        'mother_marital_status': 'mother_marital_status',
+        'mother_cnic': 'mother_cnic',
+        'mother_cnic_doi': 'mother_cnic_doi',
+        'mother_cnic_exp': 'mother_cnic_exp',
+        'mother_mwa': 'mother_mwa',
+        'guardian_name': 'alternate_name',
+        'guardian_cnic': 'alternate_cnic',
+        'guardian_cnic_doi': 'alternate_cnic_doi',
+        'guardian_cnic_exp': 'alternate_cnic_exp',
+        'guardian_marital_status': 'alternate_marital_status',
+        'guardian_mwa': 'alternate_mwa',
+        'guardian_relation': 'alternate_relationship_with_mother'
+    }
+    
     def __init__(self):
         self.db = Database()
     
     def get_students_needing_mother_info(self, filters: MotherFilters) -> List[StudentData]:
         """Get students who need mother/guardian information."""
         try:
-            where_clauses = [
-                "is_deleted = 0",
-                "status = 'Active'",
-                """(
-                    (COALESCE(mother_name,'') = '' OR COALESCE(mother_cnic,'') = '') 
-                    AND 
-                    (COALESCE(alternate_name,'') = '' OR COALESCE(alternate_cnic,'') = '' 
-                     OR COALESCE(alternate_relationship_with_mother,'') = '')
-                )"""
-            ]
+            # needs_mother_info covers active, non-deleted students missing
+            # both mother and guardian details (served by a partial index)
+            where_clauses = [self.db.mother_info_filter_sql()]
             params = []
             
             active_filters = filters.get_active_filters()
             
+            if "school_id" in active_filters:
+                where_clauses.append("school_id = ?")
+                params.append(active_filters["school_id"])
+            
             if "class" in active_filters:
                 where_clauses.append("class = ?")
                 params.append(active_filters["class"])
@@ -121,6 +140,28 @@ class MotherService:
             print(f"Error getting students needing mother info: {e}")
             return []
     
+    def get_outstanding_count(self, filters: Optional[MotherFilters] = None) -> int:
+        """Get number of students still needing mother info from the progress counters."""
+        try:
+            active_filters = filters.get_active_filters() if filters else {}
+            # Same school/class scope as the list, so the badge matches it
+            progress = self.db.get_mother_info_progress(
+                school_id=active_filters.get("school_id"),
+                class_name=active_filters.get("class")
+            )
+            return sum(row['pending'] for row in progress)
+        except Exception as e:
+            print(f"Error getting outstanding mother info count: {e}")
+            return 0
+    
+    def _map_mother_fields(self, mother_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Translate form keys into student columns, skipping empty values."""
+        return {
+            db_column: mother_info[field_key]
+            for field_key, db_column in self.FIELD_MAPPING.items()
+            if field_key in mother_info and mother_info[field_key]
+        }
+    
     def update_mother_info(self, student_id: str, mother_info: Dict[str, Any]) -> bool:
         """Update mother information for a single student."""
         try:
@@ -128,54 +169,31 @@ class MotherService:
             if not student_id or not student_id.strip():
                 return False
             
-            # Build update query based on provided fields
-            set_clauses = []
-            params = []
-            
-            field_mapping = {
-                'household_size': 'household_size',
-                'household_head_name': 'household_head_name',
-                'mother_name': 'mother_name',
-                'mother_marital_status': 'mother_marital_status',
-                'mother_cnic': 'mother_cnic',
-                'mother_cnic_doi': 'mother_cnic_doi',
-                'mother_cnic_exp': 'mother_cnic_exp',
-                'mother_mwa': 'mother_mwa',
-                'guardian_name': 'alternate_name',
-                'guardian_cnic': 'alternate_cnic',
-                'guardian_cnic_doi': 'alternate_cnic_doi',
-                'guardian_cnic_exp': 'alternate_cnic_exp',
-                'guardian_marital_status': 'alternate_marital_status',
-                'guardian_mwa': 'alternate_mwa',
-                'guardian_phone': 'alternate_phone',
-                'guardian_relation': 'alternate_relationship_with_mother'
-            }
-            
-            for field_key, db_column in field_mapping.items():
-                if field_key in mother_info and mother_info[field_key]:
-                    set_clauses.append(f"{db_column} = ?")
-                    params.append(mother_info[field_key])
-            
-            if not set_clauses:
+            updates = self._map_mother_fields(mother_info)
+            if not updates:
                 return False
             
-            params.append(student_id)
-            sql = f"UPDATE students SET {', '.join(set_clauses)} WHERE student_id = ?"
-            
-            result = self.db.execute_secure_query(sql, tuple(params))
-            return result is not None
+            result = self.db.apply_mother_info_batch([student_id], updates)
+            return result['changed'] > 0
             
         except Exception as e:
             print(f"Error updating mother info for student {student_id}: {e}")
             return False
     
     def update_mother_info_bulk(self, student_ids: List[str], mother_info: Dict[str, Any]) -> int:
-        """Update mother information for multiple students."""
-        updated_count = 0
-        for student_id in student_ids:
-            if self.update_mother_info(student_id, mother_info):
-                updated_count += 1
-        return updated_count
+        """Update mother information for multiple students in one transaction."""
+        try:
+            updates = self._map_mother_fields(mother_info)
+            if not student_ids or not updates:
+                return 0
+            
+            result = self.db.apply_mother_info_batch(student_ids, updates)
+            # Callers report this as the number of students updated
+            return result['changed']
+            
+        except Exception as e:
+            print(f"Error bulk updating mother info: {e}")
+            return 0
     
     def get_schools(self) -> List[Dict[str, Any]]:
         """Get list of schools."""
@@ -0,0 +1,193 @@
+"""Login-time prefetch of lookup data, first student pages and dashboard KPIs."""
+import copy
+import time
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+from config.settings import Config
+from core.exceptions import StartupError
+from utils.performance.metrics import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchService:
+    """Warms Database read results on a background thread while the user logs in.
+    
+    Results are stored per call (method name plus bound arguments) by the
+    ``_prefetchable`` wrapper on Database methods, which also serves later
+    calls from memory, for at most ``Config.CACHE_TIMEOUT_SECONDS``.
+    
+    Each entry keeps the ``table_versions`` counters of the tables its method
+    reads. ``PRAGMA data_version`` on the service's own connection tells
+    whether any connection has committed since the last check; only then are
+    the counters read again, and only entries whose tables were written are
+    dropped. Logins writing users and sessions leave the lookups cached.
+    """
+    
+    # Lookup tables every page loads into its combos
+    LOOKUPS = [
+        'get_schools', 'get_classes', 'get_sections', 'get_organizations',
+        'get_provinces', 'get_districts', 'get_union_councils', 'get_nationalities',
+    ]
+    # First get_students call of each page with its default (no school selected) filters
+    STUDENT_PAGES = [
+        {'status': 'Active'},                           # StudentPage
+        {},                                             # StudentListPage
+        {'page': 1, 'per_page': 20, 'status': 'Active'},  # AttendancePage
+    ]
+    DASHBOARD_KPIS = ['get_total_students', 'get_attendance_rate', 'get_active_classes']
+    
+    def __init__(self):
+        self._entries: Dict[Hashable, Tuple[Dict[str, int], float, Any]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._thread: Optional[threading.Thread] = None
+        self._version_conn: Optional[sqlite3.Connection] = None
+        self._checked_data_version: Optional[int] = None
+    
+    def start(self):
+        """Start prefetching in the background (no-op if already running or done)."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        from services.startup_service import get_startup_orchestrator
+        
+        try:
+            get_startup_orchestrator().wait('database_init')
+        except StartupError as e:
+            logger.warning(f"Prefetch skipped: {e}")
+            return
+        
+        try:
+            self.prefetch()
+        except Exception as e:
+            logger.warning(f"Prefetch failed: {e}")
+    
+    def prefetch(self) -> int:
+        """Run every prefetch read on the calling thread; returns the results stored."""
+        from models.database import Database
+        
+        metrics = get_metrics_registry()
+        with metrics.timer("prefetch.total") as timer:
+            db = Database()
+            try:
+                # Counters as of before the reads, so a write racing them only
+                # makes the entry look older than it is
+                data_version, self._local.versions = self._versions()
+                if self._local.versions is None:
+                    logger.warning("Prefetch skipped: table versions unavailable")
+                    return 0
+                with self._lock:
+                    self._checked_data_version = data_version
+                self._local.recording = True
+                try:
+                    for name in self.LOOKUPS + self.DASHBOARD_KPIS:
+                        with metrics.timer(f"prefetch.{name}"):
+                            getattr(db, name)()
+                    for filters in self.STUDENT_PAGES:
+                        with metrics.timer("prefetch.get_students"):
+                            db.get_students(**filters)
+                finally:
+                    self._local.recording = False
+            finally:
+                db.db_conn.close()
+        logger.info(f"Prefetched {len(self._entries)} results in {timer.duration * 1000:.0f} ms")
+        return len(self._entries)
+    
+    def _data_version_locked(self) -> int:
+        """Current data_version; changes whenever another connection commits."""
+        if self._version_conn is None:
+            self._version_conn = sqlite3.connect(Config.DATABASE_PATH, check_same_thread=False)
+        return self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+    
+    def _versions(self) -> Tuple[Optional[int], Optional[Dict[str, int]]]:
+        """(data_version, table -> write counter); (None, None) if unavailable."""
+        with self._lock:
+            try:
+                data_version = self._data_version_locked()
+                versions = dict(self._version_conn.execute("SELECT table_name, version FROM table_versions"))
+                return data_version, versions
+            except sqlite3.Error as e:
+                logger.debug(f"Table versions unavailable: {e}")
+                return None, None
+    
+    def record(self, key: Hashable, value: Any, tables: Iterable[str] = ()):
+        """Store a result computed by the prefetch thread; ignored on other threads."""
+        if not getattr(self._local, 'recording', False):
+            return
+        versions = {table: self._local.versions.get(table, 0) for table in tables}
+        with self._lock:
+            self._entries[key] = (versions, time.monotonic(), copy.deepcopy(value))
+    
+    def _drop_written(self):
+        """Drop entries whose tables were written, if anything was committed since the last check."""
+        with self._lock:
+            try:
+                data_version = self._data_version_locked()
+            except sqlite3.Error as e:
+                logger.debug(f"data_version unavailable: {e}")
+                data_version = None
+            if data_version is not None and data_version == self._checked_data_version:
+                return
+        
+        data_version, current = self._versions()
+        with self._lock:
+            if current is None:
+                stale = list(self._entries)
+            else:
+                stale = [key for key, (versions, _, _) in self._entries.items()
+                         if any(current.get(table, 0) != version for table, version in versions.items())]
+            for key in stale:
+                del self._entries[key]
+            self._checked_data_version = data_version
+        if stale:
+            get_metrics_registry().counter("prefetch.stale").inc(len(stale))
+    
+    def lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (True, value) when a fresh prefetched result exists for key."""
+        if not self._entries or getattr(self._local, 'recording', False):
+            return False, None
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        
+        if time.monotonic() - entry[1] > Config.CACHE_TIMEOUT_SECONDS:
+            with self._lock:
+                self._entries.pop(key, None)
+            get_metrics_registry().counter("prefetch.stale").inc()
+            return False, None
+        
+        self._drop_written()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        
+        get_metrics_registry().counter("prefetch.hits").inc()
+        return True, copy.deepcopy(entry[2])
+    
+    def invalidate(self, *args):
+        """Drop every prefetched result (also registered as a restore listener)."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Global prefetch service instance
+_prefetch_service = None
+
+
+def get_prefetch_service() -> PrefetchService:
+    """Get global prefetch service instance."""
+    global _prefetch_service
+    if _prefetch_service is None:
+        _prefetch_service = PrefetchService()
+        from services.backup_service import register_restore_listener
+        register_restore_listener(_prefetch_service.invalidate)
+    return _prefetch_service
@@ -0,0 +1,262 @@
+"""Retention: chunked purges of old log rows and soft-deleted students, then incremental vacuum."""
+import time
+import logging
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from config.settings import Config, DATABASE_CONFIG
+from core.exceptions import DatabaseError
+from utils.performance.metrics import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+# progress(percent, message)
+ProgressCallback = Callable[[int, str], None]
+
+
+class RetentionService:
+    """Deletes rows past their retention period without blocking other writers.
+    
+    Each table is purged in chunks, one short ``BEGIN IMMEDIATE`` transaction
+    per chunk. The chunk size adapts so a chunk holds the write lock for about
+    ``Config.RETENTION_MAX_LOCK_MS``, and the service pauses between chunks so
+    queued writers get the lock. Every purge condition is served by an
+    index, so finding a chunk never scans the table.
+    
+    Freed pages are returned to the file system with ``incremental_vacuum``,
+    also in small steps. That needs ``auto_vacuum = INCREMENTAL``, which new
+    databases get from DatabaseConnection; older ones are converted once by
+    ``enable_incremental_vacuum`` (run by the idle-time vacuum task) and
+    until then only report the free space that SQLite will reuse.
+    
+    Purging soft-deleted students cascades to their attendance and
+    student_history rows; their students_audit entries are kept.
+    """
+    
+    # Table -> (condition selecting expired rows given the cutoff date, Config attribute with the days)
+    POLICIES = {
+        'audit_log': ("timestamp < ?", 'RETENTION_AUDIT_LOG_DAYS'),
+        'activity_log': ("timestamp < ?", 'RETENTION_ACTIVITY_LOG_DAYS'),
+        'data_integrity_checks': ("checked_at < ?", 'RETENTION_INTEGRITY_CHECK_DAYS'),
+        'user_sessions': ("expires_at < ?", 'RETENTION_SESSION_DAYS'),
+        'students': ("is_deleted = 1 AND deleted_at < ?", 'RETENTION_DELETED_STUDENT_DAYS'),
+    }
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or Config.DATABASE_PATH
+        self._cancel = threading.Event()
+    
+    def cancel(self):
+        """Stop a running purge after its current chunk."""
+        self._cancel.set()
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=DATABASE_CONFIG['timeout'],
+                               isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+    
+    @staticmethod
+    def _size(conn: sqlite3.Connection) -> Dict[str, int]:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return {
+            'bytes': conn.execute("PRAGMA page_count").fetchone()[0] * page_size,
+            'free_bytes': conn.execute("PRAGMA freelist_count").fetchone()[0] * page_size,
+        }
+    
+    def run(self, time_budget: Optional[float] = None,
+            should_continue: Optional[Callable[[], bool]] = None,
+            progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """Purge every table with a retention period, then vacuum what was freed.
+        
+        Stops early, leaving the rest for the next run, when ``time_budget``
+        seconds have passed, ``should_continue()`` returns False (e.g. the
+        user is back) or ``cancel`` is called.
+        
+        Returns:
+            dict: rows purged per table, database size before/after, bytes
+            reclaimed by vacuum, bytes left free inside the file, longest
+            lock hold, duration and whether the run completed
+        
+        Raises:
+            DatabaseError: If the database cannot be opened or a purge fails
+        """
+        self._cancel.clear()
+        report = progress or (lambda percent, message: None)
+        deadline = time.monotonic() + time_budget if time_budget else None
+        
+        def keep_going() -> bool:
+            if self._cancel.is_set() or (deadline is not None and time.monotonic() >= deadline):
+                return False
+            return should_continue() if should_continue else True
+        
+        metrics = get_metrics_registry()
+        started = time.perf_counter()
+        try:
+            conn = self._connect()
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Retention could not open database: {e}")
+        
+        try:
+            existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            size_before = self._size(conn)
+            results = {
+                'purged': {},
+                'size_before': size_before['bytes'],
+                'max_lock_ms': 0.0,
+                'complete': True,
+            }
+            
+            policies = [(table, policy) for table, policy in self.POLICIES.items() if table in existing]
+            for index, (table, (condition, setting)) in enumerate(policies):
+                days = getattr(Config, setting)
+                if days <= 0:
+                    continue
+                if not keep_going():
+                    results['complete'] = False
+                    break
+                report(int(index * 90 / len(policies)), f"Purging old {table.replace('_', ' ')}...")
+                cutoff = conn.execute("SELECT date('now', ?)", (f"-{int(days)} days",)).fetchone()[0]
+                with metrics.timer(f"retention.{table}"):
+                    purged, finished = self._purge_table(conn, table, condition, cutoff, keep_going, results)
+                results['purged'][table] = purged
+                metrics.counter("retention.rows_purged").inc(purged)
+                if not finished:
+                    results['complete'] = False
+                    break
+            
+            report(90, "Returning free space to the file system...")
+            with metrics.timer("retention.incremental_vacuum"):
+                results['vacuumed_pages'] = self._incremental_vacuum(conn, keep_going)
+            
+            size_after = self._size(conn)
+            results['size_after'] = size_after['bytes']
+            results['reclaimed_bytes'] = max(size_before['bytes'] - size_after['bytes'], 0)
+            results['free_bytes'] = size_after['free_bytes']
+            results['auto_vacuum'] = conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Retention purge failed: {e}")
+        finally:
+            conn.close()
+        
+        results['duration_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        report(100, "Retention complete")
+        logger.info(
+            f"Retention purged {sum(results['purged'].values())} rows {results['purged']} in "
+            f"{results['duration_ms']:.0f} ms; reclaimed {results['reclaimed_bytes']} bytes, "
+            f"{results['free_bytes']} bytes free in file"
+            + ("" if results['complete'] else " (stopped early)")
+        )
+        return results
+    
+    def _purge_table(self, conn: sqlite3.Connection, table: str, condition: str, cutoff: str,
+                     keep_going: Callable[[], bool], results: Dict[str, Any]) -> tuple:
+        """Delete expired rows chunk by chunk. Returns (rows deleted, whether none are left)."""
+        max_chunk = max(Config.RETENTION_CHUNK_ROWS, 1)
+        max_lock = Config.RETENTION_MAX_LOCK_MS / 1000
+        chunk = min(100, max_chunk)
+        total = 0
+        while True:
+            conn.execute("BEGIN IMMEDIATE")
+            locked = time.perf_counter()
+            try:
+                deleted = conn.execute(f"""
+                    DELETE FROM {table} WHERE rowid IN (
+                        SELECT rowid FROM {table} WHERE {condition} LIMIT ?
+                    )
+                """, (cutoff, chunk)).rowcount
+                deleting = time.perf_counter() - locked
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+            held = time.perf_counter() - locked
+            results['max_lock_ms'] = max(results['max_lock_ms'], round(held * 1000, 2))
+            get_metrics_registry().observe("retention.chunk", held)
+            
+            total += deleted
+            if deleted < chunk:
+                return total, True
+            # Size the next chunk to the lock budget by the DELETE alone: the commit's
+            # sync costs the same for any chunk size, and cascades make rows cost
+            # different amounts
+            if deleting > max_lock:
+                chunk = max(chunk // 2, 1)
+            elif deleting < max_lock / 2:
+                chunk = min(chunk * 2, max_chunk)
+            if not keep_going():
+                return total, False
+            time.sleep(Config.RETENTION_PAUSE_MS / 1000)
+    
+    def _incremental_vacuum(self, conn: sqlite3.Connection, keep_going: Callable[[], bool]) -> int:
+        """Release free pages in small steps; returns pages released (0 without auto_vacuum)."""
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            return 0
+        step = max(Config.RETENTION_VACUUM_PAGES, 1)
+        released = 0
+        while conn.execute("PRAGMA freelist_count").fetchone()[0] > 0:
+            before = conn.execute("PRAGMA page_count").fetchone()[0]
+            # incremental_vacuum yields an empty row per page, which execute() treats
+            # as a finished statement after one page; executescript steps it through
+            conn.executescript(f"PRAGMA incremental_vacuum({step});")
+            freed = before - conn.execute("PRAGMA page_count").fetchone()[0]
+            released += freed
+            if freed == 0 or not keep_going():
+                break
+            time.sleep(Config.RETENTION_PAUSE_MS / 1000)
+        return released
+    
+    def release_free_pages(self, should_continue: Optional[Callable[[], bool]] = None) -> int:
+        """Return free pages to the file system outside a purge run; returns pages released.
+        
+        Raises:
+            DatabaseError: If the database cannot be opened or the vacuum fails
+        """
+        try:
+            conn = self._connect()
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Retention could not open database: {e}")
+        try:
+            with get_metrics_registry().timer("retention.incremental_vacuum"):
+                return self._incremental_vacuum(conn, should_continue or (lambda: True))
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Incremental vacuum failed: {e}")
+        finally:
+            conn.close()
+    
+    def enable_incremental_vacuum(self) -> bool:
+        """Switch an existing database to auto_vacuum = INCREMENTAL.
+        
+        Requires one full VACUUM, which rewrites the whole file and holds the
+        write lock throughout, so only call this when nobody is working.
+        Returns True if the database was converted.
+        
+        Raises:
+            DatabaseError: If the VACUUM fails
+        """
+        conn = self._connect()
+        try:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                return False
+            with get_metrics_registry().timer("retention.vacuum"):
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+            logger.info("Database converted to incremental auto-vacuum")
+            return True
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to enable incremental vacuum: {e}")
+        finally:
+            conn.close()
+
+
+# Global retention service instance
+_retention_service = None
+
+
+def get_retention_service() -> RetentionService:
+    """Get global retention service instance."""
+    global _retention_service
+    if _retention_service is None:
+        _retention_service = RetentionService()
+    return _retention_service
@@ -0,0 +1,165 @@
+"""Staged application startup with dependency-ordered background steps."""
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from config.settings import Config
+from core.exceptions import StartupError
+from utils.performance.startup_profiler import get_startup_profiler
+
+logger = logging.getLogger(__name__)
+
+
+class StartupStep:
+    """One named initialization step and its outcome."""
+    
+    def __init__(self, name: str, func: Callable[[], Any], depends: Iterable[str] = ()):
+        self.name = name
+        self.func = func
+        self.depends = tuple(depends)
+        self.result: Any = None
+        self.error: Optional[Exception] = None
+        self.done = threading.Event()
+        self.callbacks: List[Callable[[Any], None]] = []
+
+
+class StartupOrchestrator:
+    """Runs independent startup steps on background threads.
+    
+    Each step gets its own daemon thread, which waits for the steps it depends
+    on and then runs under ``StartupProfiler.phase`` so its duration lands in
+    the metrics registry as ``startup.<name>``. A step whose dependency failed
+    fails too. Code that needs a step's result calls ``wait(name)``; code that
+    only needs to react to it registers ``when_ready(name, callback)``.
+    """
+    
+    def __init__(self):
+        self._steps: Dict[str, StartupStep] = {}
+        self._lock = threading.Lock()
+        self._started = False
+    
+    def add(self, name: str, func: Callable[[], Any], depends: Iterable[str] = ()) -> 'StartupOrchestrator':
+        """Register a step; dependencies must already be registered."""
+        with self._lock:
+            if self._started:
+                raise StartupError(f"Cannot add startup step '{name}' after start()")
+            if name in self._steps:
+                raise StartupError(f"Startup step '{name}' is already registered")
+            missing = [dep for dep in depends if dep not in self._steps]
+            if missing:
+                raise StartupError(f"Startup step '{name}' depends on unknown steps: {', '.join(missing)}")
+            self._steps[name] = StartupStep(name, func, depends)
+        return self
+    
+    def start(self):
+        """Launch every registered step on its own thread."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            steps = list(self._steps.values())
+        
+        for step in steps:
+            threading.Thread(target=self._run_step, args=(step,), name=f"startup-{step.name}", daemon=True).start()
+        logger.debug(f"Started {len(steps)} background startup steps")
+    
+    def _run_step(self, step: StartupStep):
+        try:
+            for dep in step.depends:
+                dependency = self._steps[dep]
+                dependency.done.wait()
+                if dependency.error is not None:
+                    raise StartupError(f"Startup step '{step.name}' skipped: '{dep}' failed")
+            with get_startup_profiler().phase(step.name):
+                step.result = step.func()
+        except Exception as e:
+            step.error = e
+            logger.error(f"Startup step '{step.name}' failed: {e}")
+        finally:
+            self._finish(step)
+    
+    def _finish(self, step: StartupStep):
+        """Run the step's callbacks, then mark it done.
+        
+        Callbacks run before ``done`` is set, so a thread blocked in
+        ``wait(name)`` only continues once they have run (e.g. signal
+        connections are in place before the step's result is used).
+        """
+        while True:
+            with self._lock:
+                callbacks = list(step.callbacks)
+                step.callbacks.clear()
+                if not callbacks:
+                    step.done.set()
+                    return
+            for callback in callbacks:
+                self._invoke(step, callback)
+    
+    def _invoke(self, step: StartupStep, callback: Callable[[Any], None]):
+        if step.error is not None:
+            return
+        try:
+            callback(step.result)
+        except Exception as e:
+            logger.error(f"Callback for startup step '{step.name}' failed: {e}")
+    
+    def is_ready(self, name: str) -> bool:
+        """True once the step finished successfully (or was never registered)."""
+        step = self._steps.get(name)
+        return step is None or (step.done.is_set() and step.error is None)
+    
+    def wait(self, name: str, timeout: Optional[float] = None) -> Any:
+        """Block until the step finishes and return its result.
+        
+        Unregistered steps return None immediately, so callers work the same
+        when the application was started without the orchestrator.
+        
+        Raises:
+            StartupError: If the step failed or did not finish within timeout
+        """
+        step = self._steps.get(name)
+        if step is None:
+            return None
+        if timeout is None:
+            timeout = Config.STARTUP_STEP_TIMEOUT_SECONDS
+        if not step.done.wait(timeout):
+            raise StartupError(f"Startup step '{name}' did not finish within {timeout} seconds")
+        if step.error is not None:
+            raise StartupError(f"Startup step '{name}' failed: {step.error}")
+        return step.result
+    
+    def when_ready(self, name: str, callback: Callable[[Any], None]):
+        """Call ``callback(result)`` once the step succeeds.
+        
+        Runs immediately on the calling thread if the step already finished or
+        is not registered, otherwise on the step's thread before ``wait(name)``
+        returns anywhere; the callback must not itself wait on that step.
+        """
+        step = self._steps.get(name)
+        if step is None:
+            callback(None)
+            return
+        with self._lock:
+            if not step.done.is_set():
+                step.callbacks.append(callback)
+                return
+        self._invoke(step, callback)
+    
+    def status(self) -> Dict[str, str]:
+        """Step name -> pending / ready / failed."""
+        return {
+            name: ('pending' if not step.done.is_set() else 'failed' if step.error else 'ready')
+            for name, step in self._steps.items()
+        }
+
+
+# Global startup orchestrator instance
+_startup_orchestrator = None
+
+
+def get_startup_orchestrator() -> StartupOrchestrator:
+    """Get global startup orchestrator instance."""
+    global _startup_orchestrator
+    if _startup_orchestrator is None:
+        _startup_orchestrator = StartupOrchestrator()
+    return _startup_orchestrator
@@ -10,6 +10,8 @@ import logging
 from typing import Dict, Any
 from unittest.mock import Mock, MagicMock
 
+import pytest
+
 # Add project root to Python path for testing
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
@@ -60,6 +62,40 @@ class MockDatabase:
         })
         return True
 
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """A Database on a fresh file under tmp_path, with services rebuilt for it."""
+    from config.settings import Config
+    from services import archive_service, audit_service, prefetch_service
+    
+    monkeypatch.setattr(Config, 'APP_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(Config, 'DATABASE_PATH', str(tmp_path / 'school.db'))
+    monkeypatch.setattr(Config, 'ARCHIVE_DIR', str(tmp_path / 'archive'))
+    monkeypatch.setattr(Config, 'ENCRYPTION_ENABLED', False)
+    # Service singletons remember the database path they were created with
+    monkeypatch.setattr(archive_service, '_archive_service', None)
+    monkeypatch.setattr(audit_service, '_student_audit_service', None)
+    monkeypatch.setattr(prefetch_service, '_prefetch_service', None)
+    
+    from models.database import Database
+    db = Database()
+    yield db
+    db.db_conn.close()
+
+def insert_student(db, student_id: str, **values) -> int:
+    """Insert a minimal active student directly and return its students.id."""
+    row = {
+        'student_id': student_id, 'student_name': f"Student {student_id}", 'status': 'Active',
+        'class': '5', 'section': 'A', 'school_id': 1, 'org_id': 1, 'province_id': 1,
+        'district_id': 1, 'union_council_id': 1, 'nationality_id': 1,
+    }
+    row.update(values)
+    cursor = db.conn.execute(
+        f"INSERT INTO students ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+        list(row.values())
+    )
+    return cursor.lastrowid
+
 def get_test_student_data() -> Dict[str, Any]:
     """Get sample student data for testing."""
     return {
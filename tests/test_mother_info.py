@@ -0,0 +1,58 @@
+"""Tests for the needs_mother_info worklist counters and the batch update path."""
+
+from conftest import insert_student
+
+
+MOTHER_INFO = {'mother_name': 'Amina', 'mother_cnic': '12345-1234567-1'}
+
+
+def pending(rows):
+    return sum(row['pending'] for row in rows)
+
+
+def test_progress_counts_only_the_requested_school(database):
+    insert_student(database, 'A1', school_id=1)
+    insert_student(database, 'A2', school_id=1, **{'class': '6'})
+    insert_student(database, 'B1', school_id=2)
+    insert_student(database, 'B2', school_id=2, **MOTHER_INFO)
+    insert_student(database, 'B3', school_id=2, status='Drop')
+
+    assert pending(database.get_mother_info_progress(school_id=1)) == 2
+    assert pending(database.get_mother_info_progress(school_id=2)) == 1
+    assert pending(database.get_mother_info_progress(school_id=1, class_name='6')) == 1
+    assert pending(database.get_mother_info_progress()) == 3
+
+
+def test_progress_follows_updates_and_moves_between_schools(database):
+    insert_student(database, 'A1', school_id=1)
+    insert_student(database, 'A2', school_id=1)
+
+    database.update_mother_info_bulk(['A1'], MOTHER_INFO)
+    database.conn.execute("UPDATE students SET school_id = 2 WHERE student_id = 'A2'")
+
+    assert pending(database.get_mother_info_progress(school_id=1)) == 0
+    assert pending(database.get_mother_info_progress(school_id=2)) == 1
+    assert pending(database.get_mother_info_progress()) == database.rebuild_mother_info_progress()
+
+
+def test_batch_reports_changed_rows_not_matched_rows(database):
+    insert_student(database, 'S1')
+    insert_student(database, 'S2', **MOTHER_INFO)
+    insert_student(database, 'S3')
+
+    result = database.apply_mother_info_batch(['S1', 'S2', 'S3', 'S1', 'NOPE'], MOTHER_INFO, 1, 'u', 'p')
+
+    assert result['requested'] == 4
+    assert result['matched'] == 3
+    assert result['changed'] == 2
+    assert result['missing'] == ['NOPE']
+    audited = database.conn.execute("SELECT COUNT(*) FROM students_audit").fetchone()[0]
+    assert audited == 2
+
+
+def test_bulk_update_returns_changed_count(database):
+    insert_student(database, 'S1')
+    insert_student(database, 'S2')
+
+    assert database.update_mother_info_bulk(['S1', 'S2'], MOTHER_INFO) == 2
+    assert database.update_mother_info_bulk(['S1', 'S2'], MOTHER_INFO) == 0
@@ -0,0 +1,63 @@
+"""Tests for the login-time prefetch cache and its per-table invalidation."""
+
+import pytest
+
+from conftest import insert_student
+from services import prefetch_service
+from utils.performance.metrics import get_metrics_registry
+
+
+@pytest.fixture
+def prefetch(database, monkeypatch):
+    """A PrefetchService installed as the global one and already warmed."""
+    service = prefetch_service.PrefetchService()
+    monkeypatch.setattr(prefetch_service, '_prefetch_service', service)
+    insert_student(database, 'S1')
+    database.conn.execute("INSERT INTO schools (id, name) VALUES (1, 'School One')")
+    service.prefetch()
+    yield service
+    if service._version_conn is not None:
+        service._version_conn.close()
+
+
+def hits():
+    return get_metrics_registry().counter("prefetch.hits").value
+
+
+def served_from_cache(call):
+    before = hits()
+    result = call()
+    return hits() > before, result
+
+
+def test_prefetched_reads_are_served_from_memory(database, prefetch):
+    hit, schools = served_from_cache(database.get_schools)
+    assert hit
+    assert [school['name'] for school in schools] == ['School One']
+    assert served_from_cache(database.get_total_students) == (True, 1)
+
+
+def test_write_drops_only_reads_of_that_table(database, prefetch):
+    database.mark_attendance('S1', '2026-10-01', 'Present')
+
+    assert served_from_cache(database.get_schools)[0]
+    assert served_from_cache(database.get_total_students)[0]
+    assert not served_from_cache(database.get_attendance_rate)[0]
+
+
+def test_new_school_is_visible_after_a_write(database, prefetch):
+    database.conn.execute("INSERT INTO schools (id, name) VALUES (2, 'School Two')")
+
+    hit, schools = served_from_cache(database.get_schools)
+    assert not hit
+    assert sorted(school['name'] for school in schools) == ['School One', 'School Two']
+
+
+def test_cached_results_are_copies(database, prefetch):
+    database.get_schools().append({'name': 'Injected'})
+
+    assert [school['name'] for school in database.get_schools()] == ['School One']
+
+
+def test_reads_on_other_arguments_are_not_cached(database, prefetch):
+    assert not served_from_cache(lambda: database.get_attendance_rate(days=7))[0]
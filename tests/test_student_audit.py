@@ -0,0 +1,90 @@
+"""Tests for delta-encoded students_audit rows and their reconstruction."""
+
+import pytest
+
+from conftest import insert_student
+from config.settings import Config
+from services.audit_service import AUDIT_BOOKKEEPING_COLUMNS, get_student_audit_service, snapshot_columns
+
+CHANGES = [
+    {'mother_name': 'Amina'},
+    {'mother_name': 'Amna', 'household_size': 5},
+    {'mother_cnic': '12345-1234567-1'},
+    {'father_phone': '03001234567'},
+    {'alternate_name': 'Bushra', 'household_size': 6},
+    {'mother_marital_status': 'Married'},
+    {'mother_name': 'Aamna', 'father_phone': '03007654321'},
+]
+
+
+@pytest.fixture
+def short_keyframe_interval(monkeypatch):
+    monkeypatch.setattr(Config, 'AUDIT_KEYFRAME_INTERVAL', 3)
+
+
+def current_row(database, student_pk):
+    row = database.conn.execute("SELECT * FROM students WHERE id = ?", (student_pk,)).fetchone()
+    return dict(row)
+
+
+def comparable(row, columns):
+    return {column: row[column] for column in columns if column not in AUDIT_BOOKKEEPING_COLUMNS}
+
+
+def audit_rows(database, student_pk):
+    return [tuple(row) for row in database.conn.execute(
+        "SELECT audit_id, audit_format FROM students_audit WHERE original_record_id = ? ORDER BY audit_id",
+        (student_pk,)
+    )]
+
+
+def test_snapshots_rebuild_every_earlier_row(database, short_keyframe_interval):
+    student_pk = insert_student(database, 'S1')
+    columns = snapshot_columns(database.conn)
+    before = []
+    for change in CHANGES:
+        before.append(current_row(database, student_pk))
+        assert database.apply_mother_info_batch(['S1'], change, 1, 'u', 'p')['changed'] == 1
+
+    rows = audit_rows(database, student_pk)
+    assert [audit_format for _, audit_format in rows] == ['keyframe', 'delta', 'delta'] * 2 + ['keyframe']
+    service = get_student_audit_service()
+    for (audit_id, _), expected in zip(rows, before):
+        assert comparable(service.snapshot(database.conn, audit_id), columns) == comparable(expected, columns)
+
+
+def test_delta_rows_store_only_identity_and_changes(database, short_keyframe_interval):
+    student_pk = insert_student(database, 'S1', mother_name='Old')
+    database.apply_mother_info_batch(['S1'], {'mother_name': 'Amina'}, 1, 'u', 'p')
+    database.apply_mother_info_batch(['S1'], {'mother_name': 'Amna'}, 1, 'u', 'p')
+
+    delta = database.conn.execute(
+        "SELECT student_id, student_name, mother_name, audit_changes, audit_summary FROM students_audit "
+        "WHERE original_record_id = ? AND audit_format = 'delta'", (student_pk,)
+    ).fetchone()
+    assert tuple(delta) == ('S1', None, None, '{"mother_name":["Amina","Amna"]}', "Mother's Name")
+
+
+def test_compaction_keeps_legacy_snapshots_reconstructible(database, short_keyframe_interval):
+    student_pk = insert_student(database, 'S1')
+    columns = snapshot_columns(database.conn)
+    before = []
+    for change in CHANGES:
+        before.append(current_row(database, student_pk))
+        # Full-copy audit row as written before delta storage
+        database.conn.execute(f"""
+            INSERT INTO students_audit (original_record_id, audit_action, {', '.join(columns)})
+            SELECT id, 'UPDATE', {', '.join(columns)} FROM students WHERE id = ?
+        """, (student_pk,))
+        assignments = ", ".join(f"{column} = ?" for column in change)
+        database.conn.execute(f"UPDATE students SET {assignments} WHERE id = ?",
+                              list(change.values()) + [student_pk])
+
+    stats = get_student_audit_service().compact()
+
+    assert stats['rows'] == len(CHANGES)
+    rows = audit_rows(database, student_pk)
+    assert {audit_format for _, audit_format in rows} == {'keyframe', 'delta'}
+    service = get_student_audit_service()
+    for (audit_id, _), expected in zip(rows, before):
+        assert comparable(service.snapshot(database.conn, audit_id), columns) == comparable(expected, columns)
@@ -0,0 +1,72 @@
+"""Tests for keyset paging of a student's change history."""
+
+import pytest
+
+from conftest import insert_student
+
+
+@pytest.fixture
+def history(database):
+    """Audit ids of student S1, latest first, with several entries per timestamp."""
+    insert_student(database, 'S1')
+    insert_student(database, 'S2')
+    for n in range(23):
+        database.apply_mother_info_batch(['S1', 'S2'], {'mother_name': f"Name {n}"}, 1, 'u', 'p')
+    rows = database.conn.execute(
+        "SELECT audit_id FROM students_audit WHERE student_id = 'S1' ORDER BY audit_id"
+    ).fetchall()
+    # Out of audit_id order, with about four entries sharing each timestamp
+    for position, (audit_id,) in enumerate(rows):
+        database.conn.execute("UPDATE students_audit SET audit_timestamp = ? WHERE audit_id = ?",
+                              (f"2026-10-{(position * 7) % 6 + 10:02d} 08:00:00", audit_id))
+    return [row[0] for row in database.conn.execute(
+        "SELECT audit_id FROM students_audit WHERE student_id = 'S1' "
+        "ORDER BY audit_timestamp DESC, audit_id DESC"
+    )]
+
+
+def read_all_pages(database, limit):
+    audit_ids, before, pages = [], None, 0
+    while True:
+        page = database.get_student_history_page('S1', limit=limit, before=before)
+        assert len(page['records']) <= limit
+        audit_ids.extend(record['audit_id'] for record in page['records'])
+        pages += 1
+        before = page['next_before']
+        if before is None:
+            return audit_ids, pages, page['total']
+
+
+@pytest.mark.parametrize('limit', [1, 4, 5, 23, 50])
+def test_pages_cover_history_once_in_order(database, history, limit):
+    audit_ids, pages, total = read_all_pages(database, limit)
+
+    assert audit_ids == history
+    assert pages == max(-(-len(history) // limit), 1)
+    assert total == len(history) == 23
+
+
+def test_unlimited_page_returns_everything(database, history):
+    page = database.get_student_history_page('S1')
+
+    assert [record['audit_id'] for record in page['records']] == history
+    assert page['next_before'] is None
+
+
+def test_entries_added_while_paging_do_not_shift_older_pages(database, history):
+    first = database.get_student_history_page('S1', limit=5)
+    database.apply_mother_info_batch(['S1'], {'mother_name': 'Latest'}, 1, 'u', 'p')
+    second = database.get_student_history_page('S1', limit=5, before=first['next_before'])
+
+    assert [record['audit_id'] for record in second['records']] == history[5:10]
+    assert second['total'] == len(history) + 1
+
+
+def test_entries_show_their_change_set(database, history):
+    latest = database.get_student_history_page('S1', limit=1)['records'][0]
+    old, new = database.conn.execute(
+        "SELECT json_extract(audit_changes, '$.mother_name[0]'), json_extract(audit_changes, '$.mother_name[1]') "
+        "FROM students_audit WHERE audit_id = ?", (latest['audit_id'],)
+    ).fetchone()
+
+    assert (latest['field_changed'], latest['old_value'], latest['new_value']) == ("Mother's Name", old or '', new)
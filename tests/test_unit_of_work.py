@@ -0,0 +1,106 @@
+"""Tests for DatabaseConnection.unit_of_work (one commit per user action)."""
+
+import sqlite3
+
+import pytest
+
+from conftest import insert_student
+from config.settings import Config
+from core.exceptions import DatabaseError
+
+
+@pytest.fixture
+def statements(database):
+    """Statements the database connection runs, upper-cased."""
+    seen = []
+    database.conn.set_trace_callback(lambda sql: seen.append(sql.strip().upper()))
+    yield seen
+    database.conn.set_trace_callback(None)
+
+
+def count(database, sql, params=()):
+    return database.conn.execute(sql, params).fetchone()[0]
+
+
+def test_unit_commits_once_for_several_writes(database, statements):
+    student_pk = insert_student(database, 'S1')
+    statements.clear()
+
+    with database.unit_of_work():
+        for day in ('2026-10-01', '2026-10-02', '2026-10-03'):
+            database.mark_attendance('S1', day, 'Present')
+        database.add_student_history(student_pk, 'S1', 'address', 'a', 'b', 'UPDATE')
+
+    assert statements.count('COMMIT') == 1
+    assert count(database, "SELECT COUNT(*) FROM attendance WHERE student_id = ?", (student_pk,)) == 3
+    assert count(database, "SELECT COUNT(*) FROM student_history") == 1
+
+
+def test_unit_writes_are_invisible_until_it_ends(database):
+    student_pk = insert_student(database, 'S1')
+    other = sqlite3.connect(Config.DATABASE_PATH)
+    try:
+        with database.unit_of_work():
+            database.mark_attendance('S1', '2026-10-01', 'Present')
+            database.mark_attendance('S1', '2026-10-02', 'Present')
+            assert other.execute("SELECT COUNT(*) FROM attendance").fetchone()[0] == 0
+        assert other.execute("SELECT COUNT(*) FROM attendance WHERE student_id = ?", (student_pk,)).fetchone()[0] == 2
+    finally:
+        other.close()
+
+
+def test_exception_rolls_back_the_whole_unit(database):
+    student_pk = insert_student(database, 'S1')
+
+    with pytest.raises(RuntimeError):
+        with database.unit_of_work():
+            database.mark_attendance('S1', '2026-10-01', 'Present')
+            raise RuntimeError("boom")
+
+    assert count(database, "SELECT COUNT(*) FROM attendance WHERE student_id = ?", (student_pk,)) == 0
+    assert not database.conn.in_transaction
+
+
+def test_method_rollback_fails_the_unit(database):
+    student_pk = insert_student(database, 'S1')
+
+    with pytest.raises(DatabaseError):
+        with database.unit_of_work():
+            database.mark_attendance('S1', '2026-10-01', 'Present')
+            # Handles its own failure by rolling back and returning False
+            assert database.update_student({'student_id': 'MISSING', 'address': 'x'}, 1, 'u', 'p') is False
+
+    assert count(database, "SELECT COUNT(*) FROM attendance WHERE student_id = ?", (student_pk,)) == 0
+
+
+def test_nested_transaction_is_a_savepoint(database, statements):
+    student_pk = insert_student(database, 'S1')
+    statements.clear()
+
+    with database.unit_of_work():
+        database.mark_attendance('S1', '2026-10-01', 'Present')
+        with pytest.raises(DatabaseError):
+            with database.db_conn.transaction():
+                database.mark_attendance('S1', '2026-10-02', 'Present')
+                raise RuntimeError("inner block fails")
+        database.mark_attendance('S1', '2026-10-03', 'Present')
+
+    assert 'ROLLBACK TO NESTED_TRANSACTION' in statements
+    assert statements.count('COMMIT') == 1
+    days = [row[0] for row in database.conn.execute(
+        "SELECT date FROM attendance WHERE student_id = ? ORDER BY date", (student_pk,))]
+    assert days == ['2026-10-01', '2026-10-03']
+
+
+def test_nested_units_join_the_outer_transaction(database, statements):
+    student_pk = insert_student(database, 'S1')
+    statements.clear()
+
+    with pytest.raises(RuntimeError):
+        with database.unit_of_work():
+            with database.unit_of_work():
+                database.mark_attendance('S1', '2026-10-01', 'Present')
+            raise RuntimeError("outer block fails")
+
+    assert 'COMMIT' not in statements
+    assert count(database, "SELECT COUNT(*) FROM attendance WHERE student_id = ?", (student_pk,)) == 0
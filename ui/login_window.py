@@ -6,6 +6,7 @@ from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout,
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QThread, pyqtSlot
 from PyQt5.QtGui import QFont, QIcon, QPixmap, QPalette, QCursor
 from core.auth import get_auth_manager
+from services.startup_service import get_startup_orchestrator
 from config.security import validate_password_strength
 from utils.logger import log_security_event
 from utils.material_icons import MaterialIcons
@@ -75,7 +76,6 @@ class PasswordLineEdit(QLineEdit):
 class LoginWorker(QThread):
     """Background worker for login operations to prevent UI blocking."""
     
-    login_success = pyqtSignal(object)  # User object
     login_failed = pyqtSignal(str)  # Error message
     
     def __init__(self, username, password):
@@ -86,18 +86,12 @@ class LoginWorker(QThread):
     def run(self):
         """Perform login operation in background."""
         try:
-            auth_manager = get_auth_manager()
+            # Authentication may still be initializing in the background
+            get_startup_orchestrator().wait('auth')
             
-            # Connect to auth manager signals
-            auth_manager.user_logged_in.connect(self.login_success.emit)
-            auth_manager.login_failed.connect(self.login_failed.emit)
-            
-            # Attempt login
-            success = auth_manager.login(self.username, self.password)
-            
-            if not success:
-                # If no specific error was emitted, emit generic error
-                self.login_failed.emit("Login failed. Please check your credentials.")
+            # The outcome reaches LoginWindow through the auth manager's
+            # user_logged_in/login_failed signals
+            get_auth_manager().login(self.username, self.password)
                 
         except Exception as e:
             self.login_failed.emit(f"Login error: {str(e)}")
@@ -109,7 +103,7 @@ class LoginWindow(QDialog):
     
     def __init__(self):
         super().__init__()
-        self.auth_manager = get_auth_manager()
+        self.auth_manager = None  # set once startup has built it
         self.login_worker = None
         self.failed_attempts = 0
         self.max_attempts = 5
@@ -319,7 +313,18 @@ class LoginWindow(QDialog):
         self.username_input.returnPressed.connect(self._attempt_login)
         self.password_input.returnPressed.connect(self._attempt_login)
         
-        # Auth manager connections
+        # Auth manager connections, made once background startup has built it
+        get_startup_orchestrator().when_ready('auth', self._connect_auth_manager)
+    
+    def _connect_auth_manager(self, _result=None):
+        """Connect to the authentication manager's signals.
+        
+        Runs on the auth startup step's thread before the step counts as done,
+        so LoginWorker's wait('auth') cannot return before the signals are connected.
+        """
+        if self.auth_manager is not None:
+            return
+        self.auth_manager = get_auth_manager()
         self.auth_manager.user_logged_in.connect(self._on_login_success)
         self.auth_manager.login_failed.connect(self._on_login_failed)
     
@@ -417,7 +422,6 @@ class LoginWindow(QDialog):
         
         # Start login worker
         self.login_worker = LoginWorker(username, password)
-        self.login_worker.login_success.connect(self._on_login_success)
         self.login_worker.login_failed.connect(self._on_login_failed)
         self.login_worker.finished.connect(lambda: self._set_login_state(False))
         self.login_worker.start()
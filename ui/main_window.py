@@ -1,8 +1,8 @@
 """Main window UI implementation with professional design and security."""
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QStackedWidget,
                            QListWidget, QStatusBar, QLabel, QFrame, QMenuBar, QMenu, QAction,
-                           QMessageBox, QDialog, QShortcut)
-from PyQt5.QtCore import Qt, QEvent, QTimer, pyqtSignal
+                           QMessageBox, QDialog, QShortcut, QProgressDialog)
+from PyQt5.QtCore import Qt, QEvent, QTimer, QThread, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon, QKeySequence
 import logging
 import os
@@ -16,20 +16,52 @@ if project_root not in sys.path:
 from config.settings import Config, SHORTCUTS
 from version import __version__, VERSION_SHORT
 from ui.pages.dashboard import DashboardPage
-from ui.pages.student import StudentPage
-from ui.pages.student_list import StudentListPage
-from ui.pages.attendance import AttendancePage
-from ui.pages.reports import ReportsPage
 from ui.components.sidebar import ModernSidebar
 from core.auth import get_auth_manager
 from utils.logger import log_audit_event, log_security_event
 from services.backup_service import get_backup_manager
+from services.maintenance_service import get_maintenance_scheduler
+
+class IntegrityCheckWorker(QThread):
+    """Runs an IntegrityCheckService pass off the GUI thread."""
+    
+    progress = pyqtSignal(int, str)     # percent, message
+    check_finished = pyqtSignal(dict)   # results (may be cancelled)
+    check_failed = pyqtSignal(str)      # error message
+    
+    def __init__(self, incremental: bool, parent=None):
+        super().__init__(parent)
+        from services.integrity_service import IntegrityCheckService
+        self.service = IntegrityCheckService()
+        self.incremental = incremental
+    
+    def cancel(self):
+        self.service.cancel()
+    
+    def run(self):
+        try:
+            results = self.service.run(incremental=self.incremental, progress=self.progress.emit)
+            self.check_finished.emit(results)
+        except Exception as e:
+            self.check_failed.emit(str(e))
 
 class MainWindow(QMainWindow):
     """Main application window with enhanced security and user management."""
     
     # Signals
     user_logout_requested = pyqtSignal()
+    
+    # Content pages in sidebar order: (attribute, module, class).
+    # Only the dashboard is built up front; the rest are built on first visit.
+    PAGES = [
+        ('dashboard_page', 'ui.pages.dashboard', 'DashboardPage'),
+        ('student_page', 'ui.pages.student', 'StudentPage'),
+        ('student_list_page', 'ui.pages.student_list', 'StudentListPage'),
+        ('mother_reg_page', 'ui.pages.mother_reg', 'MotherRegPage'),
+        ('attendance_page', 'ui.pages.attendance', 'AttendancePage'),
+        ('reports_page', 'ui.pages.reports', 'ReportsPage'),
+        ('settings_page', 'ui.pages.settings', 'SettingsPage'),
+    ]
 
     def __init__(self):
         super().__init__()
@@ -299,28 +331,74 @@ class MainWindow(QMainWindow):
         QMessageBox.information(self, "Manage Users", "User management interface will be implemented.")
     
     def _run_integrity_check(self):
-        """Run data integrity check."""
-        try:
-            from models.database import Database
-            db = Database()
-            results = db.run_data_integrity_check()
-            
-            log_audit_event("integrity_check_run", self.current_user.id, "database")
-            
-            message = f"Data Integrity Check Results:\\n\\n"
-            message += f"Passed: {results['passed']}\\n"
-            message += f"Failed: {results['failed']}\\n"
-            message += f"Warnings: {results['warnings']}\\n\\n"
-            
-            for check in results['checks']:
-                status_icon = "✓" if check['status'] == 'passed' else "✗" if check['status'] == 'failed' else "⚠"
-                message += f"{status_icon} {check['name']}: {check['details']}\\n"
-            
-            QMessageBox.information(self, "Data Integrity Check", message)
-            
-        except Exception as e:
-            logging.error(f"Integrity check failed: {e}")
-            QMessageBox.critical(self, "Integrity Check Error", f"Failed to run integrity check:\\n{str(e)}")
+        """Run data integrity check on a worker thread with progress and cancel."""
+        if getattr(self, '_integrity_worker', None) is not None and self._integrity_worker.isRunning():
+            self._integrity_progress.show()
+            return
+        
+        from services.integrity_service import IntegrityCheckService
+        incremental = False
+        since = IntegrityCheckService().last_checkpoint()
+        if since:
+            choice = QMessageBox.question(
+                self, "Data Integrity Check",
+                f"Check only records changed since the last check ({since} UTC)?\n\n"
+                "Choose No to check the whole database.",
+                QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.Yes
+            )
+            if choice == QMessageBox.Cancel:
+                return
+            incremental = choice == QMessageBox.Yes
+        worker = IntegrityCheckWorker(incremental, parent=self)
+        
+        progress = QProgressDialog("Starting integrity check...", "Cancel", 0, 100, self)
+        progress.setWindowTitle("Data Integrity Check")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(300)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+        progress.canceled.connect(worker.cancel)
+        
+        def _on_progress(percent, message):
+            progress.setValue(percent)
+            progress.setLabelText(message)
+        
+        worker.progress.connect(_on_progress)
+        worker.check_finished.connect(self._on_integrity_check_finished)
+        worker.check_failed.connect(self._on_integrity_check_failed)
+        worker.finished.connect(progress.close)
+        worker.finished.connect(worker.deleteLater)
+        
+        self._integrity_worker = worker
+        self._integrity_progress = progress
+        self.status_bar.showMessage("Running data integrity check...")
+        worker.start()
+        log_audit_event("integrity_check_run", self.current_user.id, "database")
+    
+    def _on_integrity_check_finished(self, results):
+        self._integrity_worker = None
+        if results.get('cancelled'):
+            self.status_bar.showMessage("Data integrity check cancelled", 5000)
+            return
+        self.status_bar.showMessage(f"Data integrity check finished in {results['duration_ms'] / 1000:.1f} s", 5000)
+        
+        scope = f"records changed since {results['since']} UTC" if results['since'] else "entire database"
+        message = f"Data Integrity Check Results ({scope}):\n\n"
+        message += f"Passed: {results['passed']}\n"
+        message += f"Failed: {results['failed']}\n"
+        message += f"Warnings: {results['warnings']}\n\n"
+        
+        for check in results['checks']:
+            status_icon = "✓" if check['status'] == 'passed' else "✗" if check['status'] == 'failed' else "⚠"
+            message += f"{status_icon} {check['name']}: {check['details']}\n"
+        
+        QMessageBox.information(self, "Data Integrity Check", message)
+    
+    def _on_integrity_check_failed(self, error):
+        self._integrity_worker = None
+        self.status_bar.clearMessage()
+        logging.error(f"Integrity check failed: {error}")
+        QMessageBox.critical(self, "Integrity Check Error", f"Failed to run integrity check:\n{error}")
     
     def _view_activity_log(self):
         """View activity log (admin only)."""
@@ -423,24 +501,11 @@ class MainWindow(QMainWindow):
                 }
             """)
 
-            # Initialize pages
-            from ui.pages.mother_reg import MotherRegPage
-            from ui.pages.settings import SettingsPage
+            # Dashboard is shown first; other pages get a placeholder until visited
             self.dashboard_page = DashboardPage()
-            self.student_page = StudentPage()
-            self.student_list_page = StudentListPage()
-            self.mother_reg_page = MotherRegPage()
-            self.attendance_page = AttendancePage()
-            self.reports_page = ReportsPage()
-            self.settings_page = SettingsPage()
-            # Add pages to stack
             self.content_stack.addWidget(self.dashboard_page)
-            self.content_stack.addWidget(self.student_page)
-            self.content_stack.addWidget(self.student_list_page)
-            self.content_stack.addWidget(self.mother_reg_page)
-            self.content_stack.addWidget(self.attendance_page)
-            self.content_stack.addWidget(self.reports_page)
-            self.content_stack.addWidget(self.settings_page)
+            for _ in self.PAGES[1:]:
+                self.content_stack.addWidget(self._create_page_placeholder())
 
             content_layout.addWidget(self.content_stack)
 
@@ -449,28 +514,73 @@ class MainWindow(QMainWindow):
 
             # Set initial page
             self.content_stack.setCurrentIndex(0)
+            
+            # Build frequently used pages once the window is idle
+            self._prewarm_queue = [
+                index for index, (attribute, _, _) in enumerate(self.PAGES)
+                if attribute[:-len('_page')] in Config.UI_PREWARM_PAGES
+            ]
+            if self._prewarm_queue:
+                QTimer.singleShot(Config.UI_PREWARM_DELAY_MS, self._prewarm_next_page)
         except Exception as e:
             logging.error(f"Error in _init_ui: {e}")
             raise
-
-    def _switch_page(self, index):
-        """Switch to the selected page from the sidebar."""
-        # Map sidebar index to content_stack index
-        # Dashboard, Students, Student List, Mother Reg, Attendance, Reports, Settings
-        if index == 6:  # Settings
-            self.content_stack.setCurrentWidget(self.settings_page)
-        elif index == 0:
-            self.content_stack.setCurrentWidget(self.dashboard_page)
-        elif index == 1:
-            self.content_stack.setCurrentWidget(self.student_page)
-        elif index == 2:
-            self.content_stack.setCurrentWidget(self.student_list_page)
-        elif index == 3:
-            self.content_stack.setCurrentWidget(self.mother_reg_page)
-        elif index == 4:
-            self.content_stack.setCurrentWidget(self.attendance_page)
-        elif index == 5:
-            self.content_stack.setCurrentWidget(self.reports_page)
+    
+    def _create_page_placeholder(self):
+        """Lightweight stand-in for a page that has not been built yet."""
+        placeholder = QWidget()
+        layout = QVBoxLayout(placeholder)
+        label = QLabel("Loading...")
+        label.setAlignment(Qt.AlignCenter)
+        label.setStyleSheet("color: #64748B; font-size: 14px;")
+        layout.addWidget(label)
+        return placeholder
+    
+    def _ensure_page(self, index):
+        """Return the page at index, building it in place of its placeholder.
+        
+        Returns:
+            tuple: (page, created) where created is True if the page was just built
+        """
+        attribute, module_name, class_name = self.PAGES[index]
+        page = getattr(self, attribute, None)
+        if page is not None:
+            return page, False
+        
+        import importlib
+        import time
+        from utils.performance import get_metrics_registry
+        start = time.perf_counter()
+        page_class = getattr(importlib.import_module(module_name), class_name)
+        page = page_class()
+        get_metrics_registry().observe(f"ui.page.construct.{attribute}", time.perf_counter() - start)
+        
+        # Swap without changing the visible page unless the placeholder was current
+        placeholder = self.content_stack.widget(index)
+        was_current = self.content_stack.currentIndex() == index
+        self.content_stack.insertWidget(index, page)
+        self.content_stack.removeWidget(placeholder)
+        placeholder.deleteLater()
+        if was_current:
+            self.content_stack.setCurrentIndex(index)
+        setattr(self, attribute, page)
+        
+        if self.current_user and hasattr(page, 'set_current_user'):
+            page.set_current_user(self.current_user)
+        logging.debug(f"Built {class_name} in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return page, True
+    
+    def _prewarm_next_page(self):
+        """Build one queued page per idle slot so the event loop stays responsive."""
+        if not self._prewarm_queue:
+            return
+        index = self._prewarm_queue.pop(0)
+        try:
+            self._ensure_page(index)
+        except Exception as e:
+            logging.warning(f"Prewarming page {self.PAGES[index][0]} failed: {e}")
+        if self._prewarm_queue:
+            QTimer.singleShot(0, self._prewarm_next_page)
 
     def _setup_status_bar(self):
         """Set up the status bar with user information and version."""
@@ -571,24 +681,17 @@ class MainWindow(QMainWindow):
         """Switch between different pages in the stack."""
         try:
             # Check for unsaved changes before switching (example for student page)
-            if (index == 1 and 
-                hasattr(self.student_page, 'has_unsaved_changes') and 
-                self.student_page.has_unsaved_changes()):
+            student_page = getattr(self, 'student_page', None)
+            if (index == 1 and student_page is not None and
+                hasattr(student_page, 'has_unsaved_changes') and 
+                student_page.has_unsaved_changes()):
                 self.sidebar.setCurrentRow(self.content_stack.currentIndex())
                 return
+            page, created = self._ensure_page(index)
             self.content_stack.setCurrentIndex(index)
-            # Refresh page data if needed
-            if index == 1:
-                self.student_page.refresh_data()
-            elif index == 2:
-                self.student_list_page.refresh_data()
-            elif index == 3:
-                if hasattr(self, 'mother_reg_page') and hasattr(self.mother_reg_page, 'refresh_data'):
-                    self.mother_reg_page.refresh_data()
-            elif index == 4:
-                self.attendance_page.refresh_data()
-            elif index == 5:
-                self.reports_page.refresh_data()
+            # A freshly built page has just loaded its data
+            if index in (1, 2, 3, 4, 5) and not created and hasattr(page, 'refresh_data'):
+                page.refresh_data()
         except Exception as e:
             logging.error(f"Error switching page: {e}")
             raise
@@ -597,6 +700,8 @@ class MainWindow(QMainWindow):
         """Filter events to prevent unwanted sidebar navigation and reset session timeout."""
         # Reset session timer on general user activity
         if event.type() in [QEvent.KeyPress, QEvent.MouseButtonPress, QEvent.MouseMove]:
+            # Holds off idle-time database maintenance
+            get_maintenance_scheduler().note_activity()
             if hasattr(self, 'session_timer'):
                 from config.security import SecurityConfig
                 timeout_ms = SecurityConfig.SESSION_TIMEOUT_MINUTES * 60 * 1000
@@ -3226,13 +3226,15 @@ class AttendancePage(QWidget):
             student_id = self.current_student_id
             saved_count = 0
             
-            # Save each attendance record to database
-            for date_str, status in self.attendance_data.items():
-                try:
-                    self.db.mark_attendance(student_id, date_str, status)
-                    saved_count += 1
-                except Exception as e:
-                    print(f"❌ Error saving attendance for {date_str}: {e}")
+            # Save each attendance record to database; the month is written in one
+            # transaction with a single commit instead of one commit per day
+            with self.db.unit_of_work():
+                for date_str, status in self.attendance_data.items():
+                    try:
+                        self.db.mark_attendance(student_id, date_str, status)
+                        saved_count += 1
+                    except Exception as e:
+                        print(f"❌ Error saving attendance for {date_str}: {e}")
             
             current_student = self.selected_student["name"]
             show_info_message("Data Saved", f"💾 Saved {saved_count} attendance records for {current_student}!\n\n✨ Attendance successfully saved to database.")
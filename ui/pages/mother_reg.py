@@ -267,6 +267,11 @@ class MotherRegPage(QWidget):
         # Styling handled by global stylesheet
         action_bar.addWidget(self.filter_info_label)
         
+        # Outstanding count badge (served from progress counters, no table scan)
+        self.outstanding_label = QLabel("Outstanding: 0")
+        # Styling handled by global stylesheet
+        action_bar.addWidget(self.outstanding_label)
+        
         # Add spacer
         action_bar.addStretch(1)
         
@@ -420,11 +425,26 @@ class MotherRegPage(QWidget):
                 table_data = [self._format_student_to_row_data(student) for student in students]
             
             self._populate_table(table_data)
+            self._update_outstanding_count(filters)
             
         except Exception as e:
             print(f"Error loading student data: {e}")
             show_warning_message("Data Load Error", f"Failed to load student data: {str(e)}")
 
+    def _update_outstanding_count(self, filters):
+        """Update the outstanding badge from the mother info progress counters."""
+        try:
+            if self.mother_service:
+                count = self.mother_service.get_outstanding_count(filters)
+            else:
+                class_name = filters.get("class") if isinstance(filters, dict) else None
+                school_id = filters.get("school_id") if isinstance(filters, dict) else None
+                count = sum(row['pending'] for row in self.db.get_mother_info_progress(
+                    school_id=school_id, class_name=class_name))
+            self.outstanding_label.setText(f"Outstanding: {count}")
+        except Exception as e:
+            print(f"Error updating outstanding count: {e}")
+
     def _get_current_filters(self):
         """Get current filter values as MotherFilters object."""
         if MotherFilters:
@@ -432,7 +452,8 @@ class MotherRegPage(QWidget):
                 school=self.school_combo.currentText(),
                 class_name=self.class_combo.currentText(),
                 section=self.section_combo.currentText(),
-                status=self.status_filter_combo.currentText()
+                status=self.status_filter_combo.currentText(),
+                school_id=self.school_combo.currentData()
             )
         else:
             # Fallback dictionary
@@ -440,24 +461,21 @@ class MotherRegPage(QWidget):
                 "school": self.school_combo.currentText(),
                 "class": self.class_combo.currentText(),
                 "section": self.section_combo.currentText(),
-                "status": self.status_filter_combo.currentText()
+                "status": self.status_filter_combo.currentText(),
+                "school_id": self.school_combo.currentData()
             }
 
     def _get_students_needing_mother_info_fallback(self, filters):
         """Fallback method for getting students when service layer not available."""
-        where_clauses = [
-            "is_deleted = 0",
-            "status = 'Active'",
-            """(
-                (COALESCE(mother_name,'') = '' OR COALESCE(mother_cnic,'') = '') 
-                AND 
-                (COALESCE(alternate_name,'') = '' OR COALESCE(alternate_cnic,'') = '')
-            )"""
-        ]
+        where_clauses = [self.db.mother_info_filter_sql()]
         params = []
         
         # Apply filters
         if isinstance(filters, dict):
+            if filters.get("school_id") not in (None, ""):
+                where_clauses.append("school_id = ?")
+                params.append(filters["school_id"])
+                
             if filters.get("class") and filters["class"] not in ["Please Select Class", "All Classes"]:
                 where_clauses.append("class = ?")
                 params.append(filters["class"])
@@ -1,5 +1,4 @@
 """Student management page UI implementation."""
-from turtle import back
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                            QPushButton, QFrame, QGridLayout, 
                            QLineEdit, QMessageBox, QHeaderView,
@@ -8,7 +7,6 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                            QSpinBox, QDialog, QDialogButtonBox,
                            QAbstractItemView, QAbstractScrollArea, QSizePolicy)
 
-import main
 from ui.components.custom_combo_box import CustomComboBox
 from ui.components.custom_table import SMISTable
 from ui.components.custom_date_picker import CustomDateEdit
@@ -16,6 +14,8 @@ from ui.components.form_components import FormModel, InputField, FormLabel, crea
 from PyQt5.QtCore import Qt, QDate, pyqtSignal, QRegExp, QTimer
 from PyQt5.QtGui import QFont, QIcon, QColor, QRegExpValidator
 from models.database import Database
+from core.exceptions import DatabaseError
+from config.settings import Config
 from resources.styles import (
     COLORS, RADIUS, SPACING_SM, FONT_MEDIUM, FONT_REGULAR, FOCUS_BORDER_COLOR,
     get_attendance_styles, get_global_styles, get_modern_widget_styles,
@@ -3084,29 +3084,40 @@ class StudentPage(QWidget):
             
             print(f"Final student data with org fields: {student_data}")
             
-            # Determine if we're editing or adding
-            if self.is_editing and self.current_student_id:
-                print(f"🔄 Updating existing student ID: {self.current_student_id}")
-                # Ensure student_id is in the data for update
-                student_data['student_id'] = self.current_student_id
-                # Update existing student with user information
-                success = self.db.update_student(
-                    student_data, 
-                    user_id=1,  # TODO: Get from current session
-                    username="admin",  # TODO: Get from current session
-                    user_phone="N/A"  # TODO: Get from current session
-                )
-                action_text = "updated"
-            else:
-                print(f"➕ Adding new student")
-                # Add new student with user information
-                success = self.db.add_student(
-                    student_data,
-                    user_id=1,  # TODO: Get from current session
-                    username="admin",  # TODO: Get from current session
-                    user_phone="N/A"  # TODO: Get from current session
-                )
-                action_text = "added"
+            # Determine if we're editing or adding; the record and its audit entry
+            # are written in one transaction with a single commit
+            success = None
+            try:
+                with self.db.unit_of_work():
+                    if self.is_editing and self.current_student_id:
+                        print(f"🔄 Updating existing student ID: {self.current_student_id}")
+                        # Ensure student_id is in the data for update
+                        student_data['student_id'] = self.current_student_id
+                        # Update existing student with user information
+                        success = self.db.update_student(
+                            student_data, 
+                            user_id=1,  # TODO: Get from current session
+                            username="admin",  # TODO: Get from current session
+                            user_phone="N/A"  # TODO: Get from current session
+                        )
+                        action_text = "updated"
+                    else:
+                        print(f"➕ Adding new student")
+                        # Add new student with user information
+                        success = self.db.add_student(
+                            student_data,
+                            user_id=1,  # TODO: Get from current session
+                            username="admin",  # TODO: Get from current session
+                            user_phone="N/A"  # TODO: Get from current session
+                        )
+                        action_text = "added"
+            except DatabaseError as e:
+                # A method that handled its own failure returned a result and the
+                # unit rolled back on exit; report it as that failed save
+                if success is None:
+                    raise
+                print(f"❌ Save rolled back: {e}")
+                success = False
             
             if success:
                 # Show success message
@@ -3130,8 +3141,8 @@ class StudentPage(QWidget):
                 show_critical_message(
                     self, 
                     "Error", 
-                    "❌ Failed to add student to database.\n\n"
-                    "Please check the database connection and try again."
+                    f"❌ Failed to {'update' if action_text == 'updated' else 'add'} student in database.\n\n"
+                    "No changes were saved. Please check the database connection and try again."
                 )
                 
         except Exception as e:
@@ -3535,10 +3546,12 @@ class StudentPage(QWidget):
         # Use SMISTable's built-in styling - no inline styles needed
         history_table.table.setAlternatingRowColors(True)
         
-        # Load real history data from database
+        # Load the latest page of history; older pages on demand
+        history_page = {'records': [], 'next_before': None, 'total': 0}
         try:
-            history_records = self.db.get_student_history(student_id)
-            print(f"Loaded {len(history_records)} history records for student {student_id}")
+            history_page = self.db.get_student_history_page(student_id, Config.MAX_RECORDS_PER_PAGE)
+            history_records = history_page['records']
+            print(f"Loaded {len(history_records)} of {history_page['total']} history records for student {student_id}")
             
             if not history_records:
                 # Show message if no history found
@@ -3566,70 +3579,7 @@ class StudentPage(QWidget):
                 }
             ]
         
-        history_table.table.setRowCount(len(history_records))
-        
-        for row, record in enumerate(history_records):
-            # Date & Time
-            date_item = QTableWidgetItem(record.get('date_time', 'Unknown'))
-            date_item.setTextAlignment(Qt.AlignCenter)
-            history_table.table.setItem(row, 0, date_item)
-            
-            # Field Changed
-            field_item = QTableWidgetItem(record.get('field_changed', 'N/A'))
-            field_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-            history_table.table.setItem(row, 1, field_item)
-            
-            # Old Value
-            old_value = record.get('old_value', '')
-            if len(old_value) > 100:  # Truncate very long values
-                old_value = old_value[:100] + "..."
-            old_item = QTableWidgetItem(old_value)
-            old_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-            old_item.setToolTip(record.get('old_value', ''))  # Show full value in tooltip
-            history_table.table.setItem(row, 2, old_item)
-            
-            # New Value
-            new_value = record.get('new_value', '')
-            if len(new_value) > 100:  # Truncate very long values
-                new_value = new_value[:100] + "..."
-            new_item = QTableWidgetItem(new_value)
-            new_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-            new_item.setToolTip(record.get('new_value', ''))  # Show full value in tooltip
-            history_table.table.setItem(row, 3, new_item)
-            
-            # Change Type
-            change_type = record.get('change_type', 'UNKNOWN')
-            type_item = QTableWidgetItem(change_type)
-            type_item.setTextAlignment(Qt.AlignCenter)
-            if change_type == "INSERT":
-                type_item.setBackground(QColor("#D1FAE5"))
-                type_item.setForeground(QColor("#047857"))
-            elif change_type == "UPDATE":
-                type_item.setBackground(QColor("#FEF3C7"))
-                type_item.setForeground(QColor("#D97706"))
-            elif change_type == "DELETE":
-                type_item.setBackground(QColor("#FEE2E2"))
-                type_item.setForeground(QColor("#DC2626"))
-            elif change_type == "ERROR":
-                type_item.setBackground(QColor("#FEE2E2"))
-                type_item.setForeground(QColor("#DC2626"))
-            else:
-                type_item.setBackground(QColor("#F3F4F6"))
-                type_item.setForeground(QColor("#6B7280"))
-            history_table.table.setItem(row, 4, type_item)
-            
-            # Changed By - Now showing proper usernames
-            changed_by = record.get('changed_by', 'Unknown')
-            changed_by_item = QTableWidgetItem(changed_by)
-            changed_by_item.setTextAlignment(Qt.AlignCenter)
-            # Highlight admin users with different color
-            if changed_by.lower() == 'admin':
-                changed_by_item.setBackground(QColor("#EBF8FF"))
-                changed_by_item.setForeground(QColor("#1E40AF"))
-            elif changed_by.lower() != 'unknown' and changed_by.lower() != 'system':
-                changed_by_item.setBackground(QColor("#F0FDF4"))
-                changed_by_item.setForeground(QColor("#166534"))
-            history_table.table.setItem(row, 5, changed_by_item)
+        self._append_history_rows(history_table, history_records)
         
         # Auto resize columns based on content for better visibility
         header = history_table.table.horizontalHeader()
@@ -3689,12 +3639,98 @@ class StudentPage(QWidget):
         
         # Summary info with real data - compact design
         latest_change = history_records[0].get('date_time', 'Unknown') if history_records else 'No changes'
-        summary_label = QLabel(f"Total Changes: {len(history_records)} | Last Updated: {latest_change}")
+        total_changes = max(history_page['total'], len(history_records))
+        summary_label = QLabel(f"Total Changes: {total_changes} | Last Updated: {latest_change}")
         summary_label.setProperty("class", "HistorySummary")
         layout.addWidget(summary_label)
         
+        if history_page['next_before']:
+            load_older_btn = QPushButton(f"Load older changes (showing {len(history_records)} of {total_changes})")
+            state = {'before': history_page['next_before'], 'shown': len(history_records)}
+            
+            def load_older():
+                page = self.db.get_student_history_page(student_id, Config.MAX_RECORDS_PER_PAGE, state['before'])
+                self._append_history_rows(history_table, page['records'])
+                state['before'] = page['next_before']
+                state['shown'] += len(page['records'])
+                if state['before']:
+                    load_older_btn.setText(f"Load older changes (showing {state['shown']} of {total_changes})")
+                else:
+                    load_older_btn.hide()
+            
+            load_older_btn.clicked.connect(load_older)
+            layout.addWidget(load_older_btn)
+        
         return tab
     
+    def _append_history_rows(self, history_table, history_records):
+        """Append change history entries to the details history table."""
+        start = history_table.table.rowCount()
+        history_table.table.setRowCount(start + len(history_records))
+        
+        for row, record in enumerate(history_records, start=start):
+            # Date & Time
+            date_item = QTableWidgetItem(record.get('date_time', 'Unknown'))
+            date_item.setTextAlignment(Qt.AlignCenter)
+            history_table.table.setItem(row, 0, date_item)
+            
+            # Field Changed
+            field_item = QTableWidgetItem(record.get('field_changed', 'N/A'))
+            field_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+            history_table.table.setItem(row, 1, field_item)
+            
+            # Old Value
+            old_value = record.get('old_value', '')
+            if len(old_value) > 100:  # Truncate very long values
+                old_value = old_value[:100] + "..."
+            old_item = QTableWidgetItem(old_value)
+            old_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+            old_item.setToolTip(record.get('old_value', ''))  # Show full value in tooltip
+            history_table.table.setItem(row, 2, old_item)
+            
+            # New Value
+            new_value = record.get('new_value', '')
+            if len(new_value) > 100:  # Truncate very long values
+                new_value = new_value[:100] + "..."
+            new_item = QTableWidgetItem(new_value)
+            new_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+            new_item.setToolTip(record.get('new_value', ''))  # Show full value in tooltip
+            history_table.table.setItem(row, 3, new_item)
+            
+            # Change Type
+            change_type = record.get('change_type', 'UNKNOWN')
+            type_item = QTableWidgetItem(change_type)
+            type_item.setTextAlignment(Qt.AlignCenter)
+            if change_type == "INSERT":
+                type_item.setBackground(QColor("#D1FAE5"))
+                type_item.setForeground(QColor("#047857"))
+            elif change_type == "UPDATE":
+                type_item.setBackground(QColor("#FEF3C7"))
+                type_item.setForeground(QColor("#D97706"))
+            elif change_type == "DELETE":
+                type_item.setBackground(QColor("#FEE2E2"))
+                type_item.setForeground(QColor("#DC2626"))
+            elif change_type == "ERROR":
+                type_item.setBackground(QColor("#FEE2E2"))
+                type_item.setForeground(QColor("#DC2626"))
+            else:
+                type_item.setBackground(QColor("#F3F4F6"))
+                type_item.setForeground(QColor("#6B7280"))
+            history_table.table.setItem(row, 4, type_item)
+            
+            # Changed By - Now showing proper usernames
+            changed_by = record.get('changed_by', 'Unknown')
+            changed_by_item = QTableWidgetItem(changed_by)
+            changed_by_item.setTextAlignment(Qt.AlignCenter)
+            # Highlight admin users with different color
+            if changed_by.lower() == 'admin':
+                changed_by_item.setBackground(QColor("#EBF8FF"))
+                changed_by_item.setForeground(QColor("#1E40AF"))
+            elif changed_by.lower() != 'unknown' and changed_by.lower() != 'system':
+                changed_by_item.setBackground(QColor("#F0FDF4"))
+                changed_by_item.setForeground(QColor("#166534"))
+            history_table.table.setItem(row, 5, changed_by_item)
+    
     def refresh_data(self):
         """Public method to refresh data (called from main window)."""
         self._refresh_data()
@@ -3993,9 +4029,9 @@ class StudentPage(QWidget):
             "Date & Time", "Field Changed", "Old → New Value", "Changed By"
         ])
         
-        # Load real history data from database
+        # Load the latest changes from database
         try:
-            history_records = self.db.get_student_history(student_id)
+            history_records = self.db.get_student_history(student_id, limit=10)
             print(f"📊 Found {len(history_records)} history records for student {student_id}")
         except Exception as e:
             print(f"❌ Error loading history: {e}")
@@ -4005,7 +4041,7 @@ class StudentPage(QWidget):
         
         for row, record in enumerate(history_records):
             # Date & Time (formatted)
-            date_time = record.get('change_date', 'N/A')
+            date_time = record.get('date_time', 'N/A')
             if date_time != 'N/A':
                 try:
                     from datetime import datetime
@@ -4023,7 +4059,7 @@ class StudentPage(QWidget):
             history_table.table.setItem(row, 0, date_item)
             
             # Field Changed
-            field_item = QTableWidgetItem(record.get('field_name', 'N/A'))
+            field_item = QTableWidgetItem(record.get('field_changed', 'N/A'))
             history_table.table.setItem(row, 1, field_item)
             
             # Old → New Value (combined)
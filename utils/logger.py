@@ -4,10 +4,14 @@ import logging.handlers
 import os
 import sys
 import json
-import structlog
+import queue
+import atexit
+import threading
+import time
 from datetime import datetime
 from typing import Any, Dict
 from config.settings import Config
+from utils.performance.metrics import get_metrics_registry, normalize_operation
 
 class SMISLoggerAdapter(logging.LoggerAdapter):
     """Custom logger adapter with context information."""
@@ -39,6 +43,155 @@ class JSONFormatter(logging.Formatter):
         
         return json.dumps(log_entry)
 
+class BatchedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating file handler that leaves flushing to the queue listener.
+    
+    StreamHandler flushes after every record; here writes stay in the file
+    buffer until the listener calls flush_batch() once per drained batch.
+    """
+    
+    def flush(self):
+        # Deferred: the listener flushes once per batch
+        pass
+    
+    def flush_batch(self):
+        """Flush buffered records to disk."""
+        logging.handlers.RotatingFileHandler.flush(self)
+    
+    def close(self):
+        self.flush_batch()
+        super().close()
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler with a bounded queue and a drop policy.
+    
+    When the queue is full, records below ``block_level`` are dropped (and
+    counted) so the caller never waits; records at or above it wait up to
+    ``block_timeout`` seconds for space before being dropped as well.
+    """
+    
+    def __init__(self, log_queue: queue.Queue, block_level: int = logging.WARNING,
+                 block_timeout: float = 1.0):
+        super().__init__(log_queue)
+        self.block_level = block_level
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+    
+    def prepare(self, record):
+        """Make the record safe to hand to another thread, without formatting it."""
+        # Merge args now (they may be mutated later) but leave layout/JSON to the listener
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+    
+    def enqueue(self, record):
+        if self.dropped:
+            self._report_dropped()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno >= self.block_level:
+                try:
+                    self.queue.put(record, timeout=self.block_timeout)
+                    return
+                except queue.Full:
+                    pass
+            with self._dropped_lock:
+                self.dropped += 1
+    
+    def _report_dropped(self):
+        """Enqueue a single warning summarising records dropped since the last report."""
+        with self._dropped_lock:
+            count, self.dropped = self.dropped, 0
+        if not count:
+            return
+        notice = logging.LogRecord(
+            'logging', logging.WARNING, __file__, 0,
+            f"Log queue full: dropped {count} records", None, None
+        )
+        try:
+            self.queue.put_nowait(notice)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += count
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """Single background writer that drains the log queue in batches.
+    
+    Records are routed by top-level logger name (``routes``), falling back to
+    the default handlers, and every touched handler is flushed once per batch.
+    """
+    
+    def __init__(self, log_queue: queue.Queue, *handlers, routes: Dict[str, list] = None,
+                 batch_size: int = 256, flush_interval: float = 0.5):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.routes = routes or {}
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+    
+    def _handlers_for(self, record) -> tuple:
+        return self.routes.get(record.name.split('.', 1)[0], self.handlers)
+    
+    def handle(self, record):
+        for handler in self._handlers_for(record):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+    
+    def all_handlers(self) -> list:
+        """Every distinct handler this listener writes to."""
+        handlers = []
+        for handler in [*self.handlers, *(h for hs in self.routes.values() for h in hs)]:
+            if handler not in handlers:
+                handlers.append(handler)
+        return handlers
+    
+    def _flush_all(self):
+        for handler in self.all_handlers():
+            try:
+                if hasattr(handler, 'flush_batch'):
+                    handler.flush_batch()
+                else:
+                    handler.flush()
+            except Exception:
+                # A failing flush must not stop the writer thread
+                pass
+    
+    def _monitor(self):
+        q = self.queue
+        has_task_done = hasattr(q, 'task_done')
+        while True:
+            try:
+                record = q.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            
+            batch = [record]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            
+            stop = False
+            for record in batch:
+                if record is self._sentinel:
+                    stop = True
+                else:
+                    self.handle(record)
+                if has_task_done:
+                    q.task_done()
+            
+            self._flush_all()
+            if stop:
+                break
+
+# Active background log writer, if setup_logging() has run
+_queue_listener = None
+
 def setup_logging():
     """Configure enhanced application logging."""
     # Get secure logs directory in AppData
@@ -64,25 +217,6 @@ def setup_logging():
         # Fallback to current directory
         log_dir = '.'
     
-    # Configure structlog
-    structlog.configure(
-        processors=[
-            structlog.stdlib.filter_by_level,
-            structlog.stdlib.add_logger_name,
-            structlog.stdlib.add_log_level,
-            structlog.stdlib.PositionalArgumentsFormatter(),
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.processors.StackInfoRenderer(),
-            structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer()
-        ],
-        context_class=dict,
-        logger_factory=structlog.stdlib.LoggerFactory(),
-        wrapper_class=structlog.stdlib.BoundLogger,
-        cache_logger_on_first_use=True,
-    )
-    
     # Set up logging format
     log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     date_format = '%Y-%m-%d %H:%M:%S'
@@ -93,7 +227,7 @@ def setup_logging():
     
     # Set up file handlers with rotation
     log_file = os.path.join(log_dir, f'sms_{datetime.now().strftime("%Y%m%d")}.log')
-    file_handler = logging.handlers.RotatingFileHandler(
+    file_handler = BatchedRotatingFileHandler(
         log_file, 
         maxBytes=Config.LOG_FILE_MAX_SIZE,
         backupCount=Config.LOG_BACKUP_COUNT
@@ -102,7 +236,7 @@ def setup_logging():
     
     # Set up JSON log file for structured logging
     json_log_file = os.path.join(log_dir, f'sms_structured_{datetime.now().strftime("%Y%m%d")}.json')
-    json_file_handler = logging.handlers.RotatingFileHandler(
+    json_file_handler = BatchedRotatingFileHandler(
         json_log_file,
         maxBytes=Config.LOG_FILE_MAX_SIZE,
         backupCount=Config.LOG_BACKUP_COUNT
@@ -115,7 +249,7 @@ def setup_logging():
     
     # Set up error file handler
     error_log_file = os.path.join(log_dir, f'sms_errors_{datetime.now().strftime("%Y%m%d")}.log')
-    error_handler = logging.handlers.RotatingFileHandler(
+    error_handler = BatchedRotatingFileHandler(
         error_log_file,
         maxBytes=Config.LOG_FILE_MAX_SIZE,
         backupCount=Config.LOG_BACKUP_COUNT
@@ -123,6 +257,19 @@ def setup_logging():
     error_handler.setFormatter(formatter)
     error_handler.setLevel(logging.ERROR)
     
+    # Stop a previous writer before replacing the pipeline
+    shutdown_logging()
+    
+    # Callers only enqueue; formatting and file I/O happen on one writer thread
+    log_queue = queue.Queue(maxsize=Config.LOG_QUEUE_SIZE)
+    queue_handler = BoundedQueueHandler(log_queue)
+    
+    root_handlers = [file_handler, json_file_handler, error_handler]
+    
+    # Add console handler only in debug mode
+    if Config.DEBUG:
+        root_handlers.append(console_handler)
+    
     # Configure root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, Config.LOG_LEVEL.upper()))
@@ -131,22 +278,45 @@ def setup_logging():
     root_logger.handlers.clear()
     
     # Add handlers
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(json_file_handler)
-    root_logger.addHandler(error_handler)
-    
-    # Add console handler only in debug mode
-    if Config.DEBUG:
-        root_logger.addHandler(console_handler)
+    root_logger.addHandler(queue_handler)
     
     # Set up specific loggers
-    setup_security_logger()
-    setup_audit_logger()
+    routes = {'security': [setup_security_logger(queue_handler)]}
+    audit_handler = setup_audit_logger(queue_handler)
+    if audit_handler:
+        routes['audit'] = [audit_handler]
+    
+    global _queue_listener
+    _queue_listener = BatchingQueueListener(
+        log_queue, *root_handlers,
+        routes=routes,
+        batch_size=Config.LOG_BATCH_SIZE,
+        flush_interval=Config.LOG_FLUSH_INTERVAL_MS / 1000.0
+    )
+    _queue_listener.start()
     
     logging.info("Enhanced logging system initialized")
 
-def setup_security_logger():
-    """Set up dedicated security event logger."""
+def shutdown_logging():
+    """Drain the log queue and stop the background writer."""
+    global _queue_listener
+    if _queue_listener is None:
+        return
+    listener, _queue_listener = _queue_listener, None
+    try:
+        listener.stop()
+    finally:
+        for handler in listener.all_handlers():
+            handler.close()
+
+atexit.register(shutdown_logging)
+
+def setup_security_logger(queue_handler: logging.Handler = None):
+    """Set up dedicated security event logger.
+    
+    With ``queue_handler`` the logger only enqueues and the file handler is
+    returned for the background writer; otherwise it is attached directly.
+    """
     security_logger = logging.getLogger('security')
     
     # Get secure logs directory
@@ -169,7 +339,8 @@ def setup_security_logger():
     
     # Security log file
     security_log_file = os.path.join(log_dir, f'security_{datetime.now().strftime("%Y%m%d")}.log')
-    security_handler = logging.handlers.RotatingFileHandler(
+    handler_class = BatchedRotatingFileHandler if queue_handler else logging.handlers.RotatingFileHandler
+    security_handler = handler_class(
         security_log_file,
         maxBytes=max_bytes,
         backupCount=backup_count
@@ -181,16 +352,18 @@ def setup_security_logger():
     )
     security_handler.setFormatter(security_formatter)
     
-    security_logger.addHandler(security_handler)
+    security_logger.handlers.clear()
+    security_logger.addHandler(queue_handler or security_handler)
     security_logger.setLevel(logging.INFO)
     security_logger.propagate = False  # Don't propagate to root logger
+    return security_handler
 
-def setup_audit_logger():
-    """Set up dedicated audit trail logger."""
+def setup_audit_logger(queue_handler: logging.Handler = None):
+    """Set up dedicated audit trail logger (see setup_security_logger for queue_handler)."""
     try:
         from config.settings import Config
         if not Config.ENABLE_AUDIT_LOG:
-            return
+            return None
         log_dir = os.path.join(Config.APP_DATA_DIR, 'logs')
         max_bytes = Config.LOG_FILE_MAX_SIZE
         backup_count = Config.LOG_BACKUP_COUNT
@@ -210,7 +383,8 @@ def setup_audit_logger():
     
     # Audit log file
     audit_log_file = os.path.join(log_dir, f'audit_{datetime.now().strftime("%Y%m%d")}.log')
-    audit_handler = logging.handlers.RotatingFileHandler(
+    handler_class = BatchedRotatingFileHandler if queue_handler else logging.handlers.RotatingFileHandler
+    audit_handler = handler_class(
         audit_log_file,
         maxBytes=max_bytes,
         backupCount=backup_count
@@ -219,9 +393,11 @@ def setup_audit_logger():
     audit_formatter = JSONFormatter()
     audit_handler.setFormatter(audit_formatter)
     
-    audit_logger.addHandler(audit_handler)
+    audit_logger.handlers.clear()
+    audit_logger.addHandler(queue_handler or audit_handler)
     audit_logger.setLevel(logging.INFO)
     audit_logger.propagate = False  # Don't propagate to root logger
+    return audit_handler
 
 def get_logger(name: str, user_context: Dict[str, Any] = None) -> SMISLoggerAdapter:
     """Get logger with user context."""
@@ -229,6 +405,42 @@ def get_logger(name: str, user_context: Dict[str, Any] = None) -> SMISLoggerAdap
     context = user_context or {}
     return SMISLoggerAdapter(logger, context)
 
+# structlog is configured on first use of get_structured_logger, not in setup_logging
+_structlog_configured = False
+_structlog_lock = threading.Lock()
+
+def _configure_structlog():
+    """Route structlog through the stdlib handlers installed by setup_logging()."""
+    global _structlog_configured
+    with _structlog_lock:
+        if _structlog_configured:
+            return
+        import structlog
+        structlog.configure(
+            processors=[
+                structlog.stdlib.filter_by_level,
+                structlog.stdlib.add_logger_name,
+                structlog.stdlib.add_log_level,
+                structlog.stdlib.PositionalArgumentsFormatter(),
+                structlog.processors.TimeStamper(fmt="iso"),
+                structlog.processors.StackInfoRenderer(),
+                structlog.processors.format_exc_info,
+                structlog.processors.UnicodeDecoder(),
+                structlog.processors.JSONRenderer()
+            ],
+            context_class=dict,
+            logger_factory=structlog.stdlib.LoggerFactory(),
+            wrapper_class=structlog.stdlib.BoundLogger,
+            cache_logger_on_first_use=True,
+        )
+        _structlog_configured = True
+
+def get_structured_logger(name: str):
+    """Get a structlog logger that emits JSON events; structlog is imported here, on first use."""
+    _configure_structlog()
+    import structlog
+    return structlog.get_logger(name)
+
 def log_security_event(event_type: str, user_id: int = None, details: Dict[str, Any] = None):
     """Log security-related events."""
     security_logger = logging.getLogger('security')
@@ -268,20 +480,34 @@ def log_audit_event(action: str, user_id: int, resource_type: str,
     audit_logger.info(f"Audit: {action} on {resource_type}", extra=audit_data)
 
 class PerformanceLogger:
-    """Context manager for logging performance metrics."""
+    """Context manager for logging performance metrics.
+    
+    Besides the log line, every duration is recorded in the metrics registry
+    under ``metric_name`` (or the normalized operation name) so percentiles can
+    be read without parsing logs.
+    """
     
-    def __init__(self, operation_name: str, logger: logging.Logger = None):
+    def __init__(self, operation_name: str, logger: logging.Logger = None, metric_name: str = None):
         self.operation_name = operation_name
+        self.metric_name = metric_name or normalize_operation(operation_name)
         self.logger = logger or logging.getLogger('performance')
         self.start_time = None
+        self._start_counter = None
     
     def __enter__(self):
         self.start_time = datetime.now()
+        self._start_counter = time.perf_counter()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
+        duration = time.perf_counter() - self._start_counter
+        get_metrics_registry().observe(self.metric_name, duration)
+        if exc_type is not None:
+            get_metrics_registry().counter(f"{self.metric_name}.errors").inc()
+        
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         end_time = datetime.now()
-        duration = (end_time - self.start_time).total_seconds()
         
         self.logger.info(
             f"Performance: {self.operation_name} completed in {duration:.3f}s",
@@ -21,10 +21,10 @@ class ValidationResult:
 class MotherFormValidator:
     """Comprehensive form validation for mother registration."""
     
-    # Validation patterns
-    CNIC_PATTERN = r'^\d{5}-\d{7}-\d{1}$'
-    PHONE_PATTERN = r'^0\d{10}$'
-    MWA_PATTERN = r'^\d{11}$'
+    # Validation patterns; a match accepts the value without the step-by-step checks
+    CNIC_PATTERN = re.compile(r'^\d{5}-\d{7}-\d{1}$')
+    PHONE_PATTERN = re.compile(r'^0\d{10}$')
+    MWA_PATTERN = re.compile(r'^\d{11}$')
     
     @classmethod
     def validate_cnic(cls, cnic: str) -> ValidationResult:
@@ -34,6 +34,8 @@ class MotherFormValidator:
         if not cnic or not cnic.strip():
             result.add_error("CNIC is required")
             return result
+        if cls.CNIC_PATTERN.fullmatch(cnic):
+            return result
         
         # Remove spaces and dashes for validation
         clean_cnic = cnic.replace('-', '').replace(' ', '')
@@ -53,6 +55,8 @@ class MotherFormValidator:
         if not phone or not phone.strip():
             result.add_error("Phone number is required")
             return result
+        if cls.PHONE_PATTERN.fullmatch(phone):
+            return result
         
         clean_phone = phone.replace('-', '').replace(' ', '').replace('+92', '0')
         
@@ -73,6 +77,8 @@ class MotherFormValidator:
         if not mwa or not mwa.strip():
             result.add_error("MWA number is required")
             return result
+        if cls.MWA_PATTERN.fullmatch(mwa):
+            return result
         
         clean_mwa = mwa.replace('-', '').replace(' ', '')
         
@@ -0,0 +1,4 @@
+"""Performance instrumentation utilities."""
+from utils.performance.metrics import (
+    Counter, Gauge, Histogram, MetricsRegistry, get_metrics_registry, normalize_operation
+)
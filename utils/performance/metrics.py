@@ -0,0 +1,304 @@
+"""In-process metrics registry: counters, gauges and latency histograms."""
+import re
+import json
+import time
+import threading
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+
+
+# SQL/operation name normalization
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_operation(name: str, max_length: int = 120) -> str:
+    """Collapse an operation or SQL statement into a stable metric key.
+    
+    Literals become ``?``, ``IN (?, ?, ...)`` lists collapse to ``(?)`` and
+    whitespace is squeezed, so the same query shape always maps to one key.
+    """
+    key = _STRING_LITERAL.sub('?', name)
+    key = _NUMBER_LITERAL.sub('?', key)
+    key = _IN_LIST.sub('(?)', key)
+    key = _WHITESPACE.sub(' ', key).strip()
+    if len(key) > max_length:
+        key = key[:max_length]
+    return key
+
+
+class Counter:
+    """Monotonically increasing count."""
+    
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self._value += amount
+    
+    @property
+    def value(self) -> int:
+        return self._value
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {'type': 'counter', 'value': self._value}
+
+
+class Gauge:
+    """Value that can go up and down."""
+    
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+    
+    def set(self, value: float):
+        self._value = value
+    
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+    
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+    
+    @property
+    def value(self) -> float:
+        return self._value
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {'type': 'gauge', 'value': self._value}
+
+
+class Histogram:
+    """HDR-style latency histogram with bounded relative error.
+    
+    Values are recorded in microseconds into log-linear buckets: every power of
+    two is split into 2**SUB_BUCKET_BITS equal sub-buckets, which keeps the
+    relative error of any reported percentile under about 3% while memory stays
+    proportional to the number of distinct buckets touched.
+    """
+    
+    SUB_BUCKET_BITS = 5
+    
+    def __init__(self):
+        self._buckets: Dict[int, int] = {}
+        self._count = 0
+        self._sum = 0.0
+        self._min = None
+        self._max = None
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def _bucket_index(cls, micros: int) -> int:
+        sub_count = 1 << cls.SUB_BUCKET_BITS
+        if micros < sub_count:
+            return micros
+        shift = micros.bit_length() - cls.SUB_BUCKET_BITS - 1
+        return ((shift + 1) << cls.SUB_BUCKET_BITS) + ((micros >> shift) - sub_count)
+    
+    @classmethod
+    def _bucket_upper_bound(cls, index: int) -> int:
+        sub_count = 1 << cls.SUB_BUCKET_BITS
+        if index < sub_count:
+            return index
+        shift = (index >> cls.SUB_BUCKET_BITS) - 1
+        sub = index & (sub_count - 1)
+        return ((sub_count + sub + 1) << shift) - 1
+    
+    def observe(self, seconds: float):
+        """Record a duration in seconds."""
+        micros = max(0, int(seconds * 1_000_000))
+        index = self._bucket_index(micros)
+        with self._lock:
+            self._buckets[index] = self._buckets.get(index, 0) + 1
+            self._count += 1
+            self._sum += seconds
+            if self._min is None or seconds < self._min:
+                self._min = seconds
+            if self._max is None or seconds > self._max:
+                self._max = seconds
+    
+    def percentile(self, percent: float) -> float:
+        """Return the approximate value (seconds) at the given percentile."""
+        with self._lock:
+            if not self._count:
+                return 0.0
+            target = max(1, int(round(self._count * percent / 100.0)))
+            seen = 0
+            for index in sorted(self._buckets):
+                seen += self._buckets[index]
+                if seen >= target:
+                    value = self._bucket_upper_bound(index) / 1_000_000
+                    return min(value, self._max)
+            return self._max
+    
+    @property
+    def count(self) -> int:
+        return self._count
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'type': 'histogram',
+            'count': self._count,
+            'sum': self._sum,
+            'min': self._min or 0.0,
+            'max': self._max or 0.0,
+            'mean': self._sum / self._count if self._count else 0.0,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+        }
+
+
+class _Timer:
+    """Context manager recording elapsed time into a histogram."""
+    
+    __slots__ = ('_histogram', '_start', 'duration')
+    
+    def __init__(self, histogram: Histogram):
+        self._histogram = histogram
+        self._start = 0.0
+        self.duration = 0.0
+    
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.duration = time.perf_counter() - self._start
+        self._histogram.observe(self.duration)
+        return False
+
+
+class MetricsRegistry:
+    """Thread-safe registry of named counters, gauges and histograms."""
+    
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+    
+    def _get_or_create(self, name: str, metric_class):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = metric_class()
+                    self._metrics[name] = metric
+        if not isinstance(metric, metric_class):
+            raise TypeError(f"Metric '{name}' is already registered as {type(metric).__name__}")
+        return metric
+    
+    def counter(self, name: str) -> Counter:
+        return self._get_or_create(name, Counter)
+    
+    def gauge(self, name: str) -> Gauge:
+        return self._get_or_create(name, Gauge)
+    
+    def histogram(self, name: str) -> Histogram:
+        return self._get_or_create(name, Histogram)
+    
+    def observe(self, name: str, seconds: float):
+        """Record a duration for ``name``."""
+        self.histogram(name).observe(seconds)
+    
+    def timer(self, name: str) -> _Timer:
+        """Context manager timing a block::
+            
+            with metrics.timer("page.students.load"):
+                ...
+        """
+        return _Timer(self.histogram(name))
+    
+    def timed(self, name: Optional[str] = None) -> Callable:
+        """Decorator timing every call of the wrapped function."""
+        def decorator(func):
+            histogram = self.histogram(name or f"{func.__module__}.{func.__qualname__}")
+            
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - start)
+            return wrapper
+        return decorator
+    
+    def names(self) -> List[str]:
+        return sorted(self._metrics)
+    
+    def reset(self):
+        """Drop every registered metric."""
+        with self._lock:
+            self._metrics.clear()
+    
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Point-in-time view of every metric."""
+        return {name: self._metrics[name].snapshot() for name in self.names()}
+    
+    def to_json(self, path: str = None, indent: int = 2) -> str:
+        """Dump a snapshot as JSON, optionally writing it to ``path``."""
+        data = json.dumps({'generated_at': time.time(), 'metrics': self.snapshot()}, indent=indent)
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(data)
+        return data
+    
+    def to_openmetrics(self, prefix: str = 'smis') -> str:
+        """Render a snapshot in OpenMetrics text format.
+        
+        Histograms are exported as summaries (quantiles 0.5/0.95/0.99) with the
+        original operation name kept in an ``operation`` label.
+        """
+        lines = []
+        by_family: Dict[str, List[tuple]] = {}
+        for name, data in self.snapshot().items():
+            family = f"{prefix}_{data['type']}"
+            by_family.setdefault(family, []).append((name, data))
+        
+        for family, entries in sorted(by_family.items()):
+            metric_type = entries[0][1]['type']
+            if metric_type == 'histogram':
+                family = f"{family}_seconds"
+                lines.append(f"# TYPE {family} summary")
+                lines.append(f"# UNIT {family} seconds")
+                for name, data in entries:
+                    label = _openmetrics_label(name)
+                    for quantile in ('p50', 'p95', 'p99'):
+                        q = {'p50': '0.5', 'p95': '0.95', 'p99': '0.99'}[quantile]
+                        lines.append(f'{family}{{operation="{label}",quantile="{q}"}} {data[quantile]:.6f}')
+                    lines.append(f'{family}_sum{{operation="{label}"}} {data["sum"]:.6f}')
+                    lines.append(f'{family}_count{{operation="{label}"}} {data["count"]}')
+            else:
+                lines.append(f"# TYPE {family} {metric_type}")
+                suffix = '_total' if metric_type == 'counter' else ''
+                for name, data in entries:
+                    lines.append(f'{family}{suffix}{{name="{_openmetrics_label(name)}"}} {data["value"]}')
+        
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def _openmetrics_label(value: str) -> str:
+    """Escape a label value for OpenMetrics text."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Global metrics registry
+_metrics_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get global metrics registry instance."""
+    global _metrics_registry
+    if _metrics_registry is None:
+        with _registry_lock:
+            if _metrics_registry is None:
+                _metrics_registry = MetricsRegistry()
+    return _metrics_registry
@@ -0,0 +1,238 @@
+"""SQL trace and query-plan profiler for diagnostic runs."""
+import os
+import json
+import atexit
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from utils.performance.metrics import Histogram, normalize_operation
+
+logger = logging.getLogger(__name__)
+
+# Statements worth asking SQLite for a plan
+_EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+class QueryShapeStats:
+    """Aggregated timings, row counts and plan for one normalized statement."""
+    
+    def __init__(self, shape: str):
+        self.shape = shape
+        self.calls = 0
+        self.traced_calls = 0
+        self.total_seconds = 0.0
+        self.rows = 0
+        self.latency = Histogram()
+        self.plan: Optional[List[str]] = None
+        self.flags: List[str] = []
+        self.example: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'shape': self.shape,
+            'calls': self.calls,
+            'traced_calls': self.traced_calls,
+            'total_ms': round(self.total_seconds * 1000, 3),
+            'mean_ms': round(self.total_seconds * 1000 / self.calls, 3) if self.calls else 0.0,
+            'p95_ms': round(self.latency.percentile(95) * 1000, 3),
+            'rows': self.rows,
+            'flags': self.flags,
+            'plan': self.plan or [],
+            'example': self.example,
+        }
+
+
+class SQLProfiler:
+    """Collects per-statement timings and EXPLAIN QUERY PLAN samples.
+    
+    Statements executed through a ProfilingCursor are timed and their rows
+    counted; ``set_trace_callback`` additionally sees statements issued
+    directly on the connection and those run inside triggers. The plan of each
+    distinct statement shape is sampled once and flagged when it contains a
+    full ``SCAN`` or a ``USE TEMP B-TREE`` step.
+    """
+    
+    def __init__(self):
+        self._shapes: Dict[str, QueryShapeStats] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    def _stats_for(self, shape: str) -> QueryShapeStats:
+        stats = self._shapes.get(shape)
+        if stats is None:
+            with self._lock:
+                stats = self._shapes.setdefault(shape, QueryShapeStats(shape))
+        return stats
+    
+    def attach(self, conn: sqlite3.Connection):
+        """Start tracing every statement run on ``conn``."""
+        conn.set_trace_callback(self._on_trace)
+    
+    def detach(self, conn: sqlite3.Connection):
+        conn.set_trace_callback(None)
+    
+    def _on_trace(self, statement: str):
+        if getattr(self._local, 'explaining', False):
+            return
+        self._stats_for(normalize_operation(statement, max_length=500)).traced_calls += 1
+    
+    def record(self, cursor: sqlite3.Cursor, sql: str, params, seconds: float, rows: int):
+        """Record one timed execution and sample its plan the first time the shape is seen."""
+        shape = normalize_operation(sql, max_length=500)
+        stats = self._stats_for(shape)
+        with self._lock:
+            stats.calls += 1
+            stats.total_seconds += seconds
+            if rows > 0:
+                stats.rows += rows
+        stats.latency.observe(seconds)
+        
+        if stats.plan is None:
+            stats.example = sql.strip()[:500]
+            stats.plan = self._explain(cursor.connection, sql, params)
+            stats.flags = self._flag_plan(stats.plan)
+            for flag in stats.flags:
+                logger.warning(f"Query plan uses {flag}: {shape[:200]}")
+    
+    def add_rows(self, sql: str, rows: int):
+        """Attribute rows fetched after execute() to the statement's shape."""
+        if rows > 0:
+            stats = self._stats_for(normalize_operation(sql, max_length=500))
+            with self._lock:
+                stats.rows += rows
+    
+    def _explain(self, conn: sqlite3.Connection, sql: str, params) -> List[str]:
+        if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+            return []
+        if params is None:
+            # executemany: plan with NULL placeholders
+            params = [None] * sql.count('?')
+        self._local.explaining = True
+        try:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+            return [row[3] for row in rows]
+        except sqlite3.Error as e:
+            return [f"<plan unavailable: {e}>"]
+        finally:
+            self._local.explaining = False
+    
+    @staticmethod
+    def _flag_plan(plan: List[str]) -> List[str]:
+        flags = []
+        for detail in plan:
+            if detail.startswith('SCAN ') and ' USING ' not in detail and 'SCAN CONSTANT ROW' not in detail:
+                flags.append(f"full scan ({detail})")
+            elif detail.startswith('SCAN ') and 'COVERING INDEX' in detail:
+                flags.append(f"index scan ({detail})")
+            if 'USE TEMP B-TREE' in detail:
+                flags.append(f"temp b-tree ({detail})")
+        return flags
+    
+    def report(self, top: int = 25) -> List[Dict[str, Any]]:
+        """Most expensive statement shapes first (by total time, then call count)."""
+        with self._lock:
+            shapes = list(self._shapes.values())
+        shapes.sort(key=lambda s: (s.total_seconds, s.calls + s.traced_calls), reverse=True)
+        return [s.to_dict() for s in shapes[:top]]
+    
+    def format_report(self, top: int = 25) -> str:
+        """Human-readable ranked report."""
+        lines = [f"SQL profile ({datetime.now().isoformat(timespec='seconds')})", ""]
+        for rank, entry in enumerate(self.report(top), 1):
+            lines.append(
+                f"{rank:>3}. {entry['total_ms']:>10.1f} ms total  {entry['calls']:>6} calls  "
+                f"{entry['mean_ms']:>8.3f} ms mean  {entry['p95_ms']:>8.3f} ms p95  {entry['rows']:>8} rows"
+            )
+            lines.append(f"     {entry['shape']}")
+            for detail in entry['plan']:
+                lines.append(f"       plan: {detail}")
+            for flag in entry['flags']:
+                lines.append(f"       WARNING: {flag}")
+            lines.append("")
+        return "\n".join(lines)
+    
+    def write_report(self, directory: str, top: int = 50) -> str:
+        """Write JSON and text reports to ``directory``. Returns the JSON path."""
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        json_path = os.path.join(directory, f"sql_profile_{stamp}.json")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({'generated_at': datetime.now().isoformat(), 'queries': self.report(top)}, f, indent=2)
+        with open(os.path.join(directory, f"sql_profile_{stamp}.txt"), 'w', encoding='utf-8') as f:
+            f.write(self.format_report(top))
+        return json_path
+    
+    def reset(self):
+        with self._lock:
+            self._shapes.clear()
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """Cursor that reports execute() timings and fetched rows to the SQL profiler."""
+    
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._last_sql = sql
+            get_sql_profiler().record(self, sql, parameters, time.perf_counter() - start, self.rowcount)
+    
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._last_sql = sql
+            # Plans for executemany are sampled without parameters
+            get_sql_profiler().record(self, sql, None, time.perf_counter() - start, self.rowcount)
+    
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            get_sql_profiler().add_rows(getattr(self, '_last_sql', ''), 1)
+        return row
+    
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(size if size is not None else self.arraysize)
+        get_sql_profiler().add_rows(getattr(self, '_last_sql', ''), len(rows))
+        return rows
+    
+    def fetchall(self):
+        rows = super().fetchall()
+        get_sql_profiler().add_rows(getattr(self, '_last_sql', ''), len(rows))
+        return rows
+
+
+# Global SQL profiler instance
+_sql_profiler = None
+_report_registered = False
+
+
+def get_sql_profiler() -> SQLProfiler:
+    """Get global SQL profiler instance."""
+    global _sql_profiler
+    if _sql_profiler is None:
+        _sql_profiler = SQLProfiler()
+    return _sql_profiler
+
+
+def write_report_on_exit(directory: str):
+    """Write the ranked SQL report to ``directory`` when the process exits."""
+    global _report_registered
+    if _report_registered:
+        return
+    _report_registered = True
+    
+    def _write():
+        try:
+            path = get_sql_profiler().write_report(directory)
+            logger.info(f"SQL profile written to {path}")
+        except Exception as e:
+            logger.warning(f"Failed to write SQL profile: {e}")
+    
+    atexit.register(_write)
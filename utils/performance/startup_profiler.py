@@ -0,0 +1,198 @@
+"""Startup profiler: init phase timings and import-time breakdown.
+
+Usage:
+    python -m utils.performance.startup_profiler --module main --top 30
+
+In the application, ``get_startup_profiler().phase(name)`` times each init
+phase; with ``STARTUP_PROFILE=true`` the report is written to the logs
+directory once the login window is on screen. The command line entry point
+imports a module in a fresh interpreter with ``-X importtime`` and ranks the
+slowest imports.
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import subprocess
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from utils.performance.metrics import get_metrics_registry
+
+# "import time:      1234 |       5678 |     package.module"
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+class StartupProfiler:
+    """Records named startup phases and milestones relative to its creation."""
+    
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self._phases: List[Dict[str, Any]] = []
+        self._milestones: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+    
+    def _offset_ms(self, moment: float) -> float:
+        return round((moment - self._origin) * 1000, 3)
+    
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block as the startup phase ``name``::
+            
+            with get_startup_profiler().phase("database_init"):
+                db = Database()
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            with self._lock:
+                self._phases.append({
+                    'name': name,
+                    'start_ms': self._offset_ms(start),
+                    'duration_ms': round(seconds * 1000, 3),
+                    'thread': threading.current_thread().name,
+                })
+            get_metrics_registry().observe(f"startup.{name}", seconds)
+    
+    def mark(self, name: str) -> float:
+        """Record a milestone; returns milliseconds since the profiler was created."""
+        offset = self._offset_ms(time.perf_counter())
+        with self._lock:
+            self._milestones.append({'name': name, 'at_ms': offset})
+        get_metrics_registry().gauge(f"startup.{name}_ms").set(offset)
+        return offset
+    
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            phases = list(self._phases)
+            milestones = list(self._milestones)
+        return {
+            'generated_at': datetime.now().isoformat(),
+            'elapsed_ms': self._offset_ms(time.perf_counter()),
+            'phases': phases,
+            'milestones': milestones,
+            'modules_loaded': len(sys.modules),
+        }
+    
+    def format_report(self) -> str:
+        """Human-readable phase timeline."""
+        data = self.report()
+        lines = [f"Startup profile ({data['generated_at']})", ""]
+        for entry in sorted(data['phases'], key=lambda p: p['start_ms']):
+            lines.append(f"  {entry['start_ms']:>9.1f} ms  {entry['duration_ms']:>9.1f} ms  {entry['name']}")
+        for entry in data['milestones']:
+            lines.append(f"  {entry['at_ms']:>9.1f} ms  {'-':>9}     {entry['name']}")
+        lines.append("")
+        lines.append(f"Modules loaded: {data['modules_loaded']}")
+        return "\n".join(lines)
+    
+    def write_report(self, directory: str) -> str:
+        """Write JSON and text reports to ``directory``. Returns the JSON path."""
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        json_path = os.path.join(directory, f"startup_profile_{stamp}.json")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+        with open(os.path.join(directory, f"startup_profile_{stamp}.txt"), 'w', encoding='utf-8') as f:
+            f.write(self.format_report())
+        return json_path
+
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """Parse ``-X importtime`` stderr into one entry per imported module."""
+    entries = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        entries.append({
+            'module': module,
+            'self_ms': int(self_us) / 1000.0,
+            'cumulative_ms': int(cumulative_us) / 1000.0,
+            'depth': len(indent) // 2,
+        })
+    return entries
+
+
+def profile_imports(module: str = 'main', top: int = 30,
+                    python: Optional[str] = None, cwd: Optional[str] = None) -> Dict[str, Any]:
+    """Import ``module`` in a fresh interpreter with ``-X importtime``.
+    
+    Returns:
+        dict: Wall time, the slowest imports by cumulative time and self time
+        aggregated per top-level package
+    """
+    cwd = cwd or os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [python or sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+        capture_output=True, text=True, cwd=cwd
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    entries = parse_importtime(completed.stderr)
+    
+    packages: Dict[str, float] = {}
+    for entry in entries:
+        package = entry['module'].split('.')[0]
+        packages[package] = packages.get(package, 0.0) + entry['self_ms']
+    
+    return {
+        'module': module,
+        'wall_ms': round(wall_ms, 3),
+        'returncode': completed.returncode,
+        'error': completed.stderr.strip().splitlines()[-1] if completed.returncode else None,
+        'total_self_ms': round(sum(e['self_ms'] for e in entries), 3),
+        'slowest_imports': sorted(entries, key=lambda e: e['cumulative_ms'], reverse=True)[:top],
+        'packages': [
+            {'package': name, 'self_ms': round(ms, 3)}
+            for name, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        ],
+    }
+
+
+def format_import_profile(profile: Dict[str, Any]) -> str:
+    lines = [f"Import profile for '{profile['module']}': {profile['wall_ms']:.1f} ms wall, "
+             f"{profile['total_self_ms']:.1f} ms in imports", ""]
+    if profile['error']:
+        lines.extend([f"Import failed: {profile['error']}", ""])
+    lines.append("Slowest imports (cumulative):")
+    for entry in profile['slowest_imports']:
+        lines.append(f"  {entry['cumulative_ms']:>9.1f} ms  {entry['self_ms']:>8.1f} ms self  "
+                     f"{'  ' * entry['depth']}{entry['module']}")
+    lines.extend(["", "Self time by top-level package:"])
+    for entry in profile['packages']:
+        lines.append(f"  {entry['self_ms']:>9.1f} ms  {entry['package']}")
+    return "\n".join(lines)
+
+
+# Global startup profiler instance, created at first import so its clock
+# starts as early as the entry point imports it
+_startup_profiler = StartupProfiler()
+
+
+def get_startup_profiler() -> StartupProfiler:
+    """Get global startup profiler instance."""
+    return _startup_profiler
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Break down SMIS import time")
+    parser.add_argument('--module', default='main', help="module to import (default: main)")
+    parser.add_argument('--top', type=int, default=30)
+    parser.add_argument('--json', action='store_true', help="print JSON instead of text")
+    args = parser.parse_args(argv)
+    
+    profile = profile_imports(args.module, args.top)
+    print(json.dumps(profile, indent=2) if args.json else format_import_profile(profile))
+    return 0 if profile['returncode'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())